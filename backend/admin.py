@@ -221,16 +221,84 @@ def create_admin_routes(app):
         except Exception as e:
             return f"Database error: {e}", 500
     
-    @app.route('/admin/refresh-rss')
+    @app.route('/admin/refresh-rss', methods=['GET', 'POST'])
     def refresh_rss():
-        """Trigger RSS refresh"""
+        """Queue an RSS refresh for ingestion_worker.py; returns the job id straight away"""
         try:
-            import subprocess
-            result = subprocess.run(['python3', 'rss_processor.py'], 
-                                  capture_output=True, text=True, timeout=300)
-            return f"RSS refresh completed. Output: {result.stdout}"
+            from utils.ingestion_jobs import enqueue_job, live_workers
+            job, created = enqueue_job('general', requested_by=request.remote_addr)
+            return jsonify({
+                'job_id': job['job_id'],
+                'status': job['status'],
+                'created': created,
+                'status_url': f"/admin/ingestion-jobs/{job['job_id']}",
+                'worker_alive': bool(live_workers())
+            }), 202
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/admin/ingestion-jobs')
+    def ingestion_jobs_api():
+        """Recent ingestion jobs (optionally ?status=queued|running|done|failed) and live workers"""
+        try:
+            from utils.ingestion_jobs import list_jobs, live_workers
+            limit = min(int(request.args.get('limit', 20)), 100)
+            return jsonify({
+                'jobs': list_jobs(limit=limit, status=request.args.get('status')),
+                'workers': live_workers(),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/admin/ingestion-jobs/<job_id>')
+    def ingestion_job_api(job_id):
+        """Status, progress and result of one ingestion job"""
+        try:
+            from utils.ingestion_jobs import get_job
+            job = get_job(job_id)
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            return jsonify(job)
         except Exception as e:
-            return f"RSS refresh failed: {e}", 500
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/admin/ingestion-metrics')
+    def ingestion_metrics_api():
+        """Per-source, per-stage ingestion timings: ?run_id=<id> for one run, else ?days=N summary plus recent runs"""
+        try:
+            from utils.ingestion_metrics import recent_runs, run_breakdown, stage_summary
+            conn = pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+            try:
+                run_id = request.args.get('run_id')
+                if run_id:
+                    rows = run_breakdown(conn, run_id)
+                    if not rows:
+                        return jsonify({'error': 'Run not found'}), 404
+                    return jsonify({'run_id': run_id, 'rows': rows})
+                days = max(1, min(int(request.args.get('days', 1)), 30))
+                return jsonify({
+                    'days': days,
+                    'stages': stage_summary(conn, datetime.now() - timedelta(days=days)),
+                    'runs': recent_runs(conn, limit=20),
+                    'timestamp': datetime.now().isoformat()
+                })
+            finally:
+                conn.close()
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    @app.route('/admin/feed-schedule')
+    def feed_schedule_api():
+        """Per-source next-poll table from the adaptive feed scheduler"""
+        try:
+            from utils.feed_schedule import get_schedule
+            return jsonify({
+                'sources': get_schedule(),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
     
     @app.route('/admin/stats')
     def admin_stats_api():
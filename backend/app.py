@@ -5,7 +5,7 @@
 """
 import os
 import logging
-from flask import Flask, jsonify, send_from_directory, g
+from flask import Flask, jsonify, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -13,9 +13,12 @@ from apscheduler.schedulers.background import BackgroundScheduler
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables first
+# Load environment variables first (utils.* read their settings at import time)
 load_dotenv()
 
+from utils.json_provider import init_json_provider
+from utils.compression import init_compression, send_precompressed, HTML_MAX_AGE, UPLOAD_MAX_AGE
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -62,6 +65,8 @@ def auto_fetch_and_store_shorts():
 
 def create_app():
     app = Flask(__name__, static_folder='static', static_url_path='')
+    init_json_provider(app)
+    init_compression(app)
     
     # Security: Set secret key
     app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -193,15 +198,17 @@ def create_app():
     # === Static & Public Routes ===
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        return send_from_directory('uploads', filename)
+        # Upload names are random UUIDs, so the content behind a URL never changes
+        uploads_dir = os.path.join(app.root_path, 'uploads')
+        return send_precompressed(uploads_dir, filename, max_age=UPLOAD_MAX_AGE, immutable=True)
 
     @app.route('/')
     def root():
-        return app.send_static_file('index.html')
+        return send_precompressed(app.static_folder, 'index.html', max_age=HTML_MAX_AGE)
 
     @app.route('/news')
     def news_feed():
-        return app.send_static_file('news.html')
+        return send_precompressed(app.static_folder, 'news.html', max_age=HTML_MAX_AGE)
 
     @app.route('/health')
     def health():
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+HTML Extraction Benchmark
+Compares the old BeautifulSoup scrape path (html.parser, decompose, one
+select() per selector, then a second round of image selectors) with the
+single-pass utils.html_extract engines on saved article pages.
+
+Fixtures are plain .html files in --fixtures; index.json maps each file name
+to the page URL (needed for the site-specific image rules).
+
+Usage:
+    python3 benchmark_html_extract.py --download 40    # save 40 pages from the general feeds
+    python3 benchmark_html_extract.py                  # benchmark fixtures/html
+    python3 benchmark_html_extract.py --synthetic      # generated pages (no network)
+    python3 benchmark_html_extract.py --rounds 20 --fixtures /tmp/pages
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.html_extract import extract_article, available_engines, rules_for_domain
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+
+
+def legacy_extract(html, url):
+    """The pre-html_extract scrape path from rss_processor_v3, kept for comparison."""
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']):
+        element.decompose()
+
+    content_selectors = [
+        'article', '[role="main"]', '.article-content', '.post-content',
+        '.entry-content', '.content', '.story-body', '.article-body',
+        'main', '.main-content', '#content', '.post'
+    ]
+    article_content = None
+    for selector in content_selectors:
+        elements = soup.select(selector)
+        if elements:
+            article_content = elements[0]
+            break
+    if not article_content:
+        article_content = soup.find('body')
+
+    text = None
+    if article_content:
+        paragraphs = article_content.find_all(['p', 'div'], string=True)
+        joined = ' '.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
+        joined = re.sub(r'\s+', ' ', joined).strip()
+        if len(joined) > 100:
+            text = joined
+
+    domain = urlparse(url).netloc.lower()
+    site = {
+        'thehindu.com': '.article-image img, .lead-image img, .main-image img, figure img',
+        'timesofindia.indiatimes.com': '._3YYSt img, .gaBkci img, figure img, .story_image img',
+        'ndtv.com': '.story__banner img, .ins_instory_dv img, figure img',
+    }
+    image_url = None
+    for suffix, selector in site.items():
+        if suffix in domain:
+            img = soup.select_one(selector)
+            if img and img.get('src'):
+                image_url = urljoin(url, img['src'])
+            break
+    if not image_url:
+        for selector in ['meta[property="og:image"]', 'meta[name="twitter:image"]',
+                         'article img:first-of-type', '.article-content img:first-of-type',
+                         '.story-body img:first-of-type', 'main img:first-of-type',
+                         'figure img', '.featured-image img']:
+            element = soup.select_one(selector)
+            if element:
+                img_url = element.get('content') or element.get('src')
+                if img_url:
+                    image_url = urljoin(url, img_url)
+                    break
+    return text, image_url
+
+
+def download_fixtures(directory, count):
+    """Save up to `count` article pages linked from the general RSS sources."""
+    import feedparser
+    from utils.http_fetcher import get_fetcher
+    from rss_manager import load_rss_sources
+
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, 'index.json')
+    index = json.load(open(index_path)) if os.path.exists(index_path) else {}
+    sources = (load_rss_sources(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rss_sources.json')) or {}).get('general', [])
+    fetcher = get_fetcher()
+
+    links = []
+    for source in sources:
+        try:
+            feed = feedparser.parse(fetcher.get(source['url']).content)
+        except Exception as e:
+            print(f"  skip feed {source['url']}: {e}")
+            continue
+        links.extend(entry.link for entry in feed.entries[:3] if getattr(entry, 'link', None))
+
+    saved = 0
+    for link in links:
+        if saved >= count:
+            break
+        try:
+            response = fetcher.get(link)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  skip page {link}: {e}")
+            continue
+        name = f"{urlparse(link).netloc}_{hashlib.md5(link.encode()).hexdigest()[:10]}.html"
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(response.content)
+        index[name] = link
+        saved += 1
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"Saved {saved} pages to {directory}")
+
+
+def load_fixtures(directory):
+    index_path = os.path.join(directory, 'index.json')
+    index = json.load(open(index_path)) if os.path.exists(index_path) else {}
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages.append((index.get(name, f"https://{name.split('_')[0]}/"), f.read()))
+    return pages
+
+
+def make_synthetic_pages(count):
+    """News-site shaped pages: heavy head/nav/footer chrome around an article."""
+    chrome = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(150))
+    scripts = '<script>window.dataLayer = [];' + 'var x = 1;' * 400 + '</script>'
+    pages = []
+    for n in range(count):
+        body = ''.join(f'<p>Paragraph {i} of story {n}: volunteers restored the lake and local schools '
+                       f'joined the effort to plant native trees along the shore.</p>' for i in range(25))
+        related = ''.join(f'<div class="card"><div class="title">Related story {i}</div></div>' for i in range(40))
+        html = (f'<html><head><meta property="og:image" content="/img/{n}.jpg">{scripts}</head><body>'
+                f'<header><nav><ul>{chrome}</ul></nav></header>'
+                f'<div class="layout"><div class="story-body"><figure><img src="/lead/{n}.jpg"></figure>{body}</div>'
+                f'<aside>{related}</aside></div><footer><ul>{chrome}</ul></footer></body></html>')
+        pages.append((f"https://www.thehindu.com/news/{n}", html.encode()))
+    return pages
+
+
+def bench(fn, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, html in pages:
+            fn(html, url)
+    return (time.perf_counter() - start) / (rounds * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article HTML extraction")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='Directory of saved .html pages')
+    parser.add_argument('--download', type=int, metavar='N', help='Save N pages from the general feeds first')
+    parser.add_argument('--synthetic', action='store_true', help='Use generated pages instead of fixtures')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.download:
+        download_fixtures(args.fixtures, args.download)
+
+    pages = None
+    if not args.synthetic and os.path.isdir(args.fixtures):
+        pages = load_fixtures(args.fixtures)
+        print(f"Loaded {len(pages)} fixture pages from {args.fixtures}")
+    if not pages:
+        pages = make_synthetic_pages(20)
+        print(f"Generated {len(pages)} synthetic pages")
+
+    # Same output check: text and image per page against the legacy path
+    legacy = {url: legacy_extract(html, url) for url, html in pages}
+    for url, _ in pages:
+        rules_for_domain(urlparse(url).netloc.lower())  # compile outside the timed loop
+
+    candidates = [('legacy-bs4', legacy_extract)]
+    for engine in available_engines():
+        candidates.append((engine, lambda html, url, engine=engine: extract_article(html, url, engine=engine)))
+
+    print(f"\n{'engine':<12} {'ms/page':>9} {'speedup':>8} {'same text':>10} {'same image':>11}")
+    print("-" * 54)
+    baseline = None
+    for name, fn in candidates:
+        per_page = bench(fn, pages, args.rounds)
+        baseline = baseline or per_page
+        if name == 'legacy-bs4':
+            same_text = same_image = len(pages)
+        else:
+            results = {url: fn(html, url) for url, html in pages}
+            same_text = sum(1 for url in results if results[url].text == legacy[url][0])
+            same_image = sum(1 for url in results if results[url].image_url == legacy[url][1])
+        print(f"{name:<12} {per_page * 1000:>9.2f} {baseline / per_page:>7.1f}x "
+              f"{same_text:>5}/{len(pages):<4} {same_image:>5}/{len(pages):<4}")
+
+
+if __name__ == '__main__':
+    main()
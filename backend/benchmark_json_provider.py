@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+JSON Provider Benchmark
+Compares Flask's stock JSON provider with utils.json_provider on feed payloads.
+
+Usage:
+    python3 benchmark_json_provider.py              # real payloads from the DB
+    python3 benchmark_json_provider.py --synthetic  # generated payloads (no DB)
+    python3 benchmark_json_provider.py --pages 50 --limit 50 --rounds 200
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.json_provider import OrjsonProvider, StdlibJSONProvider, HAS_ORJSON
+
+load_dotenv()
+
+
+def load_real_pages(pages, limit):
+    """Fetch public-news shaped pages straight from the articles table."""
+    from utils.db import get_db_connection
+    conn = get_db_connection()
+    result = []
+    with conn.cursor() as cursor:
+        for page in range(pages):
+            cursor.execute("""
+                SELECT id, COALESCE(rewritten_headline, title) AS title,
+                       COALESCE(rewritten_summary, original_content) AS content,
+                       source_url, image_url, category_id, sentiment, sentiment_score,
+                       created_at, is_breaking, is_ai_rewritten
+                FROM articles
+                WHERE (blocked_legacy IS NULL OR blocked_legacy = 0)
+                ORDER BY created_at DESC
+                LIMIT %s OFFSET %s
+            """, (limit, page * limit))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            result.append({"articles": rows, "total": len(rows), "limit": limit, "offset": page * limit})
+    conn.close()
+    return result
+
+
+def make_synthetic_pages(pages, limit):
+    """Generate pages with the same shape and body sizes as the public feed."""
+    body = ("Community volunteers restored the lake and local schools joined the effort. " * 45)[:3500]
+    now = datetime.now()
+    result = []
+    for page in range(pages):
+        articles = []
+        for i in range(limit):
+            n = page * limit + i
+            articles.append({
+                "id": n,
+                "title": f"Village solar project powers {n} homes",
+                "content": body,
+                "source_url": f"https://example.com/news/{n}",
+                "image_url": f"https://example.com/img/{n}.jpg",
+                "category_id": n % 12,
+                "sentiment": "POSITIVE",
+                "sentiment_score": Decimal("0.90"),
+                "created_at": now - timedelta(minutes=n),
+                "is_breaking": 0,
+                "is_ai_rewritten": n % 2,
+            })
+        result.append({"articles": articles, "total": limit, "limit": limit, "offset": page * limit})
+    return result
+
+
+def bench(provider, payloads, rounds):
+    """Return (seconds per response, bytes per response) for provider.response()."""
+    size = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            size = len(provider.response(payload).get_data())
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(payloads)), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON providers on feed payloads")
+    parser.add_argument('--synthetic', action='store_true', help='Use generated payloads instead of the DB')
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = None
+    if not args.synthetic:
+        try:
+            payloads = load_real_pages(args.pages, args.limit)
+            print(f"Loaded {len(payloads)} real feed pages from the database")
+        except Exception as e:
+            print(f"DB unavailable ({e}); falling back to synthetic payloads")
+    if not payloads:
+        payloads = make_synthetic_pages(args.pages, args.limit)
+        print(f"Generated {len(payloads)} synthetic feed pages")
+
+    app = Flask(__name__)
+    providers = [("flask-default", DefaultJSONProvider(app)), ("stdlib-iso", StdlibJSONProvider(app))]
+    if HAS_ORJSON:
+        providers.append(("orjson", OrjsonProvider(app)))
+    else:
+        print("orjson not installed - skipping OrjsonProvider")
+
+    print(f"\n{'provider':<15} {'ms/response':>12} {'bytes':>10} {'speedup':>8}")
+    print("-" * 48)
+    baseline = None
+    with app.app_context():
+        for name, provider in providers:
+            per_call, size = bench(provider, payloads, args.rounds)
+            baseline = baseline or per_call
+            print(f"{name:<15} {per_call * 1000:>12.3f} {size:>10} {baseline / per_call:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,72 @@
 # blueprints/articles.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from utils.auth import require_auth
 from utils.cache import get_cached_categories
 from utils.db import get_db_connection
 from utils.ai_rewriter import rewrite_news
+from utils.fieldsets import Fieldset, column, SNIPPET_SQL
+from utils.article_cache import article_cache
+from utils import search_index
 import logging
 import bleach  # ← ADDED
 
 articles_bp = Blueprint('articles', __name__)
 logger = logging.getLogger(__name__)
 
+AI_TAG = ' [This article was rewritten using A.I]'
+VISIBLE_ARTICLES = "(blocked_legacy IS NULL OR blocked_legacy = 0)"
+
+
+def public_content(art):
+    """Display body for public endpoints: AI summary (tagged), summary, or original."""
+    if art['is_ai_rewritten'] and art['rewritten_summary']:
+        return art['rewritten_summary'] + AI_TAG
+    if art['rewritten_summary']:
+        return art['rewritten_summary']
+    return art['original_content'] or ""
+
+
+# Fields for /api/v1/articles (content is computed in the view, see get_articles)
+ARTICLE_FIELDS = Fieldset(
+    fields={
+        'id': (['id'], column('id')),
+        'title': (['title'], column('title')),
+        'rewritten_headline': (['title'], column('title')),
+        'content': (['original_content', 'rewritten_summary', 'is_ai_rewritten'], column('content')),
+        'snippet': ([SNIPPET_SQL], column('snippet')),
+        'source_url': (['source_url'], column('source_url')),
+        'image_url': (['image_url'], column('image_url')),
+        'category_id': (['category_id'], column('category_id')),
+        'sentiment': (['sentiment'], column('sentiment')),
+        'created_at': (['created_at'], column('created_at')),
+        'is_ai_rewritten': (['is_ai_rewritten'], column('is_ai_rewritten')),
+    },
+    full=('id', 'title', 'rewritten_headline', 'content', 'source_url', 'image_url',
+          'category_id', 'sentiment', 'created_at', 'is_ai_rewritten'),
+    card=('id', 'title', 'snippet', 'image_url', 'category_id', 'created_at'),
+)
+
+# Fields for /api/v1/public/news
+PUBLIC_NEWS_FIELDS = Fieldset(
+    fields={
+        'id': (['id'], column('id')),
+        'title': (['COALESCE(rewritten_headline, title) AS rewritten_headline'], column('rewritten_headline')),
+        'content': (['original_content', 'rewritten_summary', 'is_ai_rewritten'], public_content),
+        'snippet': ([SNIPPET_SQL], column('snippet')),
+        'source_url': (['source_url'], column('source_url')),
+        'image_url': (['image_url'], column('image_url')),
+        'category_id': (['category_id'], column('category_id')),
+        'sentiment': (['sentiment'], column('sentiment')),
+        'created_at': (['created_at'], column('created_at')),
+        'is_breaking': (['is_breaking'], column('is_breaking')),
+        'category_name': (['category_id'], column('category_name')),
+    },
+    full=('id', 'title', 'content', 'source_url', 'image_url', 'category_id',
+          'sentiment', 'created_at', 'is_breaking', 'category_name'),
+    card=('id', 'title', 'snippet', 'image_url', 'category_id', 'created_at',
+          'is_breaking', 'category_name'),
+)
+
 @articles_bp.route('/api/v1/articles/rewrite', methods=['POST'])
 def rewrite_article():
     user_id = require_auth()
@@ -20,7 +77,7 @@ def rewrite_article():
     if not content:
         return jsonify({"error": "Content required"}), 400
     try:
-        rewritten = rewrite_news(content)
+        rewritten = rewrite_news(content, interactive=True)
         rewritten = bleach.clean(rewritten, tags=[], strip=True)  # ← SANITIZE
         return jsonify({"rewritten_content": rewritten}), 200
     except Exception as e:
@@ -35,25 +92,25 @@ def get_articles():
     limit = min(int(request.args.get('limit', 20)), 100)
     offset = int(request.args.get('offset', 0))
     category_id = request.args.get('category_id')
+    fields = ARTICLE_FIELDS.parse(request.args)
+    select_list = ARTICLE_FIELDS.columns(fields, extra=['id'])
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
             if category_id:
-                cursor.execute("""
-                    SELECT id, title, original_content, rewritten_summary, is_ai_rewritten,
-                    source_url, image_url, category_id, sentiment, created_at
+                cursor.execute(f"""
+                    SELECT {select_list}
                     FROM articles
-                    WHERE category_id = %s AND (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    WHERE category_id = %s AND {VISIBLE_ARTICLES}
                     AND LENGTH(COALESCE(rewritten_summary, original_content)) >= 300
                     ORDER BY created_at DESC
                     LIMIT %s OFFSET %s
                 """, (category_id, limit, offset))
             else:
-                cursor.execute("""
-                    SELECT id, title, original_content, rewritten_summary, is_ai_rewritten,
-                    source_url, image_url, category_id, sentiment, created_at
+                cursor.execute(f"""
+                    SELECT {select_list}
                     FROM articles
-                    WHERE (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    WHERE {VISIBLE_ARTICLES}
                     AND LENGTH(COALESCE(rewritten_summary, original_content)) >= 300
                     ORDER BY created_at DESC
                     LIMIT %s OFFSET %s
@@ -61,34 +118,26 @@ def get_articles():
             raw_articles = cursor.fetchall()
             articles = []
             for art in raw_articles:
-                rewritten_summary = art['rewritten_summary']
-                is_ai_rewritten = art['is_ai_rewritten']
-                if not is_ai_rewritten and art['original_content']:
-                    try:
-                        rewritten_summary = rewrite_news(art['original_content'])
-                        is_ai_rewritten = 1
-                    except Exception as e:
-                        logger.warning(f"Auto-rewrite failed for article {art['id']}: {e}")
-                        rewritten_summary = rewritten_summary or art['original_content']
-                        is_ai_rewritten = 0
-                rewritten_summary = bleach.clean(rewritten_summary, tags=[], strip=True)  # ← SANITIZE
-                content = (
-                    rewritten_summary + ' [This article was rewritten using A.I]'
-                    if is_ai_rewritten
-                    else rewritten_summary or art['original_content']
-                )
-                articles.append({
-                    "id": art["id"],
-                    "title": art["title"],
-                    "rewritten_headline": art["title"],
-                    "content": content,
-                    "source_url": art["source_url"],
-                    "image_url": art["image_url"],
-                    "category_id": art["category_id"],
-                    "sentiment": art["sentiment"],
-                    "created_at": art["created_at"],
-                    "is_ai_rewritten": is_ai_rewritten
-                })
+                # Only the full body needs the (slow) on-the-fly rewrite
+                if 'content' in fields:
+                    rewritten_summary = art['rewritten_summary']
+                    is_ai_rewritten = art['is_ai_rewritten']
+                    if not is_ai_rewritten and art['original_content']:
+                        try:
+                            rewritten_summary = rewrite_news(art['original_content'], interactive=True)
+                            is_ai_rewritten = 1
+                        except Exception as e:
+                            logger.warning(f"Auto-rewrite failed for article {art['id']}: {e}")
+                            rewritten_summary = rewritten_summary or art['original_content']
+                            is_ai_rewritten = 0
+                    rewritten_summary = bleach.clean(rewritten_summary, tags=[], strip=True)  # ← SANITIZE
+                    art['content'] = (
+                        rewritten_summary + AI_TAG
+                        if is_ai_rewritten
+                        else rewritten_summary or art['original_content']
+                    )
+                    art['is_ai_rewritten'] = is_ai_rewritten
+                articles.append(ARTICLE_FIELDS.render(art, fields))
             conn.close()
             return jsonify(articles), 200
     except Exception as e:
@@ -100,32 +149,26 @@ def get_public_news():
     limit = min(int(request.args.get('limit', 20)), 100)
     offset = int(request.args.get('offset', 0))
     category_id = request.args.get('category_id')
+    fields = PUBLIC_NEWS_FIELDS.parse(request.args)
+    select_list = PUBLIC_NEWS_FIELDS.columns(fields)
     try:
         categories = get_cached_categories()
         category_names = {cat['id']: cat['name'] for cat in categories}
         conn = get_db_connection()
         with conn.cursor() as cursor:
             if category_id:
-                cursor.execute("""
-                    SELECT
-                    id, title, original_content,
-                    COALESCE(rewritten_headline, title) AS rewritten_headline,
-                    rewritten_summary, is_ai_rewritten,
-                    source_url, image_url, category_id, sentiment, created_at, is_breaking
+                cursor.execute(f"""
+                    SELECT {select_list}
                     FROM articles
-                    WHERE category_id = %s AND (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    WHERE category_id = %s AND {VISIBLE_ARTICLES}
                     ORDER BY created_at DESC
                     LIMIT %s OFFSET %s
                 """, (category_id, limit, offset))
             else:
-                cursor.execute("""
-                    SELECT
-                    id, title, original_content,
-                    COALESCE(rewritten_headline, title) AS rewritten_headline,
-                    rewritten_summary, is_ai_rewritten,
-                    source_url, image_url, category_id, sentiment, created_at, is_breaking
+                cursor.execute(f"""
+                    SELECT {select_list}
                     FROM articles
-                    WHERE (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    WHERE {VISIBLE_ARTICLES}
                     ORDER BY created_at DESC
                     LIMIT %s OFFSET %s
                 """, (limit, offset))
@@ -133,24 +176,9 @@ def get_public_news():
             conn.close()
             articles = []
             for art in raw_articles:
-                if art['is_ai_rewritten'] and art['rewritten_summary']:
-                    content = art['rewritten_summary'] + ' [This article was rewritten using A.I]'
-                elif art['rewritten_summary']:
-                    content = art['rewritten_summary']
-                else:
-                    content = art['original_content'] or ""
-                articles.append({
-                    "id": art["id"],
-                    "title": art["rewritten_headline"],
-                    "content": content,
-                    "source_url": art["source_url"],
-                    "image_url": art["image_url"],
-                    "category_id": art["category_id"],
-                    "sentiment": art["sentiment"],
-                    "created_at": art["created_at"],
-                    "is_breaking": art["is_breaking"],
-                    "category_name": category_names.get(art["category_id"], "General")
-                })
+                if 'category_name' in fields:
+                    art['category_name'] = category_names.get(art["category_id"], "General")
+                articles.append(PUBLIC_NEWS_FIELDS.render(art, fields))
             return jsonify({
                 "articles": articles,
                 "categories": [{'id': k, 'name': v} for k, v in category_names.items()],
@@ -162,6 +190,101 @@ def get_public_news():
         logger.error(f"Public news error: {e}")
         return jsonify({"error": "Failed to fetch news"}), 500
 
+@articles_bp.route('/api/v1/articles/search', methods=['GET'])
+def search_articles():
+    """BM25 search over headlines and summaries; card view unless fields/view given."""
+    query = (request.args.get('q') or '').strip()[:200]
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    limit = min(int(request.args.get('limit', 20)), 50)
+    category_id = request.args.get('category_id', type=int)
+    if request.args.get('fields') or request.args.get('view'):
+        fields = PUBLIC_NEWS_FIELDS.parse(request.args)
+    else:
+        fields = PUBLIC_NEWS_FIELDS.card
+    try:
+        hits, next_cursor = search_index.search(query, category_id=category_id, limit=limit,
+                                                cursor=request.args.get('cursor'))
+        articles = []
+        if hits:
+            ids = [article_id for article_id, _ in hits]
+            placeholders = ','.join(['%s'] * len(ids))
+            conn = get_db_connection()
+            with conn.cursor() as cursor:
+                # Primary-key lookups only; blocked articles drop out here
+                cursor.execute(f"""
+                    SELECT {PUBLIC_NEWS_FIELDS.columns(fields, extra=['id'])}
+                    FROM articles
+                    WHERE id IN ({placeholders}) AND {VISIBLE_ARTICLES}
+                """, ids)
+                rows = {row['id']: row for row in cursor.fetchall()}
+            conn.close()
+            category_names = {cat['id']: cat['name'] for cat in get_cached_categories()}
+            for article_id in ids:
+                art = rows.get(article_id)
+                if not art:
+                    continue
+                if 'category_name' in fields:
+                    art['category_name'] = category_names.get(art["category_id"], "General")
+                articles.append(PUBLIC_NEWS_FIELDS.render(art, fields))
+        return jsonify({
+            "articles": articles,
+            "query": query,
+            "next_cursor": next_cursor
+        }), 200
+    except Exception as e:
+        logger.error(f"Article search error: {e}")
+        return jsonify({"error": "Search failed"}), 500
+
+@articles_bp.route('/api/v1/articles/<int:article_id>', methods=['GET'])
+def get_article_detail(article_id):
+    """Single article with its full body (listing endpoints can stay card-sized)."""
+    cached = article_cache.get(article_id)
+    if cached is None:
+        try:
+            conn = get_db_connection()
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT
+                    id, title, original_content,
+                    COALESCE(rewritten_headline, title) AS rewritten_headline,
+                    rewritten_summary, is_ai_rewritten,
+                    source_url, image_url, category_id, sentiment, created_at, is_breaking
+                    FROM articles
+                    WHERE id = %s AND {VISIBLE_ARTICLES}
+                """, (article_id,))
+                art = cursor.fetchone()
+            conn.close()
+        except Exception as e:
+            logger.error(f"Article detail error: {e}")
+            return jsonify({"error": "Failed to fetch article"}), 500
+        if not art:
+            return jsonify({"error": "Article not found"}), 404
+        category_names = {cat['id']: cat['name'] for cat in get_cached_categories()}
+        body = current_app.json.dumps({
+            "id": art["id"],
+            "title": art["rewritten_headline"],
+            "original_title": art["title"],
+            "content": public_content(art),
+            "source_url": art["source_url"],
+            "image_url": art["image_url"],
+            "category_id": art["category_id"],
+            "category_name": category_names.get(art["category_id"], "General"),
+            "sentiment": art["sentiment"],
+            "created_at": art["created_at"],
+            "is_breaking": art["is_breaking"],
+            "is_ai_rewritten": art["is_ai_rewritten"]
+        }).encode('utf-8')
+        cached = article_cache.set(article_id, body)
+
+    body, etag = cached
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    # Answers If-None-Match with 304 (weak comparison, so compressed variants match too)
+    return response.make_conditional(request)
+
 @articles_bp.route('/api/v1/public/categories', methods=['GET'])
 def get_public_categories():
     try:
@@ -4,11 +4,19 @@ from utils.auth import require_auth
 from feed.feed_algorithm import calculate_item_score
 from utils.db import get_db_connection
 from utils.user_interest import get_dynamic_category_scores  # 👈 NEW IMPORT
+from utils.fieldsets import SNIPPET_LENGTH, SNIPPET_SQL, parse_fields, project
 import logging
 
 logger = logging.getLogger(__name__)
 feed_bp = Blueprint('feed', __name__)
 
+FEED_FIELDS = ('type', 'id', 'title', 'content', 'snippet', 'author', 'created_at', 'source_url',
+               'image_url', 'category_id', 'is_ai_rewritten', 'is_breaking', 'likes_count',
+               'comments_count', 'score')
+FEED_FULL_FIELDS = tuple(f for f in FEED_FIELDS if f != 'snippet')
+FEED_CARD_FIELDS = ('type', 'id', 'title', 'snippet', 'author', 'created_at', 'image_url',
+                    'category_id', 'is_breaking', 'likes_count', 'comments_count', 'score')
+
 @feed_bp.route('/api/v1/feed', methods=['GET'])
 def get_unified_feed():
     user_id = require_auth()
@@ -19,6 +27,7 @@ def get_unified_feed():
     offset = int(request.args.get('offset', 0))
     feed_type = request.args.get('type', '').lower()
     category_id = request.args.get('category_id')
+    fields = parse_fields(request.args, FEED_FIELDS, FEED_FULL_FIELDS, FEED_CARD_FIELDS, always=('type', 'id'))
     if category_id is not None:
         try:
             category_id = int(category_id)
@@ -64,6 +73,7 @@ def get_unified_feed():
                     "content": p["content"],
                     "author": p["author"],
                     "created_at": p["created_at"].isoformat() if hasattr(p["created_at"], 'isoformat') else str(p["created_at"]),
+                    "snippet": (p["content"] or "")[:SNIPPET_LENGTH],
                     "likes_count": p["likes_count"] or 0,
                     "comments_count": p["comments_count"] or 0,
                     "image_url": p.get("image_url", ""),
@@ -78,13 +88,18 @@ def get_unified_feed():
             if category_id is not None:
                 where_clause += " AND category_id = %s"
                 params = [category_id, limit * 3]
+            # Only project the article body when the client asked for it
+            body_select = ""
+            if 'content' in fields:
+                body_select += """CASE WHEN is_ai_rewritten = 1
+                            THEN CONCAT(rewritten_summary, ' [This article was rewritten using A.I]')
+                            ELSE rewritten_summary END AS content, """
+            if 'snippet' in fields:
+                body_select += f"{SNIPPET_SQL}, "
             cursor.execute(f"""
                 SELECT 'article' AS type, id,
                        COALESCE(rewritten_headline, title) AS title,
-                       CASE WHEN is_ai_rewritten = 1
-                            THEN CONCAT(rewritten_summary, ' [This article was rewritten using A.I]')
-                            ELSE rewritten_summary END AS content,
-                       'News Source' AS author, created_at, source_url, image_url, category_id, is_ai_rewritten, is_breaking
+                       {body_select}'News Source' AS author, created_at, source_url, image_url, category_id, is_ai_rewritten, is_breaking
                 FROM articles
                 WHERE {where_clause}
                 ORDER BY created_at DESC
@@ -96,7 +111,8 @@ def get_unified_feed():
                     "type": "article",
                     "id": a["id"],
                     "title": a["title"],
-                    "content": a["content"],
+                    "content": a.get("content"),
+                    "snippet": a.get("snippet"),
                     "author": a["author"],
                     "created_at": a["created_at"].isoformat() if hasattr(a["created_at"], 'isoformat') else str(a["created_at"]),
                     "source_url": a.get("source_url"),
@@ -122,7 +138,7 @@ def get_unified_feed():
             scored.append(item)
 
         scored.sort(key=lambda x: x['score'], reverse=True)
-        paginated = scored[offset:offset + limit]
+        paginated = [project(item, fields, keep=('type', 'id')) for item in scored[offset:offset + limit]]
 
         return jsonify({
             "items": paginated,
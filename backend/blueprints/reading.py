@@ -2,9 +2,30 @@
 from flask import Blueprint, jsonify, request
 from utils.auth import require_auth
 from utils.db import get_db_connection
+from utils.fieldsets import Fieldset, column, SNIPPET_SQL
 
 reading_bp = Blueprint('reading', __name__)
 
+FOR_YOU_FIELDS = Fieldset(
+    fields={
+        'id': (['id'], column('id')),
+        'title': (['title'], column('title')),
+        'rewritten_headline': (['COALESCE(rewritten_headline, title) AS rewritten_headline'], column('rewritten_headline')),
+        'rewritten_summary': (['rewritten_summary'], column('rewritten_summary')),
+        'content': (["""CASE WHEN is_ai_rewritten = 1 THEN CONCAT(rewritten_summary, ' [This article was rewritten using A.I]')
+                           ELSE rewritten_summary END AS content"""], column('content')),
+        'snippet': ([SNIPPET_SQL], column('snippet')),
+        'source_url': (['source_url'], column('source_url')),
+        'image_url': (['image_url'], column('image_url')),
+        'category_id': (['category_id'], column('category_id')),
+        'sentiment': (['sentiment'], column('sentiment')),
+        'created_at': (['created_at'], column('created_at')),
+    },
+    full=('id', 'title', 'rewritten_headline', 'rewritten_summary', 'content', 'source_url',
+          'image_url', 'category_id', 'sentiment', 'created_at'),
+    card=('id', 'rewritten_headline', 'snippet', 'image_url', 'category_id', 'created_at'),
+)
+
 @reading_bp.route('/api/v1/user/for-you', methods=['GET'])
 def get_personalized_feed():
     user_id = require_auth()
@@ -12,6 +33,8 @@ def get_personalized_feed():
         return jsonify({"error": "Authentication required"}), 401
     limit = min(int(request.args.get('limit', 20)), 100)
     offset = int(request.args.get('offset', 0))
+    fields = FOR_YOU_FIELDS.parse(request.args)
+    select_list = FOR_YOU_FIELDS.columns(fields)
     try:
         conn = get_db_connection()
         with conn.cursor() as cursor:
@@ -21,11 +44,7 @@ def get_personalized_feed():
                 category_ids = [p['category_id'] for p in prefs]
                 placeholders = ','.join(['%s'] * len(category_ids))
                 cursor.execute(f"""
-                    SELECT id, title, COALESCE(rewritten_headline, title) AS rewritten_headline,
-                           rewritten_summary,
-                           CASE WHEN is_ai_rewritten = 1 THEN CONCAT(rewritten_summary, ' [This article was rewritten using A.I]')
-                           ELSE rewritten_summary END AS content,
-                           source_url, image_url, category_id, sentiment, created_at
+                    SELECT {select_list}
                     FROM articles
                     WHERE category_id IN ({placeholders}) AND sentiment = 'POSITIVE'
                     AND (blocked_legacy IS NULL OR blocked_legacy = 0)
@@ -34,19 +53,15 @@ def get_personalized_feed():
                     LIMIT %s OFFSET %s
                 """, category_ids + [limit, offset])
             else:
-                cursor.execute("""
-                    SELECT id, title, COALESCE(rewritten_headline, title) AS rewritten_headline,
-                           rewritten_summary,
-                           CASE WHEN is_ai_rewritten = 1 THEN CONCAT(rewritten_summary, ' [This article was rewritten using A.I]')
-                           ELSE rewritten_summary END AS content,
-                           source_url, image_url, category_id, sentiment, created_at
+                cursor.execute(f"""
+                    SELECT {select_list}
                     FROM articles
                     WHERE sentiment = 'POSITIVE' AND (blocked_legacy IS NULL OR blocked_legacy = 0)
                     AND LENGTH(COALESCE(rewritten_summary, original_content)) >= 300
                     ORDER BY (UNIX_TIMESTAMP(created_at) + (3600 * is_ai_rewritten)) DESC
                     LIMIT %s OFFSET %s
                 """, (limit, offset))
-            articles = cursor.fetchall()
+            articles = [FOR_YOU_FIELDS.render(art, fields) for art in cursor.fetchall()]
         conn.close()
         return jsonify(articles), 200
     except Exception as e:
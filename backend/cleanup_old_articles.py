@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
+import os
 import sys
 import pymysql
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.article_cache import invalidate_articles
+
 def cleanup_old_articles(days):
     conn = pymysql.connect(
         host='127.0.0.1',
@@ -16,6 +20,8 @@ def cleanup_old_articles(days):
         deleted = cursor.rowcount
         
     conn.close()
+    if deleted:
+        invalidate_articles()
     print(f"Deleted {deleted} articles older than {days} days")
     return deleted
 
@@ -5,9 +5,12 @@ Shows what would be flagged without making changes
 """
 import pymysql
 import os
-import re
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.content_filter import LEGACY_HARMFUL_STRICT
+
 load_dotenv()
 
 # Database connection
@@ -18,10 +21,8 @@ DB_NAME = os.getenv('DB_NAME', 'newsapp')
 
 def improved_is_harmful_content(title, content):
     """Improved harmful content detection with word boundaries and variants"""
-    harmful_pattern = r'\b(suicid|kill|murder|murd|blast|explod|massacr|rape|corpse|body\s+count|assault|attack)\w*\b'
-    text_to_check = f"{title} {content}".lower()
-    match = re.search(harmful_pattern, text_to_check, re.IGNORECASE)
-    return bool(match), match.group(0) if match else None
+    match = LEGACY_HARMFUL_STRICT.search(title, content)
+    return bool(match), match[1] if match else None
 
 def dry_run_cleanup():
     """DRY RUN: Show what would be flagged without making changes"""
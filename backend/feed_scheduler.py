@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Adaptive RSS polling scheduler.
+
+Long-running replacement for cron-driven `rss_processor_v3.py` runs: every
+source is polled on its own interval, learned from how often it publishes
+and scaled by its `priority` in rss_sources.json (see utils/feed_schedule.py).
+
+Usage:
+    python3 feed_scheduler.py            # run forever
+    python3 feed_scheduler.py --once     # poll whatever is due now, then exit
+    python3 feed_scheduler.py --table    # print the next-poll table
+"""
+import os
+import sys
+import time
+import signal
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.feed_schedule import sync_sources, due_urls, next_due_at, record_poll, get_schedule
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on one idle sleep, so source list edits are picked up promptly
+SCHED_MAX_SLEEP = int(os.getenv('SCHED_MAX_SLEEP', 30))
+
+_running = True
+
+
+def _stop(signum, frame):
+    global _running
+    logger.info(f"Received signal {signum}, stopping after the current cycle")
+    _running = False
+
+
+def load_sources():
+    """Re-read rss_sources.json so enabling/disabling a source needs no restart."""
+    import rss_processor_v3 as processor
+    sources = processor.load_rss_sources(processor.JSON_PATH)
+    if sources and sources.get('general'):
+        return processor.get_active_sources(sources, 'general')
+    return processor.get_general_sources()
+
+
+def run_cycle():
+    """Poll every due source once. Returns the number of sources polled."""
+    import rss_processor_v3 as processor
+
+    sources = load_sources()
+    sync_sources(sources)
+    due = set(due_urls())
+    batch = [s for s in sources if s['url'] in due]
+    if not batch:
+        return 0
+
+    logger.info(f"Polling {len(batch)} due sources")
+    results = processor.process_sources(batch)
+
+    for source, outcome in results:
+        interval = record_poll(source['url'], outcome)
+        logger.info(f"{source['source_name']}: {outcome['status']}, {outcome['new_entries']} new, "
+                    f"{outcome['processed']} saved, next poll in {int(interval or 0)}s")
+    return len(batch)
+
+
+def run_forever():
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    logger.info("Feed scheduler started")
+    while _running:
+        try:
+            run_cycle()
+        except Exception as e:
+            logger.error(f"Scheduler cycle failed: {e}")
+        next_at = next_due_at()
+        delay = SCHED_MAX_SLEEP if next_at is None else min(SCHED_MAX_SLEEP, max(1, next_at - time.time()))
+        # Sleep in short steps so a stop signal is honoured quickly
+        end = time.time() + delay
+        while _running and time.time() < end:
+            time.sleep(min(1, end - time.time()))
+    logger.info("Feed scheduler stopped")
+
+
+def print_table():
+    print(f"{'SOURCE':<28} {'PRI':>3} {'CADENCE':>8} {'INTERVAL':>8} {'DUE IN':>7} {'FAILS':>5} {'IDLE':>4}  STATUS")
+    for row in get_schedule():
+        print(f"{(row['source_name'] or row['url'])[:28]:<28} {row['priority']:>3} "
+              f"{int(row['cadence']):>7}s {int(row['interval']):>7}s {row['due_in']:>6}s "
+              f"{row['failures']:>5} {row['idle_polls']:>4}  {row['last_status'] or '-'}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == '--table':
+        print_table()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--once':
+        polled = run_cycle()
+        print(f"Polled {polled} sources")
+    else:
+        run_forever()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Ingestion Replay Harness
+Runs the real ingestion pipeline (fetch, dedup, download, parse, classify,
+rewrite, save) against local servers instead of live news sites and Groq,
+so throughput work can be measured offline and repeated.
+
+- Feed XML and article HTML are served from recorded fixtures (or generated
+  ones) by a local HTTP server with configurable latency and failure rate.
+  Sources are spread over several loopback addresses (127.0.0.2, .3, ...)
+  so the fetcher's per-host politeness limits apply as they do in production.
+- A fake OpenAI-compatible /v1/chat/completions endpoint answers the
+  classify/rewrite prompts (keyword classifier, canned rewrite), with its
+  own latency, failure rate and requests/minute limit. The processor talks
+  to it through GROQ_BASE_URL, so the LLM client, its rate limiting and
+  retries are exercised too.
+- Articles are saved through save_articles (in-memory SQLite unless --mysql).
+
+Fixtures live in --fixtures: index.json lists the feeds (file, source name,
+category) and maps each recorded article URL to its saved page.
+
+Usage:
+    python3 ingestion_replay.py --record 10                # record 10 general feeds and their pages
+    python3 ingestion_replay.py                            # replay fixtures/replay
+    python3 ingestion_replay.py --synthetic 20 --entries 15
+    python3 ingestion_replay.py --synthetic 20 --latency 150 --fail-rate 0.05 --llm-latency 400
+    python3 ingestion_replay.py --synthetic 20 --json      # machine-readable report
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+from collections import Counter, deque
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_FIXTURES = os.path.join(BACKEND_DIR, 'fixtures', 'replay')
+
+
+# --- Fixtures ---------------------------------------------------------------
+
+def record_fixtures(directory, feed_count, entries):
+    """Save up to `feed_count` general feeds and the first `entries` article pages of each."""
+    import feedparser
+    from utils.http_fetcher import get_fetcher
+    from rss_manager import load_rss_sources
+
+    os.makedirs(os.path.join(directory, 'feeds'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'pages'), exist_ok=True)
+    sources = (load_rss_sources(os.path.join(BACKEND_DIR, 'rss_sources.json')) or {}).get('general', [])
+    fetcher = get_fetcher()
+    index = {'feeds': [], 'pages': {}}
+
+    for source in sources:
+        if len(index['feeds']) >= feed_count:
+            break
+        if not source.get('enabled', True):
+            continue
+        try:
+            response = fetcher.get(source['url'])
+            response.raise_for_status()
+        except Exception as e:
+            print(f"  skip feed {source['url']}: {e}")
+            continue
+        name = f"{hashlib.md5(source['url'].encode()).hexdigest()[:10]}.xml"
+        with open(os.path.join(directory, 'feeds', name), 'wb') as f:
+            f.write(response.content)
+        index['feeds'].append({'file': f"feeds/{name}", 'source_name': source.get('source_name', name),
+                               'category': source.get('category', 'General'), 'url': source['url']})
+
+        for entry in feedparser.parse(response.content).entries[:entries]:
+            link = getattr(entry, 'link', None)
+            if not link or link in index['pages']:
+                continue
+            try:
+                page = fetcher.get(link)
+                page.raise_for_status()
+            except Exception as e:
+                print(f"  skip page {link}: {e}")
+                continue
+            page_name = f"pages/{hashlib.md5(link.encode()).hexdigest()[:12]}.html"
+            with open(os.path.join(directory, page_name), 'wb') as f:
+                f.write(page.content)
+            index['pages'][link] = page_name
+
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump(index, f, indent=2)
+    print(f"Recorded {len(index['feeds'])} feeds and {len(index['pages'])} pages to {directory}")
+
+
+def load_fixtures(directory):
+    """[{'source_name', 'category', 'feed': bytes, 'pages': {recorded url: bytes}}] from --fixtures."""
+    index_path = os.path.join(directory, 'index.json')
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path) as f:
+        index = json.load(f)
+    pages = {}
+    for url, name in index.get('pages', {}).items():
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                pages[url] = f.read()
+
+    feeds = []
+    for feed in index.get('feeds', []):
+        with open(os.path.join(directory, feed['file']), 'rb') as f:
+            body = f.read()
+        feeds.append({
+            'source_name': feed['source_name'],
+            'category': feed.get('category', 'General'),
+            'feed': body,
+            # Only the pages this feed links to (the URL appears in the XML, possibly &amp;-escaped)
+            'pages': {url: html for url, html in pages.items()
+                      if url.encode() in body or escape(url).encode() in body},
+        })
+    return feeds
+
+
+_WORDS = ('river school council farmers market village hospital bridge festival students water solar '
+          'library park district volunteers museum railway harbour clinic forest monsoon orchard '
+          'engineers teachers startup rescue coast highway theatre stadium garden research campus').split()
+_GOOD = ('launched a new programme', 'won a national award', 'celebrated a successful season',
+         'unveiled an innovation', 'reported record achievements')
+_BAD = ('reported an accident', 'faced violence overnight', 'investigated a crime',
+        'recorded injured residents', 'responded to an attack')
+
+
+def _story(rng, n):
+    """Title and body paragraphs; the random word mix keeps stories from being near-duplicates."""
+    subject = ' '.join(rng.sample(_WORDS, 2))
+    event = rng.choice(_GOOD if rng.random() < 0.6 else _BAD)
+    title = f"{subject.title()} {event} ({n})"
+    paragraphs = []
+    for _ in range(rng.randint(8, 20)):
+        words = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(18, 30)))
+        paragraphs.append(f"{words.capitalize()} as the {subject} {event}.")
+    return title, paragraphs
+
+
+def make_synthetic_fixtures(feed_count, entries, seed=42):
+    """Generated feeds and news-site shaped pages; every fourth feed carries full text."""
+    rng = random.Random(seed)
+    chrome = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(120))
+    feeds = []
+    for f in range(feed_count):
+        full_text = f % 4 == 3
+        items, pages = [], {}
+        for n in range(entries):
+            url = f"https://replay-{f}.example/news/{n}"
+            title, paragraphs = _story(rng, n)
+            image = f"https://replay-{f}.example/img/{n}.jpg"
+            extra = ''
+            if full_text:
+                extra = (f'<content:encoded><![CDATA[{"".join(f"<p>{p}</p>" for p in paragraphs)}]]></content:encoded>'
+                         f'<media:content url="{image}" type="image/jpeg"/>')
+            items.append(f'<item><title>{escape(title)}</title><link>{url}</link><guid>{url}</guid>'
+                         f'<pubDate>{formatdate(1700000000 + n * 900 + f * 60)}</pubDate>'
+                         f'<description>{escape(paragraphs[0][:200])}...</description>{extra}</item>')
+            body = ''.join(f'<p>{p}</p>' for p in paragraphs)
+            pages[url] = (f'<html><head><title>{escape(title)}</title><meta property="og:image" content="{image}">'
+                          f'<script>var x = 1;</script></head><body><header><nav><ul>{chrome}</ul></nav></header>'
+                          f'<article><h1>{escape(title)}</h1>{body}</article>'
+                          f'<footer><ul>{chrome}</ul></footer></body></html>').encode()
+        feed = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" '
+                'xmlns:content="http://purl.org/rss/1.0/modules/content/" xmlns:media="http://search.yahoo.com/mrss/">'
+                f'<channel><title>Replay {f}</title><link>https://replay-{f}.example/</link>'
+                f'{"".join(items)}</channel></rss>').encode()
+        feeds.append({'source_name': f"Replay {f}", 'category': 'General', 'feed': feed, 'pages': pages})
+    return feeds
+
+
+# --- Servers ----------------------------------------------------------------
+
+class ReplayServer:
+    """
+    Serves the fixtures on one port across `host_count` loopback addresses,
+    plus the fake LLM endpoint on 127.0.0.1. Keeps request/failure counts.
+    """
+
+    def __init__(self, fixtures, host_count=8, latency_ms=0, jitter_ms=0, fail_rate=0.0,
+                 llm_latency_ms=0, llm_fail_rate=0.0, llm_rpm=0, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = fail_rate
+        self.llm_latency_ms = llm_latency_ms
+        self.llm_fail_rate = llm_fail_rate
+        self.llm_rpm = llm_rpm
+        self.routes = {}
+        self.sources = []
+        self.counts = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._llm_calls = deque()
+        self._servers = []
+        self._start(host_count)
+        self._load(fixtures)
+
+    def _start(self, host_count):
+        handler = type('Handler', (_ReplayHandler,), {'replay': self})
+        first = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.port = first.server_address[1]
+        self._servers.append(first)
+        self.hosts = []
+        for k in range(2, 2 + host_count):
+            try:
+                self._servers.append(ThreadingHTTPServer((f'127.0.0.{k}', self.port), handler))
+                self.hosts.append(f'127.0.0.{k}')
+            except OSError:
+                # Only 127.0.0.1 is configured (e.g. macOS): every source shares one host
+                break
+        self.hosts = self.hosts or ['127.0.0.1']
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def _load(self, fixtures):
+        for i, fixture in enumerate(fixtures):
+            base = f"http://{self.hosts[i % len(self.hosts)]}:{self.port}"
+            feed = fixture['feed']
+            # Longest URL first so a link that prefixes another (/news/1, /news/10) is not half-replaced
+            pages = sorted(fixture['pages'].items(), key=lambda page: len(page[0]), reverse=True)
+            for n, (url, html) in enumerate(pages):
+                local = f"{base}/pages/{i}/{n}.html"
+                self.routes[f"/pages/{i}/{n}.html"] = (html, 'text/html; charset=utf-8')
+                feed = feed.replace(escape(url).encode(), local.encode()).replace(url.encode(), local.encode())
+            self.routes[f"/feeds/{i}.xml"] = (feed, 'application/rss+xml')
+            self.sources.append({'url': f"{base}/feeds/{i}.xml", 'source_name': fixture['source_name'],
+                                 'category': fixture['category'], 'enabled': True})
+
+    @property
+    def llm_base_url(self):
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def delay(self, latency_ms):
+        if latency_ms or self.jitter_ms:
+            with self._lock:
+                jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            time.sleep(max(0.0, latency_ms + jitter) / 1000)
+
+    def should_fail(self, rate):
+        with self._lock:
+            return rate > 0 and self._rng.random() < rate
+
+    def count(self, key, amount=1):
+        with self._lock:
+            self.counts[key] += amount
+
+    def llm_slot(self):
+        """(allowed, retry_after_seconds, remaining) under the fake provider's requests/minute limit."""
+        if not self.llm_rpm:
+            return True, 0.0, 1000
+        now = time.monotonic()
+        with self._lock:
+            while self._llm_calls and now - self._llm_calls[0] >= 60:
+                self._llm_calls.popleft()
+            if len(self._llm_calls) >= self.llm_rpm:
+                return False, 60 - (now - self._llm_calls[0]), 0
+            self._llm_calls.append(now)
+            return True, 0.0, self.llm_rpm - len(self._llm_calls)
+
+    def close(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+
+
+_TITLE_RE = re.compile(r'^Title: (.*)$', re.MULTILINE)
+_CONTENT_RE = re.compile(r'^Content: (.*)$', re.MULTILINE)
+_BATCH_RE = re.compile(r'\[ID (\d+)\]\nTitle: (.*)\nCategory: .*\nContent: (.*)')
+
+
+def fake_completion(prompt):
+    """Answer the processor's classify / batch classify / rewrite prompts the way the model would."""
+    import rss_processor_v3 as processor
+
+    if 'Return ONLY a JSON array' in prompt:
+        results = []
+        for item_id, title, content in _BATCH_RE.findall(prompt):
+            category, sentiment, reason = processor.parse_analysis_response(processor.mock_analysis(title, content))
+            results.append({'id': int(item_id), 'category': category, 'sentiment': sentiment, 'reason': reason})
+        return json.dumps(results)
+    if 'HEADLINE:' in prompt:
+        title = (_TITLE_RE.search(prompt.replace('Original Title', 'Title')) or [None, 'Local update'])[1]
+        return (f"HEADLINE: Community responds to {title[:80]}\n"
+                "SUMMARY: Residents, volunteers and local services worked together after the event. "
+                "Support programmes were set up and officials shared the steps being taken to help "
+                "the people affected and to prevent a repeat.")
+    title = _TITLE_RE.search(prompt)
+    content = _CONTENT_RE.search(prompt)
+    return processor.mock_analysis(title[1] if title else '', content[1] if content else '')
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    replay = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='text/plain', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        replay = self.replay
+        kind = 'feed' if self.path.startswith('/feeds/') else 'page'
+        replay.count(f"{kind}_requests")
+        replay.delay(replay.latency_ms)
+        route = replay.routes.get(self.path)
+        if route is None:
+            replay.count('not_found')
+            return self._send(404, b'not found')
+        if replay.should_fail(replay.fail_rate):
+            replay.count(f"{kind}_failures")
+            return self._send(503, b'injected failure')
+        body, content_type = route
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            replay.count('not_modified')
+            return self._send(304, headers={'ETag': etag})
+        replay.count('bytes_served', len(body))
+        self._send(200, body, content_type, {'ETag': etag})
+
+    def do_POST(self):
+        replay = self.replay
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.path.rstrip('/') != '/v1/chat/completions':
+            return self._send(404, b'not found')
+        replay.count('llm_requests')
+        allowed, retry_after, remaining = replay.llm_slot()
+        limits = {'x-ratelimit-limit-requests': str(replay.llm_rpm or 1000),
+                  'x-ratelimit-remaining-requests': str(remaining),
+                  'x-ratelimit-reset-requests': f"{retry_after:.2f}s"}
+        if not allowed:
+            replay.count('llm_rate_limited')
+            return self._send(429, b'{"error": "rate limited"}', 'application/json',
+                              dict(limits, **{'retry-after': f"{retry_after:.2f}"}))
+        replay.delay(replay.llm_latency_ms)
+        if replay.should_fail(replay.llm_fail_rate):
+            replay.count('llm_failures')
+            return self._send(503, b'{"error": "injected failure"}', 'application/json', limits)
+
+        prompt = '\n'.join(m.get('content') or '' for m in payload.get('messages', []))
+        content = fake_completion(prompt)
+        body = json.dumps({
+            'id': f"replay-{time.monotonic_ns()}",
+            'object': 'chat.completion',
+            'model': payload.get('model'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(content) // 4},
+        }).encode()
+        self._send(200, body, 'application/json', limits)
+
+
+# --- Driver -----------------------------------------------------------------
+
+def run_replay(server):
+    """Run one ingestion pass over the sources `server` serves and return the report dict."""
+    import rss_processor_v3 as processor
+    from utils.llm_client import get_llm_client
+
+    # DB writes: the save stage's batches, timed where they hit the database
+    writes = {'batches': 0, 'rows': 0, 'seconds': 0.0}
+    save_articles = processor.save_articles
+
+    def timed_save(articles, db_conn=None):
+        started = time.perf_counter()
+        try:
+            return save_articles(articles, db_conn)
+        finally:
+            writes['batches'] += 1
+            writes['rows'] += len(articles)
+            writes['seconds'] += time.perf_counter() - started
+
+    processor.save_articles = timed_save
+    try:
+        run = processor.IngestionRun(server.sources)
+        started = time.perf_counter()
+        results = run.run()
+        elapsed = time.perf_counter() - started
+    finally:
+        processor.save_articles = save_articles
+
+    saved = sum(outcome['processed'] for _, outcome in results)
+    entries = sum(outcome['entries'] for _, outcome in results)
+    return {
+        'sources': len(server.sources),
+        'hosts': min(len(server.hosts), len(server.sources)),
+        'entries': entries,
+        'articles_saved': saved,
+        'elapsed_seconds': round(elapsed, 2),
+        'articles_per_sec': round(saved / elapsed, 2) if elapsed else 0.0,
+        'entries_per_sec': round(entries / elapsed, 2) if elapsed else 0.0,
+        'counters': run.metrics.counters(),
+        'stage_metrics': run.metrics.stage_totals(),
+        'db_writes': {'batches': writes['batches'], 'rows': writes['rows'],
+                      'avg_batch_ms': round(1000 * writes['seconds'] / writes['batches'], 1) if writes['batches'] else 0.0},
+        'server': dict(server.counts),
+        'llm': get_llm_client().stats(),
+        'stages': run.stats['stages'] if run.stats else {},
+    }
+
+
+def print_report(report):
+    print(f"\nReplayed {report['sources']} sources over {report['hosts']} hosts: "
+          f"{report['entries']} entries, {report['articles_saved']} articles saved in {report['elapsed_seconds']}s")
+    print(f"Throughput: {report['articles_per_sec']} articles/sec, {report['entries_per_sec']} entries/sec")
+    print("Counters: " + ', '.join(f"{k}={v}" for k, v in report['counters'].items()))
+    db = report['db_writes']
+    print(f"DB writes: {db['batches']} batches, {db['rows']} rows, {db['avg_batch_ms']} ms/batch")
+    llm = report['llm']
+    print(f"LLM: {llm['calls']} calls, {llm['retries']} retries, {llm['rate_limited']} rate limited, "
+          f"{llm['errors']} errors, avg {llm['avg_latency_ms']} ms, max {llm['max_latency_ms']} ms")
+    print("Server: " + ', '.join(f"{k}={v}" for k, v in sorted(report['server'].items())))
+
+    print(f"\n{'stage':<10} {'workers':>7} {'in':>6} {'out':>6} {'drop':>5} {'err':>4} "
+          f"{'avg ms':>8} {'max ms':>8} {'wait ms':>8} {'items/s':>8} {'util':>5} {'tokens':>8} {'cache':>6}")
+    print("-" * 100)
+    for name, stage in report['stages'].items():
+        metrics = report['stage_metrics'].get(name, {})
+        tokens = metrics.get('prompt_tokens', 0) + metrics.get('completion_tokens', 0)
+        print(f"{name:<10} {stage['workers']:>7} {stage['items_in']:>6} {stage['items_out']:>6} "
+              f"{stage['dropped']:>5} {stage['errors']:>4} {stage['avg_latency_ms']:>8} {stage['max_latency_ms']:>8} "
+              f"{stage['avg_queue_wait_ms']:>8} {stage['throughput_per_sec']:>8} {stage['utilisation']:>5} "
+              f"{tokens:>8} {metrics.get('cache_hits', 0):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay ingestion against local feed and LLM servers")
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='Directory with index.json, feeds/ and pages/')
+    parser.add_argument('--record', type=int, metavar='N', help='Record N general feeds (and their pages) first')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='Use N generated feeds instead of fixtures')
+    parser.add_argument('--entries', type=int, default=10, help='Entries per generated feed / pages recorded per feed')
+    parser.add_argument('--hosts', type=int, default=8, help='Loopback addresses to spread sources over')
+    parser.add_argument('--latency', type=float, default=50, help='Feed/page response latency (ms)')
+    parser.add_argument('--jitter', type=float, default=20, help='Uniform +/- latency jitter (ms)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of feed/page requests answered 503')
+    parser.add_argument('--llm-latency', type=float, default=300, help='Fake LLM response latency (ms)')
+    parser.add_argument('--llm-fail-rate', type=float, default=0.0, help='Share of LLM requests answered 503')
+    parser.add_argument('--llm-rpm', type=int, default=600, help='Fake LLM requests/minute limit (0 = none)')
+    parser.add_argument('--mysql', action='store_true', help='Save to the DB_* MySQL database instead of SQLite')
+    parser.add_argument('--state-dir', help='STATE_DIR for the run (default: a fresh temporary directory)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='Show the processor log')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixtures, args.record, args.entries)
+        return
+
+    fixtures = make_synthetic_fixtures(args.synthetic, args.entries, args.seed) if args.synthetic else load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error(f"No fixtures in {args.fixtures}; use --record N or --synthetic N")
+
+    # Must be in place before the processor (and its utils) are imported
+    os.environ['STATE_DIR'] = args.state_dir or tempfile.mkdtemp(prefix='ingestion_replay_')
+    os.environ['MOCK_GROQ'] = '0'
+    os.environ['MOCK_DB'] = '0' if args.mysql else '1'
+    os.environ.setdefault('GROQ_API_KEY', 'replay')
+    if args.llm_rpm:
+        os.environ.setdefault('LLM_REQUESTS_PER_MINUTE', str(args.llm_rpm))
+    os.environ.setdefault('LLM_TOKENS_PER_MINUTE', str(10 ** 7))
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Up before the processor is imported: the LLM client reads GROQ_BASE_URL at import
+    server = ReplayServer(fixtures, host_count=args.hosts, latency_ms=args.latency, jitter_ms=args.jitter,
+                          fail_rate=args.fail_rate, llm_latency_ms=args.llm_latency,
+                          llm_fail_rate=args.llm_fail_rate, llm_rpm=args.llm_rpm, seed=args.seed)
+    os.environ['GROQ_BASE_URL'] = server.llm_base_url
+    try:
+        report = run_replay(server)
+    finally:
+        server.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Long-lived ingestion worker.
+
+Takes jobs queued by /admin/refresh-rss (utils/ingestion_jobs.py) and runs
+them in this process, so the web app never blocks on ingestion and the
+processor, its HTTP/LLM sessions and caches are loaded once instead of on
+every trigger. Progress is written to the job every few seconds; a
+heartbeat lets the API report whether a worker is up.
+
+Usage:
+    python3 ingestion_worker.py            # run forever
+    python3 ingestion_worker.py --once     # run whatever is queued, then exit
+    python3 ingestion_worker.py --enqueue  # queue a general refresh and print its job id
+"""
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.ingestion_jobs import (
+    worker_id, enqueue_job, claim_next_job, update_progress, finish_job,
+    heartbeat, remove_worker, requeue_orphaned_jobs
+)
+
+logger = logging.getLogger(__name__)
+
+INGESTION_WORKER_POLL = float(os.getenv('INGESTION_WORKER_POLL', 2))
+INGESTION_PROGRESS_INTERVAL = float(os.getenv('INGESTION_PROGRESS_INTERVAL', 5))
+WORKER_HEARTBEAT_INTERVAL = float(os.getenv('WORKER_HEARTBEAT_INTERVAL', 15))
+
+_running = True
+# Set by a signal: claim no new jobs (the current one still runs to the end)
+_stopping = threading.Event()
+# Set when run_forever exits: the heartbeat keeps going until then, or another
+# worker would take the running job for orphaned and run it a second time
+_stopped = threading.Event()
+
+
+def _stop(signum, frame):
+    global _running
+    logger.info(f"Received signal {signum}, stopping after the current job")
+    _running = False
+    _stopping.set()
+
+
+def _heartbeat_loop(worker, started_at):
+    while not _stopped.wait(WORKER_HEARTBEAT_INTERVAL):
+        try:
+            heartbeat(worker, started_at)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed: {e}")
+
+
+def job_progress(run, sources, started):
+    progress = run.metrics.counters()
+    progress.update({
+        'sources_total': len(sources),
+        'sources_fetched': len(run.feed_runs),
+        'elapsed_seconds': round(time.time() - started, 1),
+    })
+    return progress
+
+
+def run_job(job):
+    """Run one general ingestion pass for `job`; returns the result stored on the job."""
+    import rss_processor_v3 as processor
+    from feed_scheduler import load_sources
+    from utils.feed_schedule import sync_sources, record_poll
+
+    sources = load_sources()
+    run = processor.IngestionRun(sources)
+    started = time.time()
+    done = threading.Event()
+
+    def report():
+        while not done.wait(INGESTION_PROGRESS_INTERVAL):
+            try:
+                update_progress(job['job_id'], job_progress(run, sources, started))
+            except Exception as e:
+                logger.warning(f"Progress update failed for job {job['job_id']}: {e}")
+
+    reporter = threading.Thread(target=report, name='job-progress', daemon=True)
+    reporter.start()
+    try:
+        results = run.run()
+    finally:
+        done.set()
+        reporter.join()
+
+    # A full refresh is also a poll of every source as far as the scheduler is concerned
+    try:
+        sync_sources(sources)
+        for source, outcome in results:
+            record_poll(source['url'], outcome)
+    except Exception as e:
+        logger.warning(f"Could not update the feed schedule: {e}")
+
+    progress = job_progress(run, sources, started)
+    update_progress(job['job_id'], progress)
+    result = dict(progress)
+    result.update({
+        'articles_saved': sum(outcome['processed'] for _, outcome in results),
+        'sources_failed': sum(1 for _, outcome in results if outcome['status'] == 'error'),
+        'pipeline': run.stats,
+        'metrics_run_id': run.metrics.run_id,
+        'stages': run.metrics.stage_totals(),
+    })
+    return result
+
+
+def process_queue(worker):
+    """Run queued jobs until the queue is empty (or a stop is requested). Returns jobs run."""
+    count = 0
+    while _running:
+        job = claim_next_job(worker)
+        if job is None:
+            break
+        logger.info(f"Starting ingestion job {job['job_id']} ({job['kind']})")
+        try:
+            result = run_job(job)
+            finish_job(job['job_id'], result=result)
+            logger.info(f"Ingestion job {job['job_id']} done: {result['articles_saved']} articles saved")
+        except Exception as e:
+            logger.error(f"Ingestion job {job['job_id']} failed: {e}")
+            finish_job(job['job_id'], error=str(e))
+        count += 1
+    return count
+
+
+def run_forever(once=False):
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    worker = worker_id()
+    started_at = time.time()
+    heartbeat(worker, started_at)
+    threading.Thread(target=_heartbeat_loop, args=(worker, started_at), name='heartbeat', daemon=True).start()
+    logger.info(f"Ingestion worker {worker} started")
+    try:
+        while _running:
+            try:
+                requeue_orphaned_jobs()
+                process_queue(worker)
+            except Exception as e:
+                logger.error(f"Worker loop failed: {e}")
+            if once:
+                break
+            _stopping.wait(INGESTION_WORKER_POLL)
+    finally:
+        _stopped.set()
+        remove_worker(worker)
+        logger.info(f"Ingestion worker {worker} stopped")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == '--enqueue':
+        job, created = enqueue_job(requested_by='cli')
+        print(f"{'Queued' if created else 'Already queued'}: {job['job_id']}")
+    else:
+        run_forever(once=len(sys.argv) > 1 and sys.argv[1] == '--once')
@@ -2,16 +2,18 @@
 """
 Investigation script for harmful content in database
 """
-import re
+import os
+import sys
 import requests
 import json
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.content_filter import HARMFUL_CONTENT, LEGACY_HARMFUL
+
 def improved_is_harmful_content(title, content):
     """Improved harmful content detection with word boundaries and variants"""
-    harmful_pattern = r'\b(suicid|kill|murder|murd|blast|explod|massacr|rape|corpse|body\s+count)\w*\b'
-    text_to_check = f"{title} {content}".lower()
-    return bool(re.search(harmful_pattern, text_to_check, re.IGNORECASE))
+    return LEGACY_HARMFUL.search(title, content) is not None
 
 def check_current_articles():
     """Check current articles for harmful content"""
@@ -37,10 +39,7 @@ def check_current_articles():
         created_at = article.get('created_at', '')
         
         # Test with current function logic
-        current_harmful = any(keyword in f"{title} {content}".lower() for keyword in [
-            'suicide', 'murdered', 'killing', 'blast', 'explosion', 'massacre', 
-            'rape', 'graphic violence', 'corpse', 'body count', 'died by suicide'
-        ])
+        current_harmful = HARMFUL_CONTENT.search(title, content) is not None
         
         # Test with improved function
         improved_harmful = improved_is_harmful_content(title, content)
@@ -86,8 +85,14 @@ Run this once to clean up legacy harmful content
 """
 import pymysql
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from utils.article_cache import invalidate_articles
+from utils.search_index import remove_articles
+from utils.content_filter import LEGACY_HARMFUL
+
 load_dotenv()
 
 # Database connection
@@ -114,19 +119,36 @@ def cleanup_harmful_content():
                 ADD COLUMN IF NOT EXISTS blocked_legacy TINYINT(1) DEFAULT 0
             """)
             
-            # Mark harmful articles as blocked_legacy
-            harmful_pattern = r'\\\\b(suicid|kill|murder|murd|blast|explod|massacr|rape|corpse|body\\\\s+count)\\\\w*\\\\b'
+            # Mark harmful articles as blocked_legacy: walk the table by id and
+            # match each batch in Python with the shared compiled filter
+            blocked_ids = []
+            last_id = 0
+            while True:
+                cursor.execute("""
+                    SELECT id, title, original_content FROM articles 
+                    WHERE id > %s
+                    AND created_at < '2025-12-20 00:00:00'
+                    AND (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    ORDER BY id
+                    LIMIT 5000
+                """, (last_id,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                blocked_ids.extend(row[0] for row in rows if LEGACY_HARMFUL.search(row[1], row[2]))
+                last_id = rows[-1][0]
             
-            cursor.execute("""
-                UPDATE articles 
-                SET blocked_legacy = 1 
-                WHERE (title REGEXP %s OR original_content REGEXP %s)
-                AND created_at < '2025-12-20 00:00:00'
-            """, (harmful_pattern, harmful_pattern))
-            
-            affected_rows = cursor.rowcount
+            affected_rows = 0
+            if blocked_ids:
+                placeholders = ','.join(['%s'] * len(blocked_ids))
+                cursor.execute(f"UPDATE articles SET blocked_legacy = 1 WHERE id IN ({placeholders})", blocked_ids)
+                affected_rows = cursor.rowcount
             conn.commit()
             
+            # Drop blocked articles from the API's per-article cache and search index
+            invalidate_articles(blocked_ids)
+            remove_articles(blocked_ids)
+            
             print(f"Marked {affected_rows} legacy articles as blocked")
             
             # Get count of blocked articles
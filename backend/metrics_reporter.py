@@ -8,7 +8,7 @@ import csv
 import logging
 import requests
 import smtplib
-from datetime import datetime
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 from metrics_tracker import get_daily_metrics
@@ -82,6 +82,44 @@ def generate_csv_report(date_str=None):
         logger.error(f"Failed to generate report: {e}")
         return None
 
+STAGE_CSV_FIELDS = ['date', 'source_name', 'stage', 'runs', 'items', 'errors', 'total_ms', 'avg_ms', 'max_ms',
+                    'llm_calls', 'prompt_tokens', 'completion_tokens', 'cache_hits']
+
+def generate_stage_metrics_csv(date_str=None):
+    """Per-source, per-stage ingestion timings for the day (ingestion_stage_metrics)"""
+    from utils.ingestion_metrics import stage_summary
+    
+    if not date_str:
+        date_str = datetime.now().strftime('%Y-%m-%d')
+    
+    os.makedirs('reports', exist_ok=True)
+    csv_path = f"reports/ingestion_stages_{date_str.replace('-', '_')}.csv"
+    
+    try:
+        db_conn = get_db_connection()
+        rows = []
+        if db_conn:
+            day = datetime.strptime(date_str, '%Y-%m-%d')
+            try:
+                rows = stage_summary(db_conn, day, day + timedelta(days=1))
+            finally:
+                db_conn.close()
+        else:
+            logger.warning("No database connection, creating empty stage report")
+        
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=STAGE_CSV_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(dict(row, date=date_str))
+        
+        logger.info(f"Ingestion stage report generated: {csv_path} ({len(rows)} rows)")
+        return csv_path
+        
+    except Exception as e:
+        logger.error(f"Failed to generate stage report: {e}")
+        return None
+
 def send_slack_notification(csv_path, metrics_summary):
     """Send Slack notification if webhook URL is configured"""
     webhook_url = os.getenv('SLACK_WEBHOOK_URL')
@@ -129,6 +167,7 @@ def main():
     """Generate daily report and send notifications"""
     date_str = datetime.now().strftime('%Y-%m-%d')
     csv_path = generate_csv_report(date_str)
+    generate_stage_metrics_csv(date_str)
     
     if csv_path:
         # Create summary for notifications
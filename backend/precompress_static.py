@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Static Asset Precompressor
+Build step: writes `.gz` (and `.br` when brotli is installed) next to every text
+asset in static/, so utils.compression.send_precompressed can serve them without
+compressing per request.
+
+Usage:
+    python3 precompress_static.py                 # compress static/
+    python3 precompress_static.py static other/   # compress several directories
+    python3 precompress_static.py --clean          # remove generated variants
+"""
+import os
+import sys
+import gzip
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Images, fonts and video are already compressed; only text formats benefit
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.mjs', '.json', '.svg', '.txt', '.xml', '.map', '.ico'}
+VARIANT_SUFFIXES = ('.gz', '.br')
+MIN_SIZE = 256
+
+
+def is_up_to_date(source, target):
+    return os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source)
+
+
+def write_variant(source, target, data):
+    """Write a compressed variant only if it is actually smaller than the source."""
+    original_size = os.path.getsize(source)
+    if len(data) >= original_size:
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+    with open(target, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def precompress_file(path):
+    with open(path, 'rb') as f:
+        raw = f.read()
+    written = []
+    gz_path = path + '.gz'
+    if not is_up_to_date(path, gz_path):
+        # mtime=0 keeps the output byte-identical between builds (stable ETags)
+        if write_variant(path, gz_path, gzip.compress(raw, compresslevel=9, mtime=0)):
+            written.append('gz')
+    if HAS_BROTLI:
+        br_path = path + '.br'
+        if not is_up_to_date(path, br_path):
+            if write_variant(path, br_path, brotli.compress(raw, quality=11)):
+                written.append('br')
+    return written
+
+
+def iter_assets(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(VARIANT_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            ext = os.path.splitext(name)[1].lower()
+            if ext in COMPRESSIBLE_EXTENSIONS and os.path.getsize(path) >= MIN_SIZE:
+                yield path
+
+
+def clean(directory):
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(VARIANT_SUFFIXES) and os.path.exists(os.path.join(root, name[:-3])):
+                os.remove(os.path.join(root, name))
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate precompressed static assets")
+    parser.add_argument('directories', nargs='*', default=[os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')])
+    parser.add_argument('--clean', action='store_true', help='Remove generated .gz/.br files')
+    args = parser.parse_args()
+
+    if not HAS_BROTLI:
+        print("brotli not installed - generating gzip variants only")
+
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            print(f"Skipping {directory}: not a directory")
+            continue
+        if args.clean:
+            print(f"{directory}: removed {clean(directory)} variants")
+            continue
+        count = 0
+        for path in iter_assets(directory):
+            written = precompress_file(path)
+            if written:
+                count += 1
+                print(f"  {os.path.relpath(path, directory)} -> {', '.join(written)}")
+        print(f"{directory}: {count} assets precompressed")
+
+
+if __name__ == '__main__':
+    main()
@@ -79,6 +79,7 @@ def validate_rss_source(source: dict) -> bool:
     Checks:
         - Required keys: url, category, source_name, enabled
         - URL format: Must start with http:// or https://
+        - Optional min_feed_chars: non-negative integer
     """
     required_keys = ['url', 'category', 'source_name', 'enabled']
     
@@ -95,6 +96,11 @@ def validate_rss_source(source: dict) -> bool:
     # Check that values are not empty
     if not source.get('category') or not source.get('source_name'):
         return False
+    
+    # Per-source content-sufficiency threshold (see utils/content_policy.py)
+    min_feed_chars = source.get('min_feed_chars')
+    if min_feed_chars is not None and (not isinstance(min_feed_chars, int) or min_feed_chars < 0):
+        return False
         
     return True
 
@@ -119,6 +125,9 @@ def cleanup_legacy_articles(db_conn=None):
             
             removed_count = cursor.rowcount
             db_conn.commit()
+            if removed_count:
+                from utils.article_cache import invalidate_articles
+                invalidate_articles()
             
             logger.info(f"Phase 3 cleanup: {removed_count} rows removed")
             return removed_count
@@ -9,24 +9,39 @@ RSS Processor v3 - TWO-PASS AI ANALYSIS SYSTEM
 import os
 import sys
 import logging
-import requests
 import re
 import json
 import sqlite3
 import feedparser
 import time
 import hashlib
+import calendar
+import threading
 from datetime import datetime
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from urllib.parse import urljoin, urlparse
 from rss_manager import load_rss_sources, validate_rss_source
 from rss_feeds import RSS_FEEDS
 from config import (
-    SUMMARY_FALLBACK_LIMIT, AI_TIMEOUT, FEED_TIMEOUT, MAX_ENTRIES_PER_FEED,
+    SUMMARY_FALLBACK_LIMIT, FEED_TIMEOUT, MAX_ENTRIES_PER_FEED,
     TITLE_LIMIT, CONTENT_TO_AI_LIMIT, RSS_CONTENT_LIMIT, TITLE_DB_LIMIT, URL_DB_LIMIT
 )
 from metrics_tracker import log_processing_metrics
+from utils.search_index import index_articles
+from utils.http_fetcher import get_fetcher
+from utils.feed_state import get_feed_state, conditional_headers, content_hash
+from utils.feed_run import FeedRun
+from utils.pipeline import Stage, Pipeline
+from utils.llm_client import get_llm_client, track_usage
+from utils.llm_responses import parse_analysis_response, parse_rewrite_response, parse_batch_analysis
+from utils.local_classifier import local_verdict
+from utils.content_filter import HARMFUL_CONTENT, INVALID_CONTENT, MOCK_CLASSIFIER
+from utils.near_duplicates import get_near_duplicate_index
+from utils.html_extract import extract_article, flush_selector_stats
+from utils.content_policy import get_content_policy, FEED_CONTENT_SCRAPE_FOR_IMAGE
+from utils.cache import category_map
+from utils.checkpoint import open_checkpoint
+from utils.ingestion_metrics import RunMetrics, save_run_metrics
 
 # Load environment variables
 load_dotenv()
@@ -50,12 +65,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Processing counters
-processed_count = 0
-skipped_count = 0
-failed_count = 0
-blocked_count = 0
-
 # CONSTRUCTIVE TRANSFORMATION: Transform negative content instead of blocking
 # Removed blocking - now all content is processed and negative content is reframed
 
@@ -73,6 +82,18 @@ GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
 MOCK_GROQ = os.getenv('MOCK_GROQ', '0') == '1'
 MOCK_DB = os.getenv('MOCK_DB', '0') == '1'
 
+# Ingestion pipeline sizing: network-bound stages get many workers, the LLM
+# stage is bounded by the provider's rate limit and DB writes stay serial
+PIPELINE_FETCH_WORKERS = int(os.getenv('PIPELINE_FETCH_WORKERS', 8))
+PIPELINE_SCRAPE_WORKERS = int(os.getenv('PIPELINE_SCRAPE_WORKERS', 16))
+PIPELINE_PARSE_WORKERS = int(os.getenv('PIPELINE_PARSE_WORKERS', 2))
+PIPELINE_AI_WORKERS = int(os.getenv('PIPELINE_AI_WORKERS', 4))
+PIPELINE_SAVE_WORKERS = int(os.getenv('PIPELINE_SAVE_WORKERS', 1))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 64))
+# Articles per INSERT/commit, and the longest a saved article waits for its batch to fill
+SAVE_BATCH_SIZE = int(os.getenv('SAVE_BATCH_SIZE', 50))
+SAVE_BATCH_WAIT = float(os.getenv('SAVE_BATCH_WAIT', 2.0))
+
 # Dynamic RSS source loading
 DYNAMIC_RSS_SOURCES = None
 USE_JSON_SOURCES = False
@@ -89,26 +110,32 @@ except Exception as e:
 
 def is_harmful_content(title, content):
     """Check if content contains harmful keywords that should be blocked pre-ingestion"""
-    harmful_keywords = [
-        'suicide', 'murdered', 'killing', 'blast', 'explosion', 'massacre', 
-        'rape', 'graphic violence', 'corpse', 'body count', 'died by suicide'
-    ]
-    
-    text_to_check = f"{title} {content}".lower()
-    return any(keyword in text_to_check for keyword in harmful_keywords)
+    match = HARMFUL_CONTENT.search(title, content)
+    if match:
+        logger.debug(f"Harmful rule '{match[0]}' matched '{match[1]}'")
+    return match is not None
 
 def is_valid_content(content: str) -> bool:
     """Validate article content before AI processing."""
     if not content or len(content.strip()) < 10:
         return False
-    banned_phrases = ["file photo", "file image", "image of", "click here", "read more"]
-    return not any(phrase in content.lower() for phrase in banned_phrases)
+    return INVALID_CONTENT.search(content) is None
 
 def get_article_hash(title, link, published_date=None):
     """Generate unique hash for article deduplication"""
     key = f"{title}_{link}_{published_date or ''}"
     return hashlib.sha256(key.encode('utf-8')).hexdigest()
 
+def get_entry_keys(entry, source_url, article_hash):
+    """Cheap identity keys for a feed entry (link, GUID, hash) used for in-run dedup."""
+    keys = {f"hash:{article_hash}"}
+    if source_url:
+        keys.add(f"url:{source_url}")
+    guid = getattr(entry, 'id', None) or getattr(entry, 'guid', None)
+    if guid:
+        keys.add(f"guid:{guid}")
+    return keys
+
 def get_active_sources(source_dict, key):
     """Return only enabled sources from the specified category."""
     if not source_dict or key not in source_dict:
@@ -145,60 +172,6 @@ def clean_fallback_summary(text: str, limit: int = 3500):
     # Otherwise, add period to truncated text
     return truncated.strip() + '.'
 
-def parse_analysis_response(text):
-    """Parse AI analysis response for CATEGORY, SENTIMENT, REASON"""
-    category = 'REFRAMABLE'
-    sentiment = 'NEUTRAL'
-    reason = 'No analysis provided'
-
-    if not text:
-        logger.warning("Empty AI analysis response")
-        return category, sentiment, reason
-
-    try:
-        for prefix in ('CATEGORY', 'SENTIMENT', 'REASON'):
-            pattern = rf'^{prefix}:\s*(.+)$'
-            m = re.search(pattern, text, flags=re.IGNORECASE | re.MULTILINE)
-            if m:
-                val = m.group(1).strip()
-                if prefix == 'CATEGORY':
-                    val_up = val.upper()
-                    if val_up in ('CONSTRUCTIVE', 'REFRAMABLE', 'HARMFUL'):
-                        category = val_up
-                elif prefix == 'SENTIMENT':
-                    val_up = val.upper()
-                    if val_up in ('POSITIVE', 'NEGATIVE', 'NEUTRAL'):
-                        sentiment = val_up
-                elif prefix == 'REASON':
-                    reason = val if val else reason
-    except Exception as e:
-        logger.error(f"Analysis response parsing error: {e}")
-
-    return category, sentiment, reason
-
-def parse_rewrite_response(text):
-    """Parse AI rewrite response for HEADLINE and SUMMARY"""
-    headline = None
-    summary = None
-
-    if not text:
-        return headline, summary
-
-    try:
-        for prefix in ('HEADLINE', 'SUMMARY'):
-            pattern = rf'^{prefix}:\s*(.+)$'
-            m = re.search(pattern, text, flags=re.IGNORECASE | re.MULTILINE)
-            if m:
-                val = m.group(1).strip()
-                if prefix == 'HEADLINE':
-                    headline = val if val else None
-                elif prefix == 'SUMMARY':
-                    summary = val.strip() if val and val.strip() else None
-    except Exception as e:
-        logger.error(f"Rewrite response parsing error: {e}")
-
-    return headline, summary
-
 def check_factual_accuracy(original_title, original_content, ai_summary):
     """Check if AI summary maintains key facts from original content."""
     if not ai_summary or not original_content:
@@ -216,13 +189,39 @@ def check_factual_accuracy(original_title, original_content, ai_summary):
     matches = sum(1 for word in key_words if word in summary_text)
     return matches >= max(1, len(key_words) * 0.3)  # At least 30% key word retention
 
-def rewrite_with_ai(title, content, category):
-    """Two-pass AI processing: analysis-only first, then conditional rewriting"""
-    content_length = len(content or '')
-    adaptive_limit = get_adaptive_summary_limit(content_length)
-    logger.info(f"Processing content: {adaptive_limit} chars (content: {content_length} chars)")
+ANALYSIS_CATEGORIES = """- CONSTRUCTIVE: Already positive/inspiring content (achievements, innovations, celebrations, progress)
+- REFRAMABLE: Negative content that can be transformed (violence, disasters, conflicts, scandals)
+- HARMFUL: Extremely traumatic content that should be skipped (graphic violence, explicit harm)"""
+
+# Articles per pass-1 request; 1 disables batching
+LLM_BATCH_SIZE = int(os.getenv('LLM_BATCH_SIZE', 8))
+# Seconds the classify stage waits to fill a batch before sending a partial one
+LLM_BATCH_WAIT = float(os.getenv('LLM_BATCH_WAIT', 2.0))
+
+def mock_analysis(title, content):
+    """Keyword-based stand-in for the pass-1 classifier (MOCK_GROQ=1)"""
+    terms = MOCK_CLASSIFIER.matched_terms(title, content)
+    harmful_count = len(terms.get('harmful', ()))
+    negative_count = len(terms.get('negative', ()))
+    positive_count = len(terms.get('positive', ()))
+    
+    if harmful_count > 0:
+        return "CATEGORY: HARMFUL\nSENTIMENT: NEGATIVE\nREASON: Contains extremely traumatic content"
+    elif negative_count > positive_count:
+        return "CATEGORY: REFRAMABLE\nSENTIMENT: NEGATIVE\nREASON: Negative content that can be transformed"
+    return "CATEGORY: CONSTRUCTIVE\nSENTIMENT: POSITIVE\nREASON: Already positive content"
+
+def analyze_article(title, content, category, use_local=True):
+    """
+    PASS 1 for a single article: returns (category, sentiment, reason, source),
+    source being 'local', 'llm', 'mock' or 'default' (no API key / LLM failure)
+    """
+    # Confident local CONSTRUCTIVE predictions never reach the LLM
+    verdict = local_verdict(title, content) if use_local else None
+    if verdict:
+        logger.info(f"Local classifier decided {verdict[0]}: {title[:50]}...")
+        return verdict
     
-    # PASS 1: Analysis-only prompt
     analysis_prompt = f"""Analyze this news content and classify it. DO NOT generate any new content.
 
 Title: {title[:TITLE_LIMIT]}
@@ -230,9 +229,7 @@ Category: {category}
 Content: {content[:CONTENT_TO_AI_LIMIT]}
 
 Classify into one category:
-- CONSTRUCTIVE: Already positive/inspiring content (achievements, innovations, celebrations, progress)
-- REFRAMABLE: Negative content that can be transformed (violence, disasters, conflicts, scandals)
-- HARMFUL: Extremely traumatic content that should be skipped (graphic violence, explicit harm)
+{ANALYSIS_CATEGORIES}
 
 Return EXACTLY three lines:
 CATEGORY: [CONSTRUCTIVE/REFRAMABLE/HARMFUL]
@@ -243,50 +240,99 @@ No other text."""
 
     # Call AI for analysis
     analysis_text = None
+    source = 'llm'
     if MOCK_GROQ:
-        # Mock analysis based on keywords
-        harmful_keywords = ['murder', 'suicide', 'terrorist', 'explosion', 'bomb']
-        negative_keywords = ['killed', 'died', 'death', 'attack', 'injured', 'accident', 'violence', 'crime']
-        positive_keywords = ['launch', 'achievement', 'success', 'award', 'innovation', 'celebration']
-        text_to_check = f"{title} {content}".lower()
-        
-        harmful_count = sum(1 for keyword in harmful_keywords if keyword in text_to_check)
-        negative_count = sum(1 for keyword in negative_keywords if keyword in text_to_check)
-        positive_count = sum(1 for keyword in positive_keywords if keyword in text_to_check)
-        
-        if harmful_count > 0:
-            analysis_text = "CATEGORY: HARMFUL\nSENTIMENT: NEGATIVE\nREASON: Contains extremely traumatic content"
-        elif negative_count > positive_count:
-            analysis_text = "CATEGORY: REFRAMABLE\nSENTIMENT: NEGATIVE\nREASON: Negative content that can be transformed"
-        else:
-            analysis_text = "CATEGORY: CONSTRUCTIVE\nSENTIMENT: POSITIVE\nREASON: Already positive content"
+        analysis_text = mock_analysis(title, content)
+        source = 'mock'
         logger.info("Using mocked analysis response (MOCK_GROQ=1)")
     else:
         if not GROQ_API_KEY:
             logger.warning("GROQ_API_KEY not set; defaulting to REFRAMABLE")
             analysis_text = "CATEGORY: REFRAMABLE\nSENTIMENT: NEUTRAL\nREASON: No API key available"
+            source = 'default'
         else:
-            headers = {
-                'Authorization': f'Bearer {GROQ_API_KEY}',
-                'Content-Type': 'application/json'
-            }
-            payload = {
-                'messages': [{'role': 'user', 'content': analysis_prompt}],
-                'model': 'llama-3.1-8b-instant',
-                'max_tokens': 200,
-                'temperature': 0.1
-            }
             try:
-                resp = requests.post('https://api.groq.com/openai/v1/chat/completions', headers=headers, json=payload, timeout=AI_TIMEOUT)
-                resp.raise_for_status()
-                data = resp.json()
-                analysis_text = data.get('choices', [{}])[0].get('message', {}).get('content') if isinstance(data, dict) else None
+                analysis_text = get_llm_client().complete(analysis_prompt, max_tokens=200, temperature=0.1)
             except Exception as e:
                 logger.warning(f"AI analysis failed: {e}")
                 analysis_text = "CATEGORY: REFRAMABLE\nSENTIMENT: NEUTRAL\nREASON: Analysis failed"
+                source = 'default'
+
+    return parse_analysis_response(analysis_text or '') + (source,)
+
+def analyze_articles_batch(items):
+    """
+    PASS 1 for many articles: the local classifier first, then one LLM
+    request for whatever it is unsure about. `items` is a list of
+    (title, content, category); returns a list of (category, sentiment, reason, source)
+    in the same order. Items missing from the LLM response fall back to
+    analyze_article().
+    """
+    if not items:
+        return []
+    
+    # Confident local CONSTRUCTIVE predictions never reach the LLM; only the rest are batched
+    verdicts = [local_verdict(title, content) for title, content, _ in items]
+    undecided = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    if len(undecided) < len(items):
+        logger.info(f"Local classifier decided {len(items) - len(undecided)}/{len(items)} items")
+    if undecided:
+        analyses = analyze_with_llm_batch([items[i] for i in undecided])
+        for index, analysis in zip(undecided, analyses):
+            verdicts[index] = analysis
+    return verdicts
+
+def analyze_with_llm_batch(items):
+    """One batched pass-1 LLM request for `items` (see analyze_articles_batch)"""
+    if MOCK_GROQ or not GROQ_API_KEY or len(items) == 1:
+        return [analyze_article(title, content, category, use_local=False) for title, content, category in items]
+    
+    blocks = []
+    for item_id, (title, content, category) in enumerate(items, start=1):
+        blocks.append(f"[ID {item_id}]\nTitle: {title[:TITLE_LIMIT]}\nCategory: {category}\nContent: {content[:CONTENT_TO_AI_LIMIT]}")
+    prompt = f"""Analyze each of these {len(items)} news items and classify it. DO NOT generate any new content.
+
+Classify each item into one category:
+{ANALYSIS_CATEGORIES}
+
+""" + "\n\n".join(blocks) + """
+
+Return ONLY a JSON array with exactly one object per item:
+[{"id": 1, "category": "CONSTRUCTIVE|REFRAMABLE|HARMFUL", "sentiment": "POSITIVE|NEGATIVE|NEUTRAL", "reason": "brief justification"}]
+
+No other text."""
+    
+    parsed = {}
+    try:
+        response = get_llm_client().complete(prompt, max_tokens=60 * len(items) + 50, temperature=0.1)
+        parsed = parse_batch_analysis(response, range(1, len(items) + 1))
+    except Exception as e:
+        logger.warning(f"Batch AI analysis failed for {len(items)} items: {e}")
+    
+    missing = len(items) - len(parsed)
+    if missing:
+        logger.warning(f"Batch analysis resolved {len(parsed)}/{len(items)} items; classifying {missing} individually")
+    results = []
+    for item_id, (title, content, category) in enumerate(items, start=1):
+        analysis = parsed.get(item_id)
+        results.append(analysis + ('llm',) if analysis else analyze_article(title, content, category, use_local=False))
+    return results
+
+def rewrite_with_ai(title, content, category):
+    """Two-pass AI processing: analysis-only first, then conditional rewriting"""
+    return finalize_article(title, content, analyze_article(title, content, category))
 
-    # Parse analysis response
-    ai_category, sentiment, reason = parse_analysis_response(analysis_text or '')
+def finalize_article(title, content, analysis):
+    """
+    Apply a pass-1 (category, sentiment, reason, source): CONSTRUCTIVE keeps the
+    original, REFRAMABLE goes through the pass-2 rewrite, HARMFUL returns all
+    None. Returns (headline, summary, sentiment, sentiment_score, is_ai_rewritten).
+    """
+    content_length = len(content or '')
+    adaptive_limit = get_adaptive_summary_limit(content_length)
+    logger.info(f"Processing content: {adaptive_limit} chars (content: {content_length} chars)")
+    
+    ai_category, sentiment, reason = analysis[:3]
     logger.info(f"Analysis result: {ai_category} | {sentiment} | {reason}")
     
     # Handle based on category
@@ -333,18 +379,8 @@ No other text."""
             logger.info("Using mocked rewrite response (MOCK_GROQ=1)")
         else:
             if GROQ_API_KEY:
-                rewrite_payload = {
-                    'messages': [{'role': 'user', 'content': rewrite_prompt}],
-                    'model': 'llama-3.1-8b-instant',
-                    'max_tokens': 1000,
-                    'temperature': 0.3
-                }
                 try:
-                    rewrite_resp = requests.post('https://api.groq.com/openai/v1/chat/completions', 
-                                               headers=headers, json=rewrite_payload, timeout=AI_TIMEOUT)
-                    rewrite_resp.raise_for_status()
-                    rewrite_data = rewrite_resp.json()
-                    rewrite_text = rewrite_data.get('choices', [{}])[0].get('message', {}).get('content', '')
+                    rewrite_text = get_llm_client().complete(rewrite_prompt, max_tokens=1000, temperature=0.3)
                 except Exception as e:
                     logger.error(f"AI rewrite failed: {e}")
                     rewrite_text = None
@@ -397,17 +433,61 @@ def get_db_connection_real():
         raise RuntimeError('pymysql is not available in this environment')
     return pymysql.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME, charset='utf8mb4', cursorclass=pymysql.cursors.DictCursor)
 
-def save_article(article_data, db_conn=None):
-    """Save article with hash-based deduplication"""
+ARTICLE_COLUMNS = ('title', 'original_content', 'rewritten_headline', 'rewritten_summary', 'sentiment',
+                   'sentiment_score', 'category_id', 'source_url', 'image_url', 'created_at',
+                   'is_ai_rewritten', 'article_hash')
+
+def article_row(article_data, created_at):
+    """Values for ARTICLE_COLUMNS, in order"""
+    return (
+        article_data.get('title'),
+        article_data.get('original_content'),
+        article_data.get('rewritten_headline'),
+        article_data.get('rewritten_summary'),
+        article_data.get('sentiment'),
+        float(article_data.get('sentiment_score', 0.5)),
+        article_data.get('category_id'),
+        article_data.get('source_url'),
+        article_data.get('image_url'),
+        created_at,
+        int(article_data.get('is_ai_rewritten', 0)),
+        article_data.get('article_hash', '')
+    )
+
+def _consecutive_autoinc(db_conn):
+    """
+    Whether one multi-row INSERT gets consecutive AUTO_INCREMENT ids
+    (innodb_autoinc_lock_mode 0 or 1). Checked once per connection.
+    """
+    cached = getattr(db_conn, '_consecutive_autoinc', None)
+    if cached is None:
+        try:
+            with db_conn.cursor() as cursor:
+                cursor.execute("SELECT @@innodb_autoinc_lock_mode AS mode")
+                row = cursor.fetchone()
+            cached = int(row['mode'] if isinstance(row, dict) else row[0]) < 2
+        except Exception:
+            cached = False
+        db_conn._consecutive_autoinc = cached
+    return cached
+
+def save_articles(articles, db_conn=None):
+    """
+    Save a batch of articles with one multi-row INSERT and one commit.
+    Rows whose article_hash is already stored are left untouched
+    (ON DUPLICATE KEY no-op). Returns the article ids in input order, None
+    for rows that were not stored by this batch.
+    """
+    if not articles:
+        return []
     created_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-    article_hash = article_data.get('article_hash', '')
+    rows = [article_row(article_data, created_at) for article_data in articles]
+    columns = ', '.join(ARTICLE_COLUMNS)
 
     if MOCK_DB or db_conn is None:
         # Use sqlite in-memory for dry-run
         conn = sqlite3.connect(':memory:')
-        conn.row_factory = sqlite3.Row
         cur = conn.cursor()
-        # Create articles table with hash column
         cur.execute('''
         CREATE TABLE articles (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -425,113 +505,144 @@ def save_article(article_data, db_conn=None):
             article_hash TEXT UNIQUE
         )
         ''')
-
         try:
-            cur.execute('''
-            INSERT INTO articles (title, original_content, rewritten_headline, rewritten_summary, sentiment, sentiment_score, category_id, source_url, image_url, created_at, is_ai_rewritten, article_hash)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article_data.get('title'),
-                article_data.get('original_content'),
-                article_data.get('rewritten_headline'),
-                article_data.get('rewritten_summary'),
-                article_data.get('sentiment'),
-                float(article_data.get('sentiment_score', 0.5)),
-                article_data.get('category_id'),
-                article_data.get('source_url'),
-                article_data.get('image_url'),
-                created_at,
-                int(article_data.get('is_ai_rewritten', 0)),
-                article_hash
-            ))
+            placeholders = ', '.join('?' * len(ARTICLE_COLUMNS))
+            cur.executemany(f"INSERT OR IGNORE INTO articles ({columns}) VALUES ({placeholders})", rows)
             conn.commit()
-            rowid = cur.lastrowid
-            cur.execute('SELECT * FROM articles WHERE id = ?', (rowid,))
-            row = dict(cur.fetchone())
-            conn.close()
-            logger.info(f"Article saved successfully: {article_data.get('title', '')[:50]}...")
-            return rowid, row
+            ids_by_hash = {h: i for i, h in cur.execute("SELECT id, article_hash FROM articles")}
+            logger.info(f"Saved batch of {len(ids_by_hash)} articles (mock DB)")
+            return [ids_by_hash.get(row[-1]) for row in rows]
         except Exception as e:
             logger.error(f"Mock DB insert failed: {e}")
-            conn.close()
             raise
+        finally:
+            conn.close()
 
-    else:
-        # Real MySQL insert with hash
-        conn = db_conn
-        cur = conn.cursor()
-        insert_sql = '''
-        INSERT INTO articles (title, original_content, rewritten_headline, rewritten_summary, sentiment, sentiment_score, category_id, source_url, image_url, created_at, is_ai_rewritten, article_hash)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        '''
-        try:
-            cur.execute(insert_sql, (
-                article_data.get('title'),
-                article_data.get('original_content'),
-                article_data.get('rewritten_headline'),
-                article_data.get('rewritten_summary'),
-                article_data.get('sentiment'),
-                float(article_data.get('sentiment_score', 0.5)),
-                article_data.get('category_id'),
-                article_data.get('source_url'),
-                article_data.get('image_url'),
-                created_at,
-                int(article_data.get('is_ai_rewritten', 0)),
-                article_hash
-            ))
-            conn.commit()
-            rowid = cur.lastrowid
-            cur.execute('SELECT * FROM articles WHERE id = %s', (rowid,))
-            row = cur.fetchone()
-            logger.info(f"Article saved successfully: {article_data.get('title', '')[:50]}...")
-            return rowid, row
-        except Exception as e:
-            logger.error(f"DB insert failed: {e}")
-            conn.rollback()
-            raise
+    # Real MySQL: one statement, one commit for the whole batch
+    placeholders = '(' + ', '.join(['%s'] * len(ARTICLE_COLUMNS)) + ')'
+    insert_sql = (f"INSERT INTO articles ({columns}) VALUES {', '.join([placeholders] * len(rows))} "
+                  f"ON DUPLICATE KEY UPDATE article_hash = article_hash")
+    hashes = [row[-1] for row in rows]
+    try:
+        with db_conn.cursor() as cur:
+            inserted = cur.execute(insert_sql, [value for row in rows for value in row])
+            first_id = cur.lastrowid
+            if inserted and inserted == len(rows) and _consecutive_autoinc(db_conn):
+                # Every row was new and the ids were allocated as one block
+                ids = list(range(first_id, first_id + len(rows)))
+            elif not inserted:
+                ids = [None] * len(rows)
+            else:
+                cur.execute(f"SELECT id, article_hash FROM articles WHERE article_hash IN ({', '.join(['%s'] * len(hashes))})",
+                            hashes)
+                # Rows stored before this batch have ids below the first one it allocated
+                ids_by_hash = {row['article_hash']: row['id'] for row in cur.fetchall() if row['id'] >= first_id}
+                ids = [ids_by_hash.get(h) for h in hashes]
+        db_conn.commit()
+    except Exception as e:
+        logger.error(f"DB batch insert failed ({len(rows)} articles): {e}")
+        db_conn.rollback()
+        raise
+
+    if inserted < len(rows):
+        logger.info(f"{len(rows) - inserted} of {len(rows)} articles were already stored")
+    try:
+        index_articles([dict(article_data, id=article_id)
+                        for article_data, article_id in zip(articles, ids) if article_id])
+    except Exception as e:
+        logger.warning(f"Search index update failed for a batch of {len(rows)}: {e}")
+    logger.info(f"Saved batch of {inserted} articles")
+    return ids
 
 def get_category_id(category_name, db_conn):
-    """Get category ID, create if doesn't exist"""
+    """Get category ID, create if doesn't exist (served from the shared category map)"""
     try:
-        with db_conn.cursor() as cursor:
-            cursor.execute("SELECT id FROM categories WHERE name = %s", (category_name,))
-            result = cursor.fetchone()
-            if result:
-                return result['id']
-            
-            cursor.execute("INSERT INTO categories (name, description) VALUES (%s, %s)", 
-                         (category_name, f"{category_name} constructive news and updates"))
-            db_conn.commit()
-            return cursor.lastrowid
+        return category_map.get(category_name, db_conn)
     except Exception as e:
         logger.error(f"Failed to get/create category {category_name}: {e}")
         return 6  # Default to Education category ID
 
-def article_exists_by_hash(article_hash, db_conn):
-    """Check if article already exists by hash"""
-    if MOCK_DB or db_conn is None:
-        return False
+def find_known_articles(candidates, db_conn):
+    """
+    Batch duplicate check for one feed: a single round trip resolves every
+    candidate's hash, URL and title with indexable IN (...) lookups.
+    Returns (known_hashes, known_urls, known_titles).
+    """
+    if MOCK_DB or db_conn is None or not candidates:
+        return set(), set(), set()
+    
+    hashes = list({c['article_hash'] for c in candidates})
+    urls = list({c['source_url'] for c in candidates if c['source_url']})
+    titles = list({c['title'] for c in candidates})
+    
+    def in_clause(values):
+        return ', '.join(['%s'] * len(values))
+    
+    queries = [f"SELECT article_hash, source_url, title FROM articles WHERE article_hash IN ({in_clause(hashes)})"]
+    params = list(hashes)
+    if urls:
+        queries.append(f"SELECT article_hash, source_url, title FROM articles WHERE source_url IN ({in_clause(urls)})")
+        params.extend(urls)
+    queries.append(f"SELECT article_hash, source_url, title FROM articles WHERE title IN ({in_clause(titles)})")
+    params.extend(titles)
     
     try:
         with db_conn.cursor() as cursor:
-            cursor.execute("SELECT id FROM articles WHERE article_hash = %s", (article_hash,))
-            return cursor.fetchone() is not None
+            cursor.execute(" UNION ".join(queries), params)
+            rows = cursor.fetchall()
     except Exception as e:
-        logger.warning(f"Hash check failed: {e}")
-        return False
+        logger.warning(f"Batch duplicate check failed: {e}")
+        raise
+    
+    known_hashes = {row['article_hash'] for row in rows if row.get('article_hash')}
+    known_urls = {row['source_url'] for row in rows if row.get('source_url')}
+    known_titles = {row['title'] for row in rows if row.get('title')}
+    return known_hashes, known_urls, known_titles
 
-def article_exists(title, source_url, db_conn):
-    """Legacy check if article already exists (fallback)"""
-    if MOCK_DB or db_conn is None:
-        return False
+def collect_new_entries(entries, source_name, seen_entry_keys, db_conn):
+    """
+    Turn feed entries into candidate dicts (entry, title, source_url,
+    published_date, article_hash), dropping entries seen earlier in this run
+    or already stored. Returns (new_candidates, duplicate_count).
+    """
+    candidates = []
+    duplicates = 0
+    for entry in entries:
+        title = getattr(entry, 'title', '')[:TITLE_DB_LIMIT]
+        source_url = getattr(entry, 'link', '')[:URL_DB_LIMIT]
+        published_date = getattr(entry, 'published', None)
         
-    try:
-        with db_conn.cursor() as cursor:
-            cursor.execute("SELECT id FROM articles WHERE title = %s OR source_url = %s", 
-                         (title[:TITLE_DB_LIMIT], source_url[:URL_DB_LIMIT]))
-            return cursor.fetchone() is not None
-    except Exception:
-        return False
+        if not title:
+            logger.warning(f"Skipping entry with no title from {source_name}")
+            continue
+        
+        article_hash = get_article_hash(title, source_url, published_date)
+        entry_keys = get_entry_keys(entry, source_url, article_hash)
+        if not entry_keys.isdisjoint(seen_entry_keys):
+            logger.info(f"Duplicate skipped (seen this run): {title[:50]}...")
+            duplicates += 1
+            continue
+        seen_entry_keys.update(entry_keys)
+        
+        candidates.append({
+            'entry': entry,
+            'title': title,
+            'source_url': source_url,
+            'published_date': published_date,
+            'article_hash': article_hash
+        })
+    
+    known_hashes, known_urls, known_titles = find_known_articles(candidates, db_conn)
+    new_candidates = []
+    for candidate in candidates:
+        if (candidate['article_hash'] in known_hashes
+                or candidate['source_url'] in known_urls
+                or candidate['title'] in known_titles):
+            logger.info(f"Duplicate skipped: {candidate['title'][:50]}...")
+            duplicates += 1
+            continue
+        new_candidates.append(candidate)
+    return new_candidates, duplicates
 
 def sanitize_html(content):
     """Remove HTML tags from content"""
@@ -543,103 +654,61 @@ def sanitize_html(content):
     except Exception:
         return content
 
-def scrape_article_image(url, soup):
-    """Extract main article image from scraped content"""
+def download_article(url):
+    """Fetch an article page's raw HTML (network only), or None"""
     try:
-        domain = urlparse(url).netloc.lower()
-        
-        # Source-specific image extraction
-        if 'thehindu.com' in domain:
-            # The Hindu specific selectors
-            img = soup.select_one('.article-image img, .lead-image img, .main-image img, figure img')
-            if img and img.get('src'):
-                return urljoin(url, img['src'])
-        
-        elif 'timesofindia.indiatimes.com' in domain:
-            # Times of India specific selectors
-            img = soup.select_one('._3YYSt img, .gaBkci img, figure img, .story_image img')
-            if img and img.get('src'):
-                return urljoin(url, img['src'])
-        
-        elif 'ndtv.com' in domain:
-            # NDTV specific selectors
-            img = soup.select_one('.story__banner img, .ins_instory_dv img, figure img')
-            if img and img.get('src'):
-                return urljoin(url, img['src'])
-        
-        # Generic fallback selectors for all sources
-        selectors = [
-            'meta[property="og:image"]',
-            'meta[name="twitter:image"]', 
-            'article img:first-of-type',
-            '.article-content img:first-of-type',
-            '.story-body img:first-of-type',
-            'main img:first-of-type',
-            'figure img',
-            '.featured-image img'
-        ]
-        
-        for selector in selectors:
-            element = soup.select_one(selector)
-            if element:
-                img_url = element.get('content') or element.get('src')
-                if img_url:
-                    return urljoin(url, img_url)
-        
-        return None
-        
+        response = get_fetcher().get(url)
+        response.raise_for_status()
+        return response.content
     except Exception as e:
-        logger.warning(f"Image extraction failed for {url}: {e}")
+        logger.warning(f"Article download failed for {url}: {e}")
         return None
 
-def scrape_full_article(url):
-    """Scrape full article content from URL"""
+def parse_article_html(html, url=''):
+    """
+    Extract article text and lead image from downloaded HTML in one parse
+    (CPU only). Returns (text, image_url).
+    """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+        result = extract_article(html, url)
+        text = result.text[:RSS_CONTENT_LIMIT] if result.text else None
+        return text, result.image_url
+    except Exception as e:
+        logger.warning(f"Article parsing failed for {url}: {e}")
+        return None, None
+
+def fetch_feed(source):
+    """
+    Conditionally download and parse one source's feed through the shared fetcher.
+    Returns a dict with 'status' (ok / not_modified / unchanged / error), the
+    parsed 'feed' when status is ok, and the validators to store once processed.
+    """
+    url = source['url']
+    state = get_feed_state(url)
+    result = {'url': url, 'status': 'error', 'feed': None}
+    try:
+        response = get_fetcher().get(url, headers=conditional_headers(state), timeout=FEED_TIMEOUT)
+        if response.status_code == 304:
+            result['status'] = 'not_modified'
+            return result
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']):
-            element.decompose()
-        
-        # Try common article selectors
-        content_selectors = [
-            'article', '[role="main"]', '.article-content', '.post-content', 
-            '.entry-content', '.content', '.story-body', '.article-body',
-            'main', '.main-content', '#content', '.post'
-        ]
-        
-        article_content = None
-        for selector in content_selectors:
-            elements = soup.select(selector)
-            if elements:
-                article_content = elements[0]
-                break
-        
-        if not article_content:
-            # Fallback to body content
-            article_content = soup.find('body')
-        
-        if article_content:
-            # Extract paragraphs
-            paragraphs = article_content.find_all(['p', 'div'], string=True)
-            text_content = ' '.join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-            
-            # Clean and validate
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
-            if len(text_content) > 100:  # Minimum content length
-                return text_content[:RSS_CONTENT_LIMIT], soup
-        
-        return None, soup
+        body_hash = content_hash(response.content)
+        result.update({
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': body_hash
+        })
+        if state.get('content_hash') == body_hash:
+            result['status'] = 'unchanged'
+            return result
         
+        result['feed'] = feedparser.parse(response.content)
+        result['status'] = 'ok'
+        return result
     except Exception as e:
-        logger.warning(f"Article scraping failed for {url}: {e}")
-        return None, None
+        logger.warning(f"Feed fetch failed for {url}: {e}")
+        return result
 
 def extract_image_from_entry(entry):
     """Extract image URL from RSS entry"""
@@ -663,177 +732,454 @@ def extract_image_from_entry(entry):
     except Exception:
         return None
 
-def process_general_rss_feeds():
-    """Process general RSS feeds with ethical safeguards"""
-    global processed_count, skipped_count, failed_count, blocked_count
-    processed_count = skipped_count = failed_count = blocked_count = 0
-    total_processed = 0
+def feed_entry_text(entry):
+    """Plain text an entry carries in the feed: the longer of content:encoded and summary"""
+    texts = [sanitize_html(block.get('value', '')) for block in (getattr(entry, 'content', None) or [])]
+    texts.append(sanitize_html(getattr(entry, 'summary', '') or getattr(entry, 'description', '')))
+    return max(texts, key=len)
+
+def entry_timestamp(entry):
+    """Publish time of a feed entry as a UNIX timestamp, or None"""
+    parsed = getattr(entry, 'published_parsed', None) or getattr(entry, 'updated_parsed', None)
+    if not parsed:
+        return None
+    try:
+        return calendar.timegm(parsed)
+    except Exception:
+        return None
+
+class ThreadConnections:
+    """One MySQL connection per pipeline worker thread (pymysql connections are not thread-safe)"""
     
-    # Select source list
-    if USE_JSON_SOURCES:
-        sources = get_active_sources(DYNAMIC_RSS_SOURCES, 'general')
-        logger.info(f"Processing {len(sources)} general sources from JSON")
-    else:
-        sources = [feed for feed in RSS_FEEDS if feed['category'] != 'Education']
-        logger.info(f"Processing {len(sources)} general sources from RSS_FEEDS fallback")
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
     
-    try:
-        if not MOCK_DB:
-            db_conn = get_db_connection_real()
+    def get(self):
+        if MOCK_DB:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = get_db_connection_real()
+            self._local.conn = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+    
+    def close_all(self):
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._all = []
+
+class IngestionRun:
+    """
+    One ingestion pass over a list of sources as a staged pipeline:
+    
+        fetch feeds -> dedup -> download articles -> parse/filter
+            -> classify (batched LLM pass 1) -> rewrite (pass 2, REFRAMABLE only) -> save
+    
+    Each stage has its own worker pool and bounded input queue, so the AI
+    stage stays busy while later articles are still being scraped.
+    """
+    
+    def __init__(self, sources):
+        self.sources = sources
+        self.feed_runs = {}
+        self.connections = ThreadConnections()
+        # Only touched by the dedup stage, which runs a single worker
+        self.seen_entry_keys = set()
+        self.near_duplicates = None
+        self.content_policy = get_content_policy()
+        self.checkpoint = None
+        self.stats = None
+        self.metrics = RunMetrics(sources)
+    
+    def source_urls(self, item):
+        """Source URL(s) a stage call works for: a source, a FeedRun, an entry or a batch of entries"""
+        if isinstance(item, list):
+            return [url for entry in item for url in self.source_urls(entry)]
+        if isinstance(item, FeedRun):
+            return [item.source['url']]
+        if isinstance(item, dict) and 'feed' in item:
+            return [item['feed'].source['url']]
+        return [item['url']]
+    
+    def count(self, item, stage, outcome, n=1):
+        self.metrics.outcome(self.source_urls(item)[0], stage, outcome, n)
+    
+    def cache_hit(self, item, stage, kind, n=1):
+        self.metrics.cache_hit(self.source_urls(item)[0], stage, kind, n)
+    
+    def fail(self, item, stage):
+        """Count a failed entry and mark it so its feed is retried next poll"""
+        self.count(item, stage, 'failed')
+        item['failed'] = True
+    
+    def timed(self, stage, fn):
+        """Wrap a stage function to record its time, errors and LLM usage per source"""
+        def call(item):
+            started = time.monotonic()
+            error = False
+            try:
+                with track_usage() as usage:
+                    return fn(item)
+            except Exception:
+                error = True
+                for entry in (item if isinstance(item, list) else [item]):
+                    if isinstance(entry, dict) and 'feed' in entry:
+                        entry['failed'] = True
+                raise
+            finally:
+                self.metrics.record(stage, self.source_urls(item), time.monotonic() - started, error, usage)
+        return call
+    
+    def saved_work(self, item):
+        """Work the interrupted run already did for this entry ({} if none)"""
+        return item.get('saved_work') or {}
+    
+    def save_work(self, item, stage, **fields):
+        if self.checkpoint:
+            self.checkpoint.update_entry(item['article_hash'], stage, **fields)
+    
+    def fetch_stage(self, source):
+        if self.checkpoint and self.checkpoint.source_outcome(source['url']) is not None:
+            logger.info(f"Already finished by the interrupted run: {source['source_name']}")
+            return None
+        logger.info(f"Fetching: {source['source_name']}")
+        feed_run = FeedRun(source, fetch_feed(source), self.checkpoint)
+        self.feed_runs[source['url']] = feed_run
+        status = feed_run.fetch_result['status']
+        self.count(source, 'fetch', status)
+        if status in ('not_modified', 'unchanged'):
+            self.cache_hit(source, 'fetch', status)
+        return feed_run
+    
+    def dedup_stage(self, feed_run):
+        source, fetch_result, outcome = feed_run.source, feed_run.fetch_result, feed_run.outcome
+        if fetch_result['status'] in ('not_modified', 'unchanged'):
+            logger.info(f"Feed unchanged since last poll ({fetch_result['status']}): {source['url']}")
+            feed_run.start(0)
+            return []
+        
+        feed = fetch_result['feed']
+        if fetch_result['status'] != 'ok' or not feed:
+            return []
+        
+        entries = feed.entries[:MAX_ENTRIES_PER_FEED]
+        outcome['entries'] = len(entries)
+        outcome['entry_times'] = [t for t in (entry_timestamp(e) for e in entries) if t]
+        if not entries:
+            logger.warning(f"No entries in {source['url']}")
+            feed_run.start(0)
+            return []
+        
+        db_conn = self.connections.get()
+        category_id = get_category_id(source['category'], db_conn) if not MOCK_DB else 1  # Default category
+        
+        # DEDUP FIRST: one batched lookup per feed, so known entries never reach scraping or AI
+        candidates, duplicates = collect_new_entries(entries, source['source_name'], self.seen_entry_keys, db_conn)
+        self.count(feed_run, 'dedup', 'duplicate', duplicates)
+        self.count(feed_run, 'dedup', 'new', len(candidates))
+        outcome['new_entries'] = len(candidates)
+        feed_run.start(len(candidates))
+        for candidate in candidates:
+            candidate['feed'] = feed_run
+            candidate['category_id'] = category_id
+            if self.checkpoint:
+                candidate['saved_work'] = self.checkpoint.entry(candidate['article_hash'])
+        return candidates
+    
+    def download_stage(self, item):
+        if 'content' in self.saved_work(item):
+            self.cache_hit(item, 'download', 'checkpoint')
+            item['html'] = None
+            return item
+        entry = item['entry']
+        # Image from the feed entry first; the page is only a fallback
+        item['image_url'] = extract_image_from_entry(entry)
+        item['feed_text'] = feed_entry_text(entry)
+        use_feed, reason = self.content_policy.decide(item['feed'].source, item['feed_text'])
+        item['use_feed_text'] = use_feed
+        if use_feed and (item['image_url'] or not FEED_CONTENT_SCRAPE_FOR_IMAGE):
+            self.count(item, 'download', 'feed_content')
+            self.cache_hit(item, 'download', 'feed_content')
+            logger.info(f"Using feed content ({reason}), page not downloaded: {item['title'][:50]}...")
+            item['html'] = None
+            return item
+        item['html'] = download_article(item['source_url'])
+        self.count(item, 'download', 'downloaded' if item['html'] is not None else 'download_failed')
+        return item
+    
+    def extract_content(self, item):
+        """Article text and image for an entry from the feed and/or the downloaded page"""
+        source_url = item['source_url']
+        html = item.pop('html', None)
+        feed_text = item.pop('feed_text', '')
+        scraped_content, page_image = parse_article_html(html, source_url) if html else (None, None)
+        scraped = scraped_content and len(scraped_content) > 200
+        if scraped:
+            # Teaches the content policy whether this source's feed carries full text
+            self.content_policy.record_sample(item['feed'].source['url'], len(feed_text[:RSS_CONTENT_LIMIT]), len(scraped_content))
+        
+        if item['use_feed_text']:
+            content = feed_text[:RSS_CONTENT_LIMIT]
+            logger.info(f"Using feed content: {len(content)} chars")
+        elif scraped:
+            content = scraped_content
+            logger.info(f"Scraped full article: {len(content)} chars")
         else:
-            db_conn = None
+            # Fallback to the feed's own text
+            content = feed_text[:RSS_CONTENT_LIMIT]
+            logger.info(f"Using RSS summary: {len(content)} chars")
+        
+        # Enhanced image extraction: RSS entry first, then the scraped page
+        image_url = item['image_url']
+        if not image_url and page_image:
+            image_url = page_image
+            logger.info(f"Extracted image from web scraping: {image_url[:50]}...")
+        
+        if image_url:
+            logger.info(f"Final image URL: {image_url[:50]}...")
+        else:
+            logger.info("No image found for article")
+        return content, image_url
+    
+    def parse_stage(self, item):
+        title = item['title']
+        saved = self.saved_work(item)
+        if 'content' in saved:
+            content, image_url = saved['content'], saved.get('image_url')
+            logger.info(f"Reusing content from the interrupted run: {title[:50]}...")
+        else:
+            content, image_url = self.extract_content(item)
+        
+        # PRE-INGESTION BLOCKING: Check for harmful content before AI processing
+        if is_harmful_content(title, content):
+            self.count(item, 'parse', 'blocked')
+            logger.info(f"HARMFUL content blocked pre-ingestion: {title[:50]}...")
+            return None
+        
+        # Content validation
+        if not is_valid_content(content):
+            logger.warning(f"Skipped invalid content: {title[:50]}...")
+            self.count(item, 'parse', 'invalid')
+            return None
+        
+        # Same story already taken from another source (or earlier in this run): skip the AI passes
+        if self.near_duplicates is not None:
+            cluster = self.near_duplicates.check_and_add(item['article_hash'], title, content)
+            if cluster:
+                self.count(item, 'parse', 'near_duplicate')
+                logger.info(f"Near-duplicate skipped (cluster {cluster}): {title[:50]}...")
+                return None
+            # Registered as the first of its cluster; forgotten again if it is not saved
+            item['near_dup_key'] = item['article_hash']
+        
+        item['content'] = content
+        item['image_url'] = image_url
+        if 'content' not in saved:
+            self.save_work(item, 'parsed', content=content, image_url=image_url)
+        return item
+    
+    def classify_stage(self, items):
+        """PASS 1 for a batch of articles in one LLM request (analyses checkpointed earlier are reused)"""
+        pending = [item for item in items if 'analysis' not in self.saved_work(item)]
+        for item in items:
+            if 'analysis' in self.saved_work(item):
+                self.cache_hit(item, 'classify', 'checkpoint')
+        if pending:
+            try:
+                analyses = analyze_articles_batch(
+                    [(item['title'], item['content'], item['feed'].source['category']) for item in pending]
+                )
+            except Exception as e:
+                for item in items:
+                    self.fail(item, 'classify')
+                logger.error(f"AI analysis failed for a batch of {len(items)}: {e}")
+                return [None] * len(items)
+            for item, analysis in zip(pending, analyses):
+                if analysis[3] == 'local':
+                    # Decided by utils.local_classifier without an LLM call
+                    self.cache_hit(item, 'classify', 'local_classifier')
+                item['analysis'] = analysis
+                self.save_work(item, 'classified', analysis=analysis)
         
-        for source in sources:
-            logger.info(f"Processing: {source['source_name']}")
-            
+        results = []
+        for item in items:
+            analysis = item.get('analysis') or self.saved_work(item)['analysis']
+            if analysis[0] == 'HARMFUL':
+                self.count(item, 'classify', 'blocked')
+                logger.info(f"HARMFUL content blocked: {item['title'][:50]}... ({analysis[2]})")
+                results.append(None)
+            else:
+                item['analysis'] = analysis
+                results.append(item)
+        return results
+    
+    def rewrite_stage(self, item):
+        """PASS 2: only REFRAMABLE articles make an LLM call here"""
+        title = item['title']
+        result = self.saved_work(item).get('ai_result')
+        if result is not None:
+            self.cache_hit(item, 'rewrite', 'checkpoint')
+        else:
             try:
-                feed = feedparser.parse(source['url'])
-                
-                if not feed.entries:
-                    logger.warning(f"No entries in {source['url']}")
-                    continue
-                
-                if not MOCK_DB:
-                    category_id = get_category_id(source['category'], db_conn)
-                else:
-                    category_id = 1  # Default category
-                
-                source_processed_count = 0
-                
-                for entry in feed.entries[:MAX_ENTRIES_PER_FEED]:
-                    try:
-                        title = getattr(entry, 'title', '')[:TITLE_DB_LIMIT]
-                        source_url = getattr(entry, 'link', '')[:URL_DB_LIMIT]
-                        published_date = getattr(entry, 'published', None)
-                        
-                        if not title:
-                            logger.warning(f"Skipping entry with no title from {source['source_name']}")
-                            continue
-                        
-                        # Try to scrape full article content first
-                        scraped_result = scrape_full_article(source_url)
-                        scraped_content, soup = scraped_result if scraped_result else (None, None)
-                        
-                        if scraped_content and len(scraped_content) > 200:
-                            content = scraped_content
-                            logger.info(f"Scraped full article: {len(content)} chars")
-                        else:
-                            # Fallback to RSS summary
-                            content = sanitize_html(getattr(entry, 'summary', '') or getattr(entry, 'description', ''))[:RSS_CONTENT_LIMIT]
-                            logger.info(f"Using RSS summary: {len(content)} chars")
-                        
-                        # CONSTRUCTIVE PROCESSING: All content processed, negative content reframed
-                        # No blocking - traumatic content will be transformed by AI
-                        
-                        # Generate article hash for deduplication
-                        article_hash = get_article_hash(title, source_url, published_date)
-                        
-                        # Check for duplicates using hash first, then fallback
-                        if not MOCK_DB and (article_exists_by_hash(article_hash, db_conn) or article_exists(title, source_url, db_conn)):
-                            logger.info(f"Duplicate skipped: {title[:50]}...")
-                            skipped_count += 1
-                            continue
-                        
-                        # PRE-INGESTION BLOCKING: Check for harmful content before AI processing
-                        if is_harmful_content(title, content):
-                            blocked_count += 1
-                            logger.info(f"HARMFUL content blocked pre-ingestion: {title[:50]}...")
-                            continue
-                        
-                        # Content validation
-                        if not is_valid_content(content):
-                            logger.warning(f"Skipped invalid content: {title[:50]}...")
-                            skipped_count += 1
-                            continue
-                        
-                        # Enhanced image extraction: try RSS first, then web scraping
-                        # Enhanced image extraction: try RSS first, then web scraping
-                        image_url = extract_image_from_entry(entry)
-                        
-                        # If no image from RSS and we have scraped content, try web scraping
-                        if not image_url and soup:
-                            image_url = scrape_article_image(source_url, soup)
-                            if image_url:
-                                logger.info(f"Extracted image from web scraping: {image_url[:50]}...")
-                        
-                        if image_url:
-                            logger.info(f"Final image URL: {image_url[:50]}...")
-                        else:
-                            logger.info("No image found for article")
-                        
-                        # If no image from RSS and we have scraped content, try web scraping
-                        if not image_url and soup:
-                            image_url = scrape_article_image(source_url, soup)
-                            if image_url:
-                                logger.info(f"Extracted image from web scraping: {image_url[:50]}...")
-                        
-                        if image_url:
-                            logger.info(f"Final image URL: {image_url[:50]}...")
-                        else:
-                            logger.info("No image found for article")
-                        
-                        # Process with AI for constructive content
-                        try:
-                            result = rewrite_with_ai(title, content, source['category'])
-                            if result[0] is None:  # HARMFUL content - skip article
-                                blocked_count += 1
-                                logger.info(f"HARMFUL content blocked: {title[:50]}...")
-                                continue
-                            headline, summary, sentiment, sentiment_score, is_ai_rewritten = result
-                        except Exception as e:
-                            failed_count += 1
-                            logger.error(f"AI processing failed for {title[:50]}...: {e}")
-                            continue
-                        
-                        article_data = {
-                            'title': title,
-                            'original_content': content,
-                            'rewritten_headline': headline,
-                            'rewritten_summary': summary,
-                            'sentiment': sentiment,
-                            'sentiment_score': sentiment_score,
-                            'category_id': category_id,
-                            'source_url': source_url,
-                            'image_url': image_url,
-                            'is_ai_rewritten': is_ai_rewritten,
-                            'article_hash': article_hash
-                        }
-                        
-                        try:
-                            rowid, row = save_article(article_data, db_conn)
-                            if rowid:
-                                processed_count += 1
-                                source_processed_count += 1
-                                ai_marker = " [CONSTRUCTIVE]" if is_ai_rewritten else ""
-                                logger.info(f"Processed: {title[:50]}... ({sentiment}){ai_marker}")
-                        except Exception as e:
-                            failed_count += 1
-                            logger.error(f"Failed to save article: {e}")
-                        
-                        time.sleep(0.5)  # Rate limiting
-                        
-                    except Exception as e:
-                        failed_count += 1
-                        logger.error(f"Failed to process entry from {source['source_name']}: {e}")
-                        continue
-                
-                logger.info(f"Processed {source_processed_count} articles from {source['source_name']}")
-                total_processed += source_processed_count
-                time.sleep(1)  # Rate limiting between sources
-                
+                result = finalize_article(title, item['content'], item['analysis'])
             except Exception as e:
-                logger.error(f"Failed to process {source['url']}: {e}")
+                self.fail(item, 'rewrite')
+                logger.error(f"AI processing failed for {title[:50]}...: {e}")
+                return None
+            self.save_work(item, 'rewritten', ai_result=result)
+        if result[0] is None:
+            self.count(item, 'rewrite', 'blocked')
+            return None
+        item['ai_result'] = result
+        return item
+    
+    def save_stage(self, items):
+        """Batched: one INSERT and one commit per SAVE_BATCH_SIZE articles or SAVE_BATCH_WAIT seconds"""
+        articles = []
+        for item in items:
+            headline, summary, sentiment, sentiment_score, is_ai_rewritten = item['ai_result']
+            articles.append({
+                'title': item['title'],
+                'original_content': item['content'],
+                'rewritten_headline': headline,
+                'rewritten_summary': summary,
+                'sentiment': sentiment,
+                'sentiment_score': sentiment_score,
+                'category_id': item['category_id'],
+                'source_url': item['source_url'],
+                'image_url': item['image_url'],
+                'is_ai_rewritten': is_ai_rewritten,
+                'article_hash': item['article_hash']
+            })
+        try:
+            ids = save_articles(articles, self.connections.get())
+        except Exception as e:
+            for item in items:
+                self.fail(item, 'save')
+            logger.error(f"Failed to save a batch of {len(items)} articles: {e}")
+            return [None] * len(items)
+        
+        results = []
+        for item, article_id in zip(items, ids):
+            if not article_id:
+                self.count(item, 'save', 'already_stored')
+                # The story is stored, so it stays in the near-duplicate index
+                item.pop('near_dup_key', None)
+                results.append(None)
                 continue
+            self.count(item, 'save', 'saved')
+            ai_marker = " [CONSTRUCTIVE]" if item['ai_result'][4] else ""
+            logger.info(f"Processed: {item['title'][:50]}... ({item['ai_result'][2]}){ai_marker}")
+            results.append(item)
+        if self.checkpoint:
+            self.checkpoint.entries_saved(item['article_hash'] for item in results if item)
+        return results
+    
+    def on_drop(self, stage_name, item):
+        if isinstance(item, FeedRun):
+            # The feed itself failed before its entries were queued
+            item.outcome['status'] = 'error'
+        elif isinstance(item, dict) and 'feed' in item:
+            if item.get('near_dup_key') and self.near_duplicates is not None:
+                # Not saved (AI/save failure, HARMFUL verdict): must not shadow a later retry
+                self.near_duplicates.discard(item.pop('near_dup_key'))
+            item['feed'].entry_done(failed=item.get('failed', False))
+    
+    def on_output(self, item):
+        item['feed'].entry_done(saved=True)
+    
+    def run(self):
+        """Run the pipeline; returns [(source, outcome)] in source order."""
+        pipeline = Pipeline([
+            Stage('fetch', self.timed('fetch', self.fetch_stage), PIPELINE_FETCH_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('dedup', self.timed('dedup', self.dedup_stage), 1, PIPELINE_QUEUE_SIZE, fan_out=True),
+            Stage('download', self.timed('download', self.download_stage), PIPELINE_SCRAPE_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('parse', self.timed('parse', self.parse_stage), PIPELINE_PARSE_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('classify', self.timed('classify', self.classify_stage), PIPELINE_AI_WORKERS, PIPELINE_QUEUE_SIZE,
+                  batch_size=LLM_BATCH_SIZE, batch_wait=LLM_BATCH_WAIT),
+            Stage('rewrite', self.timed('rewrite', self.rewrite_stage), PIPELINE_AI_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('save', self.timed('save', self.save_stage), PIPELINE_SAVE_WORKERS, PIPELINE_QUEUE_SIZE,
+                  batch_size=SAVE_BATCH_SIZE, batch_wait=SAVE_BATCH_WAIT),
+        ], on_drop=self.on_drop, on_output=self.on_output)
+        self.checkpoint = open_checkpoint(source['url'] for source in self.sources)
+        completed = False
+        try:
+            if not MOCK_DB:
+                # One query (plus one batch INSERT for new names) instead of a lookup per source
+                try:
+                    category_map.ensure([source['category'] for source in self.sources], self.connections.get())
+                except Exception as e:
+                    logger.warning(f"Category preload failed: {e}")
+            self.near_duplicates = get_near_duplicate_index(self.connections.get())
+            self.stats = pipeline.run(self.sources)
+            completed = True
+        finally:
+            if not MOCK_DB:
+                try:
+                    save_run_metrics(self.metrics, self.connections.get())
+                except Exception as e:
+                    logger.warning(f"Saving ingestion metrics failed: {e}")
+            self.connections.close_all()
+            flush_selector_stats()
+            if self.checkpoint and completed:
+                self.checkpoint.finish()
+            elif self.checkpoint:
+                # Interrupted: keep the checkpoint for the next run to resume
+                self.checkpoint.close()
+        
+        logger.info(f"Pipeline finished in {self.stats['elapsed_seconds']}s")
+        for name, stage in self.stats['stages'].items():
+            logger.info(f"  {name:<9} workers={stage['workers']} in={stage['items_in']} out={stage['items_out']} "
+                        f"dropped={stage['dropped']} errors={stage['errors']} avg={stage['avg_latency_ms']}ms "
+                        f"wait={stage['avg_queue_wait_ms']}ms rate={stage['throughput_per_sec']}/s util={stage['utilisation']}")
+        logger.info(f"Slowest sources/stages of run {self.metrics.run_id}:")
+        self.metrics.log_slowest()
         
-        if not MOCK_DB and db_conn:
-            db_conn.close()
+        empty = {'status': 'error', 'entries': 0, 'new_entries': 0, 'processed': 0, 'entry_times': []}
+        results = []
+        for source in self.sources:
+            if source['url'] in self.feed_runs:
+                results.append((source, self.feed_runs[source['url']].outcome))
+            else:
+                resumed = self.checkpoint.source_outcome(source['url']) if self.checkpoint else None
+                results.append((source, resumed or dict(empty)))
+        return results
+
+def process_sources(sources):
+    """Run the given sources through the ingestion pipeline. Returns [(source, outcome)]."""
+    return IngestionRun(sources).run()
+
+def get_general_sources():
+    """Enabled general sources from rss_sources.json, or the RSS_FEEDS fallback"""
+    if USE_JSON_SOURCES:
+        return get_active_sources(DYNAMIC_RSS_SOURCES, 'general')
+    return [feed for feed in RSS_FEEDS if feed['category'] != 'Education']
+
+def process_general_rss_feeds():
+    """Process general RSS feeds with ethical safeguards"""
+    sources = get_general_sources()
+    logger.info(f"Processing {len(sources)} general sources from {'JSON' if USE_JSON_SOURCES else 'RSS_FEEDS fallback'}")
+    
+    try:
+        run = IngestionRun(sources)
+        results = run.run()
+        counters = run.metrics.counters()
+        total_processed = sum(outcome['processed'] for _, outcome in results)
         
         logger.info(f"Two-pass AI processing completed. Total: {total_processed} articles")
         logger.info("✅ STEP 1: SQL injection fixed - safe parameterized queries")
         logger.info("✅ STEP 2: Pre-ingestion blocking active - harmful content blocked before AI")
         logger.info("✅ STEP 3: AI tagging logic updated - transparent marking")
         logger.info("✅ STEP 4: Two-pass system active - CONSTRUCTIVE preserved, REFRAMABLE transformed, HARMFUL blocked")
-        logger.info(f"Summary - Processed: {processed_count} | Skipped (duplicates): {skipped_count} | Blocked (harmful): {blocked_count} | Failed (AI): {failed_count}")
+        logger.info(f"Summary - Processed: {counters['processed_count']} | Skipped (duplicates): {counters['skipped_count']} | Near-duplicates: {counters['near_duplicate_count']} | Feed content (no download): {counters['feed_content_count']} | Blocked (harmful): {counters['blocked_count']} | Failed (AI): {counters['failed_count']}")
         
         return total_processed
         
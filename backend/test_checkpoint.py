@@ -0,0 +1,98 @@
+# test_checkpoint.py
+import pytest
+
+from utils import checkpoint, state_store
+from utils.checkpoint import RunCheckpoint, source_set_key
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'STATE_DIR', str(tmp_path))
+
+
+def test_interrupted_run_is_resumed_with_its_work():
+    run = RunCheckpoint.open()
+    assert not run.resumed
+    run.source_done('https://a.example/rss', {'status': 'ok', 'processed': 2})
+    run.update_entry('h1', 'parsed', content='Body', image_url=None)
+    run.update_entry('h1', 'classified', analysis=('CONSTRUCTIVE', 'POSITIVE', 'Award', 'llm'))
+    run.close()
+
+    resumed = RunCheckpoint.open()
+    assert resumed.resumed
+    assert resumed.run_id == run.run_id
+    assert resumed.source_outcome('https://a.example/rss') == {'status': 'ok', 'processed': 2}
+    assert resumed.source_outcome('https://b.example/rss') is None
+    entry = resumed.entry('h1')
+    assert entry['content'] == 'Body'
+    assert entry['analysis'] == ('CONSTRUCTIVE', 'POSITIVE', 'Award', 'llm')
+    resumed.close()
+
+
+def test_saved_entries_are_not_resumed():
+    run = RunCheckpoint.open()
+    run.update_entry('h1', 'parsed', content='Body')
+    run.update_entry('h2', 'parsed', content='Other')
+    run.entries_saved(['h1'])
+    run.close()
+
+    resumed = RunCheckpoint.open()
+    assert resumed.entry('h1') == {}
+    assert resumed.entry('h2') == {'content': 'Other'}
+    resumed.close()
+
+
+def test_finished_run_starts_fresh():
+    run = RunCheckpoint.open()
+    run.update_entry('h1', 'parsed', content='Body')
+    run.finish()
+
+    fresh = RunCheckpoint.open()
+    assert not fresh.resumed
+    assert fresh.entry('h1') == {}
+    fresh.close()
+
+
+def test_stale_checkpoint_is_discarded(monkeypatch):
+    run = RunCheckpoint.open()
+    run.update_entry('h1', 'parsed', content='Body')
+    run.close()
+
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_MAX_AGE_HOURS', 0)
+    fresh = RunCheckpoint.open()
+    assert not fresh.resumed
+    assert fresh.run_id != run.run_id
+    assert fresh.entry('h1') == {}
+    fresh.close()
+
+
+def test_disabled_checkpoint(monkeypatch):
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_ENABLED', False)
+    assert checkpoint.open_checkpoint(['https://a.example/rss']) is None
+
+
+def test_runs_over_other_sources_do_not_resume_the_checkpoint():
+    everything = source_set_key(['https://a.example/rss', 'https://b.example/rss'])
+    due_only = source_set_key(['https://b.example/rss'])
+    run = RunCheckpoint.open(everything)
+    run.source_done('https://b.example/rss', {'status': 'ok', 'processed': 1})
+    run.close()
+
+    scheduled = RunCheckpoint.open(due_only)
+    assert not scheduled.resumed
+    assert scheduled.source_outcome('https://b.example/rss') is None
+    scheduled.finish()
+
+    resumed = RunCheckpoint.open(source_set_key(['https://b.example/rss', 'https://a.example/rss']))
+    assert resumed.resumed
+    assert resumed.run_id == run.run_id
+    assert resumed.source_outcome('https://b.example/rss') == {'status': 'ok', 'processed': 1}
+    resumed.close()
+
+
+def test_open_checkpoint_keys_by_source_set():
+    run = checkpoint.open_checkpoint(['https://a.example/rss'])
+    run.update_entry('h1', 'parsed', content='Body')
+    run.close()
+    assert checkpoint.open_checkpoint(['https://b.example/rss']).entry('h1') == {}
+    assert checkpoint.open_checkpoint(['https://a.example/rss']).entry('h1') == {'content': 'Body'}
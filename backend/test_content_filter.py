@@ -0,0 +1,48 @@
+# test_content_filter.py
+import pytest
+
+from utils.content_filter import HARMFUL_CONTENT, RuleSet
+
+# The substring list of the old is_harmful_content, and the inflected words it caught
+BASELINE_KEYWORDS = [
+    'suicide', 'murdered', 'killing', 'blast', 'explosion', 'massacre',
+    'rape', 'graphic violence', 'corpse', 'body count', 'died by suicide'
+]
+BASELINE_INFLECTIONS = [
+    'suicides', 'suicided', 'killings', 'blasts', 'blasted', 'blasting', 'explosions',
+    'massacres', 'massacred', 'rapes', 'raped', 'corpses', 'body counts',
+]
+
+
+@pytest.mark.parametrize('text', [
+    'A man raped a woman', 'Two rapes reported', 'The rapist was arrested',
+    'A string of killings', 'Police investigate the killing', 'Villagers were massacred',
+    'Two massacres in a week', 'The corpses were found', 'A corpse in the river',
+    'Suicides rose last year', 'He died by suicide', 'Suicidal thoughts',
+    'Twin blasts hit the market', 'Explosions heard downtown', 'She was murdered',
+])
+def test_harmful_inflected_forms_are_blocked(text):
+    assert HARMFUL_CONTENT.search(text) is not None
+
+
+@pytest.mark.parametrize('text', [
+    'The rocket had a perfect blastoff', 'Grape harvest festival', 'New drapes for the hall',
+    'A therapist opened a clinic', 'Skilling programme for youth', 'Corpsman honoured for service',
+    'Scraped knees at the marathon',
+])
+def test_benign_look_alikes_are_not_blocked(text):
+    assert HARMFUL_CONTENT.search(text) is None
+
+
+def test_stem_and_phrase_terms():
+    rules = RuleSet({'a': ['kill*'], 'b': ['body count']})
+    assert rules.matches('Killers at large') == {'a'}
+    assert rules.matches('The body\ncount rose') == {'b'}
+    assert rules.search('bodycount') is None
+
+
+@pytest.mark.parametrize('word', BASELINE_KEYWORDS + BASELINE_INFLECTIONS)
+def test_parity_with_the_baseline_keyword_list(word):
+    text = f"Officials said the {word} shocked the town"
+    assert any(keyword in text.lower() for keyword in BASELINE_KEYWORDS)
+    assert HARMFUL_CONTENT.search(text) is not None
@@ -0,0 +1,56 @@
+# test_feed_run.py
+import pytest
+
+from utils import state_store
+from utils.feed_run import FeedRun
+from utils.feed_state import get_feed_state, save_feed_state
+
+SOURCE = {'url': 'https://example.com/rss', 'source_name': 'Example', 'category': 'world'}
+
+
+@pytest.fixture(autouse=True)
+def previous_poll(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'STATE_DIR', str(tmp_path))
+    save_feed_state(SOURCE['url'], '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT', 'hash-v1')
+
+
+def feed_run(entries):
+    run = FeedRun(SOURCE, {'url': SOURCE['url'], 'status': 'ok', 'etag': '"v2"',
+                           'last_modified': None, 'content_hash': 'hash-v2'})
+    run.start(entries)
+    return run
+
+
+def test_validators_saved_when_every_entry_was_handled():
+    run = feed_run(2)
+    run.entry_done(saved=True)
+    assert get_feed_state(SOURCE['url'])['etag'] == '"v1"'
+    run.entry_done()
+    assert get_feed_state(SOURCE['url'])['etag'] == '"v2"'
+    assert run.outcome['processed'] == 1
+
+
+def test_validators_kept_when_an_entry_failed():
+    run = feed_run(2)
+    run.entry_done(saved=True)
+    run.entry_done(failed=True)
+    state = get_feed_state(SOURCE['url'])
+    assert (state['etag'], state['content_hash']) == ('"v1"', 'hash-v1')
+
+
+def test_empty_feed_is_marked_processed():
+    feed_run(0)
+    assert get_feed_state(SOURCE['url'])['content_hash'] == 'hash-v2'
+
+
+def test_finished_source_is_checkpointed():
+    done = {}
+
+    class Checkpoint:
+        def source_done(self, url, outcome):
+            done[url] = outcome
+
+    run = FeedRun(SOURCE, {'url': SOURCE['url'], 'status': 'not_modified'}, Checkpoint())
+    run.start(0)
+    assert done[SOURCE['url']]['status'] == 'not_modified'
+    assert get_feed_state(SOURCE['url'])['etag'] == '"v1"'
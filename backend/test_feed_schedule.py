@@ -0,0 +1,66 @@
+# test_feed_schedule.py
+import pytest
+
+from utils import state_store
+from utils.feed_schedule import (
+    SCHED_MAX_INTERVAL, SCHED_MIN_INTERVAL, compute_interval, due_urls, get_schedule,
+    observed_gap, record_poll, sync_sources
+)
+
+SOURCES = [
+    {'url': 'https://a.example/rss', 'source_name': 'A', 'priority': 1},
+    {'url': 'https://b.example/rss', 'source_name': 'B', 'priority': 'bad'},
+]
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'STATE_DIR', str(tmp_path))
+
+
+def test_observed_gap_is_the_median():
+    assert observed_gap([0, 60, 120, 1000]) == 60
+    assert observed_gap([5]) is None
+    assert observed_gap([5, 5]) is None
+
+
+def test_interval_is_clamped():
+    assert compute_interval(1, 1) == SCHED_MIN_INTERVAL
+    assert compute_interval(10 ** 9, 1) == SCHED_MAX_INTERVAL
+
+
+def test_failures_and_idle_polls_back_off():
+    base = compute_interval(1800, 1)
+    assert compute_interval(1800, 1, idle_polls=2) > base
+    assert compute_interval(1800, 1, failures=1) > compute_interval(1800, 1, idle_polls=1)
+    assert compute_interval(1800, 2) > base
+
+
+def test_new_sources_are_due_immediately_and_removed_ones_dropped():
+    sync_sources(SOURCES)
+    assert set(due_urls()) == {s['url'] for s in SOURCES}
+    sync_sources(SOURCES[:1])
+    assert [row['url'] for row in get_schedule()] == [SOURCES[0]['url']]
+
+
+def test_record_poll_schedules_the_next_poll():
+    sync_sources(SOURCES)
+    now = 1_000_000.0
+    interval = record_poll(SOURCES[0]['url'], {'status': 'ok', 'new_entries': 3,
+                                               'entry_times': [now - 1200, now - 600, now]}, now=now)
+    assert SCHED_MIN_INTERVAL <= interval <= SCHED_MAX_INTERVAL
+    assert SOURCES[0]['url'] not in due_urls(now=now + interval - 1)
+    assert SOURCES[0]['url'] in due_urls(now=now + interval)
+
+
+def test_failing_feed_backs_off_and_recovers():
+    sync_sources(SOURCES)
+    url, now = SOURCES[0]['url'], 1_000_000.0
+    ok = record_poll(url, {'status': 'ok', 'new_entries': 1}, now=now)
+    failed = record_poll(url, {'status': 'error'}, now=now + 10)
+    assert failed > ok
+    assert record_poll(url, {'status': 'ok', 'new_entries': 1}, now=now + 20) < failed
+
+
+def test_unknown_url_is_ignored():
+    assert record_poll('https://missing.example/rss', {'status': 'ok'}) is None
@@ -0,0 +1,42 @@
+# test_fieldsets.py
+from utils.fieldsets import Fieldset, SNIPPET_SQL, column, project
+
+FIELDS = Fieldset(
+    {
+        'id': (['id'], column('id')),
+        'title': (['title', 'rewritten_headline'], lambda row: row['rewritten_headline'] or row['title']),
+        'snippet': ([SNIPPET_SQL], column('snippet')),
+        'content': (['original_content', 'rewritten_summary'],
+                    lambda row: row['rewritten_summary'] or row['original_content']),
+    },
+    full=('id', 'title', 'content'),
+    card=('id', 'title', 'snippet'),
+)
+
+
+def test_default_is_the_full_shape():
+    assert FIELDS.parse({}) == ('id', 'title', 'content')
+
+
+def test_card_view():
+    assert FIELDS.parse({'view': 'CARD'}) == ('id', 'title', 'snippet')
+
+
+def test_requested_fields_keep_registry_order_and_always_include_id():
+    assert FIELDS.parse({'fields': 'snippet, title,unknown'}) == ('id', 'title', 'snippet')
+
+
+def test_columns_only_select_what_the_fields_need():
+    select = FIELDS.columns(('id', 'snippet'))
+    assert select.startswith('id, LEFT(')
+    assert 'original_content' not in FIELDS.columns(('id', 'title'))
+
+
+def test_columns_do_not_repeat_extra_or_aliased_columns():
+    assert FIELDS.columns(('id', 'title'), extra=['id', 'a.title']) == 'id, a.title, rewritten_headline'
+
+
+def test_render_and_project():
+    row = {'id': 7, 'title': 'Old', 'rewritten_headline': None, 'snippet': 'Short'}
+    assert FIELDS.render(row, ('id', 'title', 'snippet')) == {'id': 7, 'title': 'Old', 'snippet': 'Short'}
+    assert project({'id': 7, 'title': 'Old', 'content': 'Long'}, ('title',)) == {'id': 7, 'title': 'Old'}
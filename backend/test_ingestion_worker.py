@@ -0,0 +1,50 @@
+# test_ingestion_worker.py
+import threading
+import time
+
+import pytest
+
+import ingestion_worker
+from utils import ingestion_jobs, state_store
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_store, 'STATE_DIR', str(tmp_path))
+    monkeypatch.setattr(ingestion_worker, 'WORKER_HEARTBEAT_INTERVAL', 0.02)
+    monkeypatch.setattr(ingestion_worker, '_running', True)
+    monkeypatch.setattr(ingestion_worker, '_stopping', threading.Event())
+    monkeypatch.setattr(ingestion_worker, '_stopped', threading.Event())
+    monkeypatch.setattr(ingestion_worker.signal, 'signal', lambda *args: None)
+    return ingestion_worker
+
+
+def heartbeat_at():
+    return max((w['heartbeat_at'] for w in ingestion_jobs.live_workers()), default=None)
+
+
+def test_signal_stops_claiming_but_keeps_the_heartbeat_until_the_job_ends(worker, monkeypatch):
+    first, _ = ingestion_jobs.enqueue_job(requested_by='test')
+    seen = {}
+
+    def run_job(job):
+        worker._stop(15, None)
+        before = heartbeat_at()
+        time.sleep(0.3)
+        seen['advanced'] = heartbeat_at() > before
+        seen['requeued'] = ingestion_jobs.requeue_orphaned_jobs()
+        # Queued while stopping: must be left for another worker
+        seen['second'], _ = ingestion_jobs.enqueue_job(requested_by='test')
+        return {'articles_saved': 0}
+
+    monkeypatch.setattr(worker, 'run_job', run_job)
+    runner = threading.Thread(target=worker.run_forever)
+    runner.start()
+    runner.join(timeout=5)
+
+    assert not runner.is_alive()
+    assert seen['advanced']
+    assert seen['requeued'] == 0
+    assert ingestion_jobs.get_job(first['job_id'])['status'] == 'done'
+    assert ingestion_jobs.get_job(seen['second']['job_id'])['status'] == 'queued'
+    assert ingestion_jobs.live_workers() == []
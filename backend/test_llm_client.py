@@ -0,0 +1,157 @@
+# test_llm_client.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('requests')
+
+from utils import llm_client
+from utils.llm_client import LLMClient, LLMError, TokenBucket, parse_duration
+
+
+class MockGroq(BaseHTTPRequestHandler):
+    """Answers /chat/completions with the queued (status, headers) responses, then 200s."""
+    responses = []
+    calls = 0
+
+    def do_POST(self):
+        type(self).calls += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status, headers = self.responses.pop(0) if self.responses else (200, {})
+        body = json.dumps({
+            'choices': [{'message': {'content': 'rewritten'}}],
+            'usage': {'prompt_tokens': 12, 'completion_tokens': 3},
+        } if status == 200 else {'error': 'nope'}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(llm_client, 'LLM_BACKOFF_BASE', 0.01)
+    MockGroq.responses = []
+    MockGroq.calls = 0
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), MockGroq)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def make_client(base_url, **kwargs):
+    kwargs.setdefault('requests_per_minute', 6000)
+    kwargs.setdefault('tokens_per_minute', 10 ** 7)
+    return LLMClient(api_key='test', base_url=base_url, **kwargs)
+
+
+def test_parse_duration():
+    assert parse_duration('7.66s') == pytest.approx(7.66)
+    assert parse_duration('2m59.56s') == pytest.approx(179.56)
+    assert parse_duration('250ms') == pytest.approx(0.25)
+    assert parse_duration('3') == 3.0
+    assert parse_duration('soon') is None
+
+
+def test_bucket_allows_a_burst_up_to_capacity_then_gives_up_with_max_wait():
+    bucket = TokenBucket(per_minute=3)
+    assert all(bucket.acquire(1, max_wait=0) for _ in range(3))
+    assert bucket.acquire(1, max_wait=0) is False
+
+
+def test_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=600)  # 10 per second
+    bucket.tokens = 0.0
+    started = time.monotonic()
+    assert bucket.acquire(1)
+    assert 0.05 < time.monotonic() - started < 1.0
+
+
+def test_sync_does_not_adopt_the_servers_limit():
+    bucket = TokenBucket(per_minute=30)
+    bucket.sync(remaining='14399', reset=60.0)
+    assert bucket.capacity == 30
+    assert bucket.tokens <= 30
+
+
+def test_sync_lowers_tokens_and_pauses_until_reset_when_exhausted():
+    bucket = TokenBucket(per_minute=30)
+    bucket.sync(remaining='5')
+    assert bucket.tokens == 5
+    bucket.sync(remaining='0', reset=30.0)
+    assert bucket.tokens == 0
+    assert bucket.paused_until > time.monotonic() + 25
+    assert bucket.acquire(1, max_wait=0.1) is False
+
+
+def test_retries_429_and_5xx_then_succeeds(server):
+    MockGroq.responses = [(429, {'retry-after': '0'}), (503, {})]
+    client = make_client(server)
+    assert client.complete('hello') == 'rewritten'
+    assert MockGroq.calls == 3
+    stats = client.stats()
+    assert stats['retries'] == 2
+    assert stats['rate_limited'] == 1
+    assert stats['prompt_tokens'] == 12
+
+
+def test_gives_up_after_max_retries(server):
+    MockGroq.responses = [(500, {})] * 3
+    client = make_client(server, max_retries=2)
+    with pytest.raises(LLMError):
+        client.complete('hello')
+    assert MockGroq.calls == 3
+
+
+def test_client_errors_are_not_retried(server):
+    MockGroq.responses = [(400, {})]
+    with pytest.raises(LLMError):
+        make_client(server).complete('hello')
+    assert MockGroq.calls == 1
+
+
+def test_interactive_call_does_not_retry(server):
+    MockGroq.responses = [(503, {})]
+    with pytest.raises(LLMError):
+        make_client(server).complete('hello', interactive=True)
+    assert MockGroq.calls == 1
+
+
+def test_interactive_call_does_not_wait_for_an_exhausted_bucket(server):
+    client = make_client(server)
+    client.requests_bucket.pause(60)
+    started = time.monotonic()
+    with pytest.raises(LLMError):
+        client.complete('hello', interactive=True)
+    assert time.monotonic() - started < 1
+    assert MockGroq.calls == 0
+
+
+def test_response_headers_pause_the_bucket(server):
+    MockGroq.responses = [(200, {'x-ratelimit-limit-requests': '14400',
+                                 'x-ratelimit-remaining-requests': '0',
+                                 'x-ratelimit-reset-requests': '45s'})]
+    client = make_client(server)
+    client.complete('hello')
+    assert client.requests_bucket.capacity == 6000
+    assert client.requests_bucket.paused_until > time.monotonic() + 40
+
+
+def test_track_usage_collects_this_threads_calls(server):
+    client = make_client(server)
+    with llm_client.track_usage() as usage:
+        client.complete('hello')
+    assert usage['calls'] == 1
+    assert usage['prompt_tokens'] == 12
+    assert usage['completion_tokens'] == 3
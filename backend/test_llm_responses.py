@@ -0,0 +1,45 @@
+# test_llm_responses.py
+from utils.llm_responses import parse_analysis_response, parse_batch_analysis, parse_rewrite_response
+
+
+def test_batch_json_array():
+    text = 'Here you go: [{"id": 1, "category": "constructive", "sentiment": "positive", "reason": "Award"},' \
+           ' {"id": 2, "category": "HARMFUL", "sentiment": "bogus", "reason": ""}]'
+    assert parse_batch_analysis(text, [1, 2]) == {
+        1: ('CONSTRUCTIVE', 'POSITIVE', 'Award'),
+        2: ('HARMFUL', 'NEUTRAL', 'No analysis provided'),
+    }
+
+
+def test_batch_line_fallback():
+    text = "1. CONSTRUCTIVE - POSITIVE - New school opens\nID 2: REFRAMABLE, NEGATIVE, Flood recovery\n[ID 3] HARMFUL"
+    results = parse_batch_analysis(text, [1, 2, 3])
+    assert results[1] == ('CONSTRUCTIVE', 'POSITIVE', 'New school opens')
+    assert results[2][:2] == ('REFRAMABLE', 'NEGATIVE')
+    assert results[3][0] == 'HARMFUL'
+
+
+def test_numbers_in_the_prose_are_not_ids():
+    text = "1. Over 10 HARMFUL deaths were reported\n2. REFRAMABLE - NEGATIVE - 3 HARMFUL chemicals spilled"
+    results = parse_batch_analysis(text, [1, 2, 3, 10])
+    assert 10 not in results
+    assert 3 not in results
+    assert 1 not in results
+    assert results[2][0] == 'REFRAMABLE'
+
+
+def test_batch_ignores_unrequested_ids_and_empty_text():
+    assert parse_batch_analysis("7. HARMFUL", [1, 2]) == {}
+    assert parse_batch_analysis('', [1]) == {}
+
+
+def test_single_analysis_defaults_and_fields():
+    assert parse_analysis_response('') == ('REFRAMABLE', 'NEUTRAL', 'No analysis provided')
+    text = "CATEGORY: harmful\nSENTIMENT: Negative\nREASON: Graphic"
+    assert parse_analysis_response(text) == ('HARMFUL', 'NEGATIVE', 'Graphic')
+
+
+def test_rewrite_response():
+    assert parse_rewrite_response("HEADLINE: Town rebuilds\nSUMMARY: Neighbours help.") == \
+        ('Town rebuilds', 'Neighbours help.')
+    assert parse_rewrite_response(None) == (None, None)
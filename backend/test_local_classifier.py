@@ -0,0 +1,60 @@
+# test_local_classifier.py
+import pytest
+
+from utils import local_classifier
+from utils.local_classifier import LocalClassifier, local_verdict
+
+TRAINING = [
+    ("Students win national science award for clean water invention", 'CONSTRUCTIVE'),
+    ("Village celebrates new library built by volunteers", 'CONSTRUCTIVE'),
+    ("Local team wins award for solar innovation", 'CONSTRUCTIVE'),
+    ("Flood damages homes as river bursts its banks", 'REFRAMABLE'),
+    ("Factory closure leaves hundreds without jobs", 'REFRAMABLE'),
+    ("Storm cuts power to thousands of homes", 'REFRAMABLE'),
+    ("Gunman kills family in brutal massacre", 'HARMFUL'),
+    ("Brutal massacre leaves bodies in the street", 'HARMFUL'),
+    ("Gunman kills dozens in brutal attack", 'HARMFUL'),
+] * 5
+
+
+@pytest.fixture
+def model(monkeypatch):
+    texts, labels = zip(*TRAINING)
+    trained = LocalClassifier().fit(list(texts), list(labels), min_df=1, epochs=20)
+    monkeypatch.setattr(local_classifier, '_model', trained)
+    monkeypatch.setattr(local_classifier, '_model_loaded', True)
+    monkeypatch.setattr(local_classifier, 'LOCAL_CLASSIFIER_ENABLED', True)
+    return trained
+
+
+def test_confident_constructive_is_decided_locally(model):
+    title = "Volunteers win award for new library"
+    assert model.classify(title)[0] == 'CONSTRUCTIVE'
+    category, sentiment, reason, source = local_verdict(title, '', threshold=0.5)
+    assert (category, sentiment, source) == ('CONSTRUCTIVE', 'POSITIVE', 'local')
+    assert reason.startswith('Local classifier')
+
+
+def test_harmful_always_goes_to_the_llm(model):
+    title = "Brutal massacre as gunman kills dozens"
+    label, confidence = model.classify(title)
+    assert label == 'HARMFUL'
+    assert local_verdict(title, '', threshold=min(confidence, 0.5)) is None
+
+
+def test_reframable_goes_to_the_llm(model):
+    title = "Storm floods homes and cuts power"
+    label, confidence = model.classify(title)
+    assert label == 'REFRAMABLE'
+    assert local_verdict(title, '', threshold=min(confidence, 0.5)) is None
+
+
+def test_unsure_prediction_goes_to_the_llm(model):
+    assert local_verdict("Volunteers win award for new library", '', threshold=1.01) is None
+
+
+def test_round_trip_keeps_predictions(model, tmp_path):
+    path = model.save(str(tmp_path / 'model.json'))
+    loaded = LocalClassifier.load(path)
+    text = "Village celebrates award"
+    assert loaded.classify(text)[0] == model.classify(text)[0]
@@ -0,0 +1,88 @@
+# test_near_duplicates.py
+import time
+from datetime import datetime, timedelta
+
+from utils.near_duplicates import NearDuplicateIndex, load_recent, similarity, story_signature
+
+BODY = ("Volunteers planted two thousand native trees along the river bank on Sunday, "
+        "and the city council promised to fund a second phase of the project next spring. ") * 3
+
+
+def test_rechecking_the_same_key_is_not_a_duplicate_of_itself():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'River trees planted', BODY) is None
+    assert index.check_and_add('a', 'River trees planted', BODY) is None
+    assert len(index) == 1
+
+
+def test_republished_story_joins_the_cluster():
+    index = NearDuplicateIndex()
+    assert index.check_and_add('a', 'River trees planted', BODY) is None
+    assert index.check_and_add('b', 'River trees planted by volunteers', BODY) == 'a'
+
+
+def test_unrelated_story_is_new():
+    index = NearDuplicateIndex()
+    index.check_and_add('a', 'River trees planted', BODY)
+    other = "The state team won the cricket final after a record chase in the last over. " * 3
+    assert index.check_and_add('b', 'Cricket final won', other) is None
+
+
+def test_discarded_story_no_longer_matches():
+    index = NearDuplicateIndex()
+    index.check_and_add('a', 'River trees planted', BODY)
+    index.discard('a')
+    index.discard('missing')
+    assert index.check_and_add('b', 'River trees planted', BODY) is None
+
+
+def test_prune_drops_stories_outside_the_window():
+    index = NearDuplicateIndex(window_seconds=10)
+    index.add('old', 'River trees planted', BODY, added_at=100)
+    index.prune(now=200)
+    assert len(index) == 0
+
+
+def test_similarity_of_identical_signatures():
+    signature = story_signature('River trees planted', BODY)
+    assert similarity(signature, signature) == 1.0
+
+
+class RecordingCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.params = params
+
+    def fetchall(self):
+        return self.rows
+
+
+class RecordingConnection:
+    def __init__(self, rows):
+        self.cursor_obj = RecordingCursor(rows)
+
+    def cursor(self):
+        return self.cursor_obj
+
+
+def test_preload_window_and_timestamps_are_utc():
+    created = datetime.utcnow() - timedelta(hours=1)
+    conn = RecordingConnection([{'id': 7, 'title': 'River trees planted', 'original_content': BODY,
+                                 'created_at': created.replace(microsecond=0)}])
+    index = NearDuplicateIndex(window_seconds=48 * 3600)
+    assert load_recent(index, conn, hours=48) == 1
+
+    cutoff = datetime.strptime(conn.cursor_obj.params[0], '%Y-%m-%d %H:%M:%S')
+    assert abs((datetime.utcnow() - timedelta(hours=48) - cutoff).total_seconds()) < 5
+    added_at = index._entries['db:7'][1]
+    assert abs(added_at - (time.time() - 3600)) < 5
+    assert index.check_and_add('new', 'River trees planted', BODY) == 'db:7'
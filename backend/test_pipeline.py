@@ -0,0 +1,93 @@
+# test_pipeline.py
+import threading
+
+import pytest
+
+from utils.pipeline import Pipeline, Stage
+
+
+def run(stages, items):
+    dropped, output = [], []
+    lock = threading.Lock()
+
+    def on_drop(stage, item):
+        with lock:
+            dropped.append((stage, item))
+
+    def on_output(item):
+        with lock:
+            output.append(item)
+
+    pipeline = Pipeline(stages, on_drop=on_drop, on_output=on_output)
+    stats = pipeline.run(items)
+    return sorted(output), sorted(dropped), stats
+
+
+def test_items_flow_through_every_stage():
+    output, dropped, stats = run([
+        Stage('double', lambda x: x * 2, workers=3, queue_size=2),
+        Stage('inc', lambda x: x + 1, workers=2, queue_size=2),
+    ], range(20))
+    assert output == [2 * x + 1 for x in range(20)]
+    assert dropped == []
+    assert stats['stages']['double']['items_in'] == 20
+    assert stats['stages']['inc']['items_out'] == 20
+
+
+def test_none_and_exceptions_drop_the_item():
+    def check(x):
+        if x == 3:
+            raise RuntimeError('boom')
+        return None if x % 2 else x
+
+    output, dropped, stats = run([Stage('check', check, workers=2)], range(6))
+    assert output == [0, 2, 4]
+    assert dropped == [('check', 1), ('check', 3), ('check', 5)]
+    assert stats['stages']['check']['errors'] == 1
+    assert stats['stages']['check']['dropped'] == 2
+
+
+def test_fan_out_emits_every_result():
+    output, _, _ = run([
+        Stage('split', lambda n: range(n), fan_out=True),
+        Stage('same', lambda x: x, workers=2),
+    ], [2, 3])
+    assert output == [0, 0, 1, 1, 2]
+
+
+def test_batch_stage_gets_lists_and_keeps_order():
+    sizes = []
+
+    def batch(items):
+        sizes.append(len(items))
+        return [None if x == 5 else x * 10 for x in items]
+
+    output, dropped, _ = run([Stage('batch', batch, batch_size=4, batch_wait=0.2)], range(10))
+    assert output == [x * 10 for x in range(10) if x != 5]
+    assert dropped == [('batch', 5)]
+    assert max(sizes) <= 4
+    assert sum(sizes) == 10
+
+
+@pytest.mark.parametrize('result', [[], [1, 2, 3, 4, 5]])
+def test_batch_with_wrong_result_count_drops_the_whole_batch(result):
+    output, dropped, stats = run([Stage('batch', lambda items: result, batch_size=4, batch_wait=0.2)], range(4))
+    assert output == []
+    assert [item for _, item in dropped] == [0, 1, 2, 3]
+    assert stats['stages']['batch']['errors'] == 4
+
+
+def test_failing_on_output_does_not_stall_the_pipeline():
+    seen = []
+
+    def on_output(item):
+        seen.append(item)
+        raise RuntimeError('save callback failed')
+
+    pipeline = Pipeline([Stage('first', lambda x: x, workers=2, queue_size=1),
+                         Stage('last', lambda x: x, workers=1, queue_size=1)], on_output=on_output)
+    worker = threading.Thread(target=pipeline.run, args=(range(10),), daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+    assert not worker.is_alive()
+    assert sorted(seen) == list(range(10))
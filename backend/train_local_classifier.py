@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Train and evaluate the local pass-1 classifier (utils/local_classifier.py).
+
+Labels come from articles already processed by the LLM. A seeded holdout
+split reports accuracy, per-class precision/recall, and how many holdout
+articles the model would decide on its own at each confidence threshold:
+only predictions of a trusted label (CONSTRUCTIVE) skip the LLM, so the sweep
+counts those and reports their precision, i.e. how often a harmful or
+reframable article would be published unchanged. The model is retrained on
+all rows and saved unless --eval-only is given.
+
+Usage:
+    python3 train_local_classifier.py [--limit 20000] [--holdout 0.2] [--eval-only]
+"""
+import os
+import sys
+import random
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+from utils.db import get_db_connection
+from utils.local_classifier import (
+    LocalClassifier, LABELS, LOCAL_CLASSIFIER_THRESHOLD, TRUSTED_LABELS, article_text
+)
+
+load_dotenv()
+
+THRESHOLDS = (0.6, 0.7, 0.8, 0.9, 0.95, 0.99)
+
+
+def load_labeled_articles(limit):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT title, original_content,
+                       CASE
+                           WHEN blocked_legacy = 1 THEN 'HARMFUL'
+                           WHEN is_ai_rewritten = 1 THEN 'REFRAMABLE'
+                           ELSE 'CONSTRUCTIVE'
+                       END AS label
+                FROM articles
+                WHERE blocked_legacy = 1
+                   OR is_ai_rewritten = 1
+                   OR (is_ai_rewritten = 0 AND sentiment = 'POSITIVE')
+                ORDER BY id DESC
+                LIMIT %s
+            """, (limit,))
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+    return [article_text(r['title'], r['original_content']) for r in rows], [r['label'] for r in rows]
+
+
+def evaluate(model, texts, labels):
+    predictions = [model.classify(text) for text in texts]
+    correct = sum(1 for (label, _), truth in zip(predictions, labels) if label == truth)
+    print(f"\nHoldout accuracy: {correct}/{len(labels)} = {correct / max(1, len(labels)):.3f}")
+
+    print(f"\n{'LABEL':<14}{'PRECISION':>10}{'RECALL':>8}{'SUPPORT':>9}")
+    for label in LABELS:
+        predicted = sum(1 for p, _ in predictions if p == label)
+        actual = sum(1 for t in labels if t == label)
+        hits = sum(1 for (p, _), t in zip(predictions, labels) if p == label and t == label)
+        precision = hits / predicted if predicted else 0.0
+        recall = hits / actual if actual else 0.0
+        print(f"{label:<14}{precision:>10.3f}{recall:>8.3f}{actual:>9}")
+
+    print(f"\nDecided locally = confident {'/'.join(TRUSTED_LABELS)} predictions (the rest go to the LLM)")
+    print(f"{'THRESHOLD':<10}{'DECIDED LOCALLY':>16}{'PRECISION':>10}{'WRONG':>7}")
+    for threshold in sorted(set(THRESHOLDS + (LOCAL_CLASSIFIER_THRESHOLD,))):
+        decided = [(p, t) for (p, c), t in zip(predictions, labels) if p in TRUSTED_LABELS and c >= threshold]
+        wrong = sum(1 for p, t in decided if p != t)
+        precision = (len(decided) - wrong) / len(decided) if decided else 0.0
+        marker = '  <- current' if threshold == LOCAL_CLASSIFIER_THRESHOLD else ''
+        print(f"{threshold:<10}{len(decided) / max(1, len(labels)):>15.1%}{precision:>10.3f}{wrong:>7}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the local pass-1 classifier')
+    parser.add_argument('--limit', type=int, default=20000, help='most recent labeled articles to use')
+    parser.add_argument('--holdout', type=float, default=0.2, help='fraction held out for evaluation')
+    parser.add_argument('--eval-only', action='store_true', help='evaluate without saving a model')
+    args = parser.parse_args()
+
+    texts, labels = load_labeled_articles(args.limit)
+    print(f"Loaded {len(texts)} labeled articles: {dict(Counter(labels))}")
+    if len(set(labels)) < 2:
+        print("Need at least two classes to train")
+        return 1
+
+    indices = list(range(len(texts)))
+    random.Random(42).shuffle(indices)
+    split = int(len(indices) * (1 - args.holdout))
+    train, test = indices[:split], indices[split:]
+
+    model = LocalClassifier().fit([texts[i] for i in train], [labels[i] for i in train])
+    evaluate(model, [texts[i] for i in test], [labels[i] for i in test])
+
+    if not args.eval_only:
+        final = LocalClassifier().fit(texts, labels)
+        print(f"\nModel saved to {final.save()} ({len(final.vocabulary)} features)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,8 @@
 # utils/ai_rewriter.py
 import os
 from dotenv import load_dotenv
-from groq import Groq
 import logging
+from utils.llm_client import get_llm_client
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -11,12 +11,14 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise EnvironmentError("❌ GROQ_API_KEY missing in .env")
 
-client = Groq(api_key=GROQ_API_KEY)
+client = get_llm_client()
 
-def rewrite_news(original_text: str, original_title: str = "") -> str:
+def rewrite_news(original_text: str, original_title: str = "", interactive: bool = False) -> str:
     """
     Rewrites news article into positive, constructive tone.
     Returns only the rewritten summary as a string (max 500 chars).
+    interactive=True (web request handlers) fails fast on rate limits and
+    slow responses and falls back to the original text.
     """
     if not original_text or len(original_text.strip()) < 50:
         return (original_text or "")[:500]
@@ -34,13 +36,7 @@ Article:
 {truncated_text}
 """
     try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.4,
-            max_tokens=500
-        )
-        result = response.choices[0].message.content.strip()
+        result = client.complete(prompt, max_tokens=500, temperature=0.4, interactive=interactive).strip()
         return result[:500]
     except Exception as e:
         logger.error(f"Groq rewrite error: {e}")
@@ -0,0 +1,159 @@
+# utils/article_cache.py
+"""
+Per-article cache for GET /api/v1/articles/<id>.
+
+Each web worker keeps an LRU of rendered article JSON plus its ETag. Anything
+that changes or blocks an article (ingestion, moderation scripts) calls
+invalidate_articles(), which appends to a small SQLite invalidation log in
+STATE_DIR. Every worker replays that log at most once per
+ARTICLE_CACHE_SYNC_INTERVAL seconds, so entries are dropped across all
+processes without any extra network calls. ARTICLE_CACHE_TTL bounds staleness
+for writers that never call invalidate_articles().
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_CACHE_SIZE = int(os.getenv('ARTICLE_CACHE_SIZE', 2000))
+ARTICLE_CACHE_TTL = int(os.getenv('ARTICLE_CACHE_TTL', 900))
+ARTICLE_CACHE_SYNC_INTERVAL = float(os.getenv('ARTICLE_CACHE_SYNC_INTERVAL', 1.0))
+
+INVALIDATION_DB = 'article_cache.db'
+# article_id NULL in the log means "drop everything"
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS article_invalidations (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id INTEGER,
+        created_at REAL NOT NULL
+    )
+"""
+
+
+def _open_log():
+    conn = connect_state_db(INVALIDATION_DB)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def make_etag(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+class ArticleCache:
+    """Thread-safe LRU of article_id -> (body bytes, etag, stored_at)."""
+
+    def __init__(self, max_size=ARTICLE_CACHE_SIZE, ttl=ARTICLE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_seq = None
+        self._last_sync = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _sync(self):
+        """Apply invalidations written by other processes since the last sync."""
+        now = time.monotonic()
+        if now - self._last_sync < ARTICLE_CACHE_SYNC_INTERVAL:
+            return
+        self._last_sync = now
+        try:
+            conn = _open_log()
+            try:
+                if self._last_seq is None:
+                    # First sync: start from the end of the log, our cache is empty anyway
+                    row = conn.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM article_invalidations").fetchone()
+                    self._last_seq = row['seq']
+                    return
+                rows = conn.execute(
+                    "SELECT seq, article_id FROM article_invalidations WHERE seq > ? ORDER BY seq",
+                    (self._last_seq,)
+                ).fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Article cache sync failed: {e}")
+            return
+        for row in rows:
+            self._last_seq = row['seq']
+            if row['article_id'] is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(row['article_id'], None)
+
+    def get(self, article_id):
+        """Return (body, etag) or None."""
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(article_id)
+            if entry is None or time.monotonic() - entry[2] > self.ttl:
+                if entry is not None:
+                    del self._entries[article_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(article_id)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, article_id, body):
+        """Store rendered JSON bytes; returns (body, etag)."""
+        etag = make_etag(body)
+        with self._lock:
+            self._entries[article_id] = (body, etag, time.monotonic())
+            self._entries.move_to_end(article_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return body, etag
+
+    def discard(self, article_ids=None):
+        """Drop entries from this process only (None = everything)."""
+        with self._lock:
+            if article_ids is None:
+                self._entries.clear()
+            else:
+                for article_id in article_ids:
+                    self._entries.pop(article_id, None)
+
+    def stats(self):
+        return {'size': len(self._entries), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+
+article_cache = ArticleCache()
+
+
+def invalidate_articles(article_ids=None):
+    """
+    Invalidate cached articles in every process on this host.
+    Pass None to drop all entries (e.g. after a bulk UPDATE/DELETE).
+    Safe to call from scripts that never import Flask.
+    """
+    ids = None if article_ids is None else [int(a) for a in article_ids]
+    article_cache.discard(ids)
+    if ids is not None and not ids:
+        return True
+    try:
+        conn = _open_log()
+        try:
+            now = time.time()
+            with conn:
+                if ids is None:
+                    conn.execute("INSERT INTO article_invalidations (article_id, created_at) VALUES (NULL, ?)", (now,))
+                else:
+                    conn.executemany("INSERT INTO article_invalidations (article_id, created_at) VALUES (?, ?)",
+                                     [(article_id, now) for article_id in ids])
+                # Entries older than the TTL can no longer be cached anywhere
+                conn.execute("DELETE FROM article_invalidations WHERE created_at < ?", (now - 2 * ARTICLE_CACHE_TTL,))
+        finally:
+            conn.close()
+    except Exception as e:
+        logger.error(f"Failed to record article invalidation: {e}")
+        return False
+    return True
@@ -1,6 +1,7 @@
 # utils/cache.py
 import time
 import logging
+import threading
 from utils.db import get_db_connection
 
 logger = logging.getLogger(__name__)
@@ -22,4 +23,72 @@ def get_cached_categories():
         return categories
     except Exception as e:
         logger.error(f"Categories fetch error: {e}")
-        return _categories_cache['data'] if _categories_cache['data'] else []
\ No newline at end of file
+        return _categories_cache['data'] if _categories_cache['data'] else []
+
+
+class CategoryMap:
+    """
+    In-memory name -> id map of the categories table for ingestion.
+
+    Loaded with one query and shared by every pipeline worker; it is only
+    re-read when a name is missing, and missing categories are created in
+    one multi-row INSERT. Pass a connection from the calling thread, or None
+    to use a short-lived one.
+    """
+
+    def __init__(self):
+        self._ids = None
+        self._lock = threading.Lock()
+
+    def _with_conn(self, conn, fn):
+        if conn is not None:
+            return fn(conn)
+        own = get_db_connection()
+        try:
+            return fn(own)
+        finally:
+            own.close()
+
+    def _load(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id, name FROM categories")
+            self._ids = {row['name']: row['id'] for row in cursor.fetchall()}
+
+    def refresh(self, conn=None):
+        with self._lock:
+            self._with_conn(conn, self._load)
+
+    def ensure(self, names, conn=None):
+        """Make sure every name exists; returns {name: id} for `names`."""
+        names = [n for n in dict.fromkeys(names) if n]
+
+        def work(db):
+            if self._ids is None or any(n not in self._ids for n in names):
+                self._load(db)
+            missing = [n for n in names if n not in self._ids]
+            if missing:
+                with db.cursor() as cursor:
+                    cursor.execute(
+                        "INSERT INTO categories (name, description) VALUES " + ', '.join(['(%s, %s)'] * len(missing)),
+                        [value for n in missing for value in (n, f"{n} constructive news and updates")]
+                    )
+                db.commit()
+                logger.info(f"Created categories: {', '.join(missing)}")
+                self._load(db)
+            return {n: self._ids.get(n) for n in names}
+
+        with self._lock:
+            return self._with_conn(conn, work)
+
+    def get(self, name, conn=None, create=True):
+        """Category id for `name` (created when missing and create=True), else None."""
+        with self._lock:
+            if self._ids is not None and name in self._ids:
+                return self._ids[name]
+        if create:
+            return self.ensure([name], conn).get(name)
+        self.refresh(conn)
+        return self._ids.get(name)
+
+
+category_map = CategoryMap()
@@ -0,0 +1,212 @@
+# utils/checkpoint.py
+"""
+Durable progress for ingestion runs, so an interrupted run can resume.
+
+A run records in STATE_DIR/ingestion_checkpoint.db:
+- every source whose entries were all saved or dropped, with its outcome
+  (a resumed run skips those sources and reports the stored outcome);
+- per entry (keyed by article_hash) the work already paid for: the parsed
+  content and image, the pass-1 analysis and the final AI result.
+
+A checkpoint is keyed by the run's source set (source_set_key), because the
+scheduler runs only the due sources while a full refresh runs all of them.
+When a run is killed, the next run over the same sources picks up its
+checkpoint (unless it is older than CHECKPOINT_MAX_AGE_HOURS, or its process
+is still alive) and reuses those results instead of downloading and calling
+the LLM again; runs over other sources never see it. A run that completes
+deletes its checkpoint.
+"""
+
+import os
+import json
+import hashlib
+import time
+import logging
+import threading
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_ENABLED = os.getenv('CHECKPOINT_ENABLED', '1') == '1'
+CHECKPOINT_MAX_AGE_HOURS = float(os.getenv('CHECKPOINT_MAX_AGE_HOURS', 12))
+CHECKPOINT_DB = 'ingestion_checkpoint.db'
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS checkpoint_runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_key TEXT,
+        pid INTEGER,
+        started_at REAL,
+        updated_at REAL
+    );
+    CREATE TABLE IF NOT EXISTS checkpoint_sources (
+        run_id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        outcome TEXT,
+        finished_at REAL,
+        PRIMARY KEY (run_id, url)
+    );
+    CREATE TABLE IF NOT EXISTS checkpoint_entries (
+        run_id INTEGER NOT NULL,
+        article_hash TEXT NOT NULL,
+        stage TEXT,
+        payload TEXT,
+        updated_at REAL,
+        PRIMARY KEY (run_id, article_hash)
+    );
+"""
+
+# Payload fields stored as tuples by the pipeline
+_TUPLE_FIELDS = ('analysis', 'ai_result')
+
+
+def source_set_key(urls):
+    """Stable key of a set of source URLs (order and duplicates ignored)."""
+    return hashlib.sha1('\n'.join(sorted(set(urls))).encode('utf-8')).hexdigest()
+
+
+def _pid_alive(pid):
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class RunCheckpoint:
+    """Checkpoint of one ingestion run; thread-safe, one SQLite connection."""
+
+    def __init__(self, conn, run_id, resumed=False):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.run_id = run_id
+        self.resumed = resumed
+        self._done = {}
+        self._entries = {}
+        if resumed:
+            for row in conn.execute("SELECT url, outcome FROM checkpoint_sources WHERE run_id = ?", (run_id,)):
+                self._done[row['url']] = json.loads(row['outcome'] or '{}')
+            for row in conn.execute("SELECT article_hash, payload FROM checkpoint_entries WHERE run_id = ?", (run_id,)):
+                payload = json.loads(row['payload'] or '{}')
+                for field in _TUPLE_FIELDS:
+                    if payload.get(field) is not None:
+                        payload[field] = tuple(payload[field])
+                self._entries[row['article_hash']] = payload
+
+    @classmethod
+    def open(cls, run_key=''):
+        """
+        Resume the latest interrupted run with the same `run_key` if there is a
+        usable one, else start a new run.
+        """
+        conn = connect_state_db(CHECKPOINT_DB)
+        conn.executescript(_SCHEMA)
+        if 'run_key' not in {col['name'] for col in conn.execute("PRAGMA table_info(checkpoint_runs)")}:
+            # Checkpoints written before runs were keyed are never resumed
+            with conn:
+                conn.execute("ALTER TABLE checkpoint_runs ADD COLUMN run_key TEXT")
+        now = time.time()
+        max_age = CHECKPOINT_MAX_AGE_HOURS * 3600
+        row = conn.execute("SELECT run_id, pid, updated_at FROM checkpoint_runs WHERE run_key = ? "
+                           "ORDER BY run_id DESC LIMIT 1", (run_key,)).fetchone()
+        if row and now - (row['updated_at'] or 0) < max_age and not _pid_alive(row['pid']):
+            with conn:
+                conn.execute("UPDATE checkpoint_runs SET pid = ?, updated_at = ? WHERE run_id = ?",
+                             (os.getpid(), now, row['run_id']))
+            checkpoint = cls(conn, row['run_id'], resumed=True)
+            logger.info(f"Resuming ingestion run {checkpoint.run_id}: {len(checkpoint._done)} sources done, "
+                        f"{len(checkpoint._entries)} entries with saved work")
+            return checkpoint
+
+        with conn:
+            # Too old to trust (the feeds have moved on since) and nobody is running them
+            stale = conn.execute("SELECT run_id, pid FROM checkpoint_runs WHERE COALESCE(updated_at, 0) <= ?",
+                                 (now - max_age,)).fetchall()
+            for old in stale:
+                if not _pid_alive(old['pid']):
+                    cls._purge(conn, old['run_id'])
+            cursor = conn.execute("INSERT INTO checkpoint_runs (run_key, pid, started_at, updated_at) "
+                                  "VALUES (?, ?, ?, ?)", (run_key, os.getpid(), now, now))
+        return cls(conn, cursor.lastrowid)
+
+    @staticmethod
+    def _purge(conn, run_id):
+        conn.execute("DELETE FROM checkpoint_entries WHERE run_id = ?", (run_id,))
+        conn.execute("DELETE FROM checkpoint_sources WHERE run_id = ?", (run_id,))
+        conn.execute("DELETE FROM checkpoint_runs WHERE run_id = ?", (run_id,))
+
+    def _write(self, sql, params):
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(sql, params)
+                    self._conn.execute("UPDATE checkpoint_runs SET updated_at = ? WHERE run_id = ?",
+                                       (time.time(), self.run_id))
+            except Exception as e:
+                logger.warning(f"Checkpoint write failed: {e}")
+
+    def source_outcome(self, url):
+        """Stored outcome of a source this run already finished, else None."""
+        return self._done.get(url)
+
+    def source_done(self, url, outcome):
+        self._done[url] = outcome
+        self._write("INSERT OR REPLACE INTO checkpoint_sources (run_id, url, outcome, finished_at) VALUES (?, ?, ?, ?)",
+                    (self.run_id, url, json.dumps(outcome), time.time()))
+
+    def entry(self, article_hash):
+        """Work saved for an entry so far ({} if none)."""
+        with self._lock:
+            return dict(self._entries.get(article_hash, {}))
+
+    def update_entry(self, article_hash, stage, **fields):
+        """Merge `fields` into the entry's saved work; `stage` is the last step completed."""
+        with self._lock:
+            payload = self._entries.setdefault(article_hash, {})
+            payload.update(fields)
+            data = json.dumps(payload)
+        self._write("INSERT OR REPLACE INTO checkpoint_entries (run_id, article_hash, stage, payload, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)", (self.run_id, article_hash, stage, data, time.time()))
+
+    def entries_saved(self, article_hashes):
+        """Saved articles no longer need their work kept."""
+        article_hashes = list(article_hashes)
+        with self._lock:
+            for article_hash in article_hashes:
+                self._entries.pop(article_hash, None)
+            try:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM checkpoint_entries WHERE run_id = ? AND article_hash = ?",
+                                           [(self.run_id, h) for h in article_hashes])
+            except Exception as e:
+                logger.warning(f"Checkpoint write failed: {e}")
+
+    def finish(self):
+        """The run completed: drop its checkpoint."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._purge(self._conn, self.run_id)
+            except Exception as e:
+                logger.warning(f"Checkpoint cleanup failed: {e}")
+            self._conn.close()
+
+    def close(self):
+        """Keep the checkpoint for the next run (the run did not complete)."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_checkpoint(urls):
+    """RunCheckpoint for a run over `urls`, or None when checkpointing is disabled or unavailable."""
+    if not CHECKPOINT_ENABLED:
+        return None
+    try:
+        return RunCheckpoint.open(source_set_key(urls))
+    except Exception as e:
+        logger.warning(f"Ingestion checkpoint unavailable: {e}")
+        return None
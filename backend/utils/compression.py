@@ -0,0 +1,148 @@
+# utils/compression.py
+"""
+Response compression for the Flask app.
+
+- JSON responses above COMPRESS_MIN_SIZE are gzip/brotli encoded on the fly,
+  negotiated from the client's Accept-Encoding.
+- Static files are served from precompressed `.br`/`.gz` siblings when they
+  exist (generated by precompress_static.py), with Vary, ETag and Cache-Control.
+
+Brotli is optional: without the `brotli` package only gzip is offered.
+"""
+
+import os
+import re
+import gzip
+import mimetypes
+import logging
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
+# Only bother compressing bodies bigger than this (bytes)
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_MIMETYPES = {'application/json'}
+GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+
+# Cache lifetimes (seconds). Uploads and fingerprinted assets (app.3f9a1c2e.js) never
+# change under the same name, so they are cached for a year as immutable; other static
+# files get a day and HTML pages a short lifetime, revalidating by ETag.
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 86400))
+FINGERPRINTED_MAX_AGE = int(os.getenv('FINGERPRINTED_MAX_AGE', 31536000))
+HTML_MAX_AGE = int(os.getenv('HTML_MAX_AGE', 300))
+UPLOAD_MAX_AGE = int(os.getenv('UPLOAD_MAX_AGE', 31536000))
+
+# A content hash of 8+ hex characters as its own dotted/dashed part of the name
+FINGERPRINT_RE = re.compile(r'[.-][0-9a-f]{8,}\.[a-z0-9]+$', re.IGNORECASE)
+
+# Precompressed variants in order of preference
+PRECOMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+# Encodings we can produce on the fly, in order of preference
+DYNAMIC_ENCODINGS = ('br', 'gzip') if HAS_BROTLI else ('gzip',)
+
+
+def choose_encoding(available):
+    """Pick the best encoding the client accepts from `available`, or None."""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in available:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+def compress_response(response):
+    """after_request hook: encode large JSON bodies for clients that accept it."""
+    if response.mimetype not in COMPRESS_MIMETYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or response.status_code in (204, 206)
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding(DYNAMIC_ENCODINGS)
+    if not encoding:
+        return response
+
+    try:
+        compressed = compress_body(data, encoding)
+    except Exception as e:
+        logger.warning(f"Compression failed ({encoding}): {e}")
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(compressed))
+    # The encoded body is not byte-identical to the original: demote any ETag to weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_precompressed(directory, filename, max_age=STATIC_MAX_AGE, immutable=False):
+    """
+    send_from_directory() that prefers a precompressed sibling (`file.br`, `file.gz`)
+    when the client accepts it. ETags come from the file actually sent, so each
+    encoding gets its own validator.
+    """
+    available = []
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        path = safe_join(directory, filename + suffix)
+        if path and os.path.isfile(path):
+            available.append(encoding)
+
+    encoding = choose_encoding(available) if available else None
+    if encoding:
+        suffix = dict(PRECOMPRESSED_VARIANTS)[encoding]
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(directory, filename + suffix, mimetype=mimetype, max_age=max_age)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(directory, filename, max_age=max_age)
+
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def init_compression(app):
+    """Register the JSON compression hook and precompressed static serving."""
+    app.after_request(compress_response)
+
+    if app.static_folder and 'static' in app.view_functions:
+        def static_with_precompressed(filename):
+            if filename.endswith('.html'):
+                return send_precompressed(app.static_folder, filename, max_age=HTML_MAX_AGE)
+            if FINGERPRINT_RE.search(filename):
+                return send_precompressed(app.static_folder, filename, max_age=FINGERPRINTED_MAX_AGE,
+                                          immutable=True)
+            return send_precompressed(app.static_folder, filename, max_age=STATIC_MAX_AGE)
+        app.view_functions['static'] = static_with_precompressed
+
+    logger.info(f"Compression enabled (brotli: {HAS_BROTLI}, min size: {COMPRESS_MIN_SIZE} bytes)")
@@ -0,0 +1,108 @@
+# utils/content_filter.py
+"""
+Keyword/phrase content filters compiled once into a single regex.
+
+A RuleSet maps rule names to term lists. Terms match on word boundaries
+(so "blast" no longer fires on "blastoff"), spaces inside a phrase match any
+whitespace, and a trailing `*` makes the term a stem ("suicid*" matches
+"suicide", "suicidal"). All terms of a set share one compiled alternation,
+so a text is scanned once and every matched rule is reported.
+
+The shared rule sets used by ingestion and the cleanup scripts live at the
+bottom of this module.
+"""
+
+import re
+from collections import defaultdict
+
+
+def _term_pattern(term):
+    term = term.strip().lower()
+    stem = term.endswith('*')
+    words = term.rstrip('*').split()
+    pattern = r'\s+'.join(re.escape(w) for w in words)
+    return pattern + (r'\w*' if stem else '')
+
+
+class RuleSet:
+    """
+    rules: mapping of rule name -> iterable of terms.
+    """
+
+    def __init__(self, rules):
+        self.rules = {name: tuple(terms) for name, terms in rules.items()}
+        self._group_rule = {}
+        self._group_term = {}
+        alternatives = []
+        # Longer terms first so a phrase wins over a word it starts with
+        entries = sorted(((term, name) for name, terms in self.rules.items() for term in terms),
+                         key=lambda entry: len(entry[0]), reverse=True)
+        for index, (term, name) in enumerate(entries):
+            group = f"t{index}"
+            self._group_rule[group] = name
+            self._group_term[group] = term
+            alternatives.append(f"(?P<{group}>{_term_pattern(term)})")
+        self.regex = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE) if alternatives else None
+
+    def finditer(self, *texts):
+        """Yield (rule, term, matched_text) for every match, left to right."""
+        if self.regex is None:
+            return
+        for text in texts:
+            if not text:
+                continue
+            for match in self.regex.finditer(text):
+                group = match.lastgroup
+                yield self._group_rule[group], self._group_term[group], match.group(0)
+
+    def search(self, *texts):
+        """First (rule, matched_text) or None; stops at the first hit."""
+        for rule, _, matched in self.finditer(*texts):
+            return rule, matched
+        return None
+
+    def matches(self, *texts):
+        """Set of rule names that matched anywhere in `texts`."""
+        return {rule for rule, _, _ in self.finditer(*texts)}
+
+    def matched_terms(self, *texts):
+        """{rule: set of distinct terms that matched}"""
+        found = defaultdict(set)
+        for rule, term, _ in self.finditer(*texts):
+            found[rule].add(term)
+        return dict(found)
+
+
+# Pre-ingestion block list (rss_processor_v3.is_harmful_content); stems and inflected
+# forms keep what the old substring check caught ("raped", "killings", "corpses", ...)
+HARMFUL_CONTENT = RuleSet({
+    'suicide': ['suicid*', 'died by suicide'],
+    'killing': ['murdered', 'killing', 'killings', 'massacr*'],
+    'explosion': ['blast', 'blasts', 'blasted', 'blasting', 'explosion', 'explosions'],
+    'sexual_violence': ['rape', 'raped', 'rapes', 'rapist*'],
+    'graphic': ['graphic violence', 'corpse', 'corpses', 'body count', 'body counts'],
+})
+
+# Boilerplate that marks scraped text as unusable (rss_processor_v3.is_valid_content)
+INVALID_CONTENT = RuleSet({
+    'boilerplate': ['file photo', 'file image', 'image of', 'click here', 'read more'],
+})
+
+# Legacy backfill: broader stems used to flag already stored articles
+LEGACY_HARMFUL = RuleSet({
+    'suicide': ['suicid*'],
+    'killing': ['kill*', 'murder*', 'massacr*'],
+    'explosion': ['blast', 'blasts', 'blasted', 'explod*', 'explosion*'],
+    'sexual_violence': ['rape', 'raped', 'rapes', 'rapist*'],
+    'graphic': ['corpse*', 'body count*'],
+})
+
+# dry_run_cleanup.py also reports assaults and attacks
+LEGACY_HARMFUL_STRICT = RuleSet(dict(LEGACY_HARMFUL.rules, violence=('assault*', 'attack*')))
+
+# Keyword stand-in for the LLM classifier when MOCK_GROQ=1
+MOCK_CLASSIFIER = RuleSet({
+    'harmful': ['murder*', 'suicide*', 'terrorist*', 'explosion*', 'bomb', 'bombs', 'bombing*', 'bomber*'],
+    'negative': ['killed', 'died', 'death', 'deaths', 'attack*', 'injured', 'accident*', 'violence', 'crime*'],
+    'positive': ['launch*', 'achievement*', 'success*', 'award*', 'innovation*', 'celebration*'],
+})
@@ -0,0 +1,137 @@
+# utils/content_policy.py
+"""
+Content-sufficiency policy: when is the text a feed entry already carries
+(content:encoded, else summary) good enough to skip downloading the page?
+
+An entry's feed text is used directly when it does not look truncated and
+- it is at least the source's `min_feed_chars` (rss_sources.json), else
+  FEED_CONTENT_MIN_CHARS, or
+- the source has been learned to publish full text: of the pages we have
+  scraped for it, at least FEED_CONTENT_FULL_RATIO had (nearly) no more text
+  than the feed, and the feed text is at least FEED_CONTENT_FLOOR.
+
+Every scrape records a (feed chars, page chars) sample for its source in
+STATE_DIR/content_policy.db, which is what the learned rule reads.
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+FEED_CONTENT_MIN_CHARS = int(os.getenv('FEED_CONTENT_MIN_CHARS', 1500))
+FEED_CONTENT_FLOOR = int(os.getenv('FEED_CONTENT_FLOOR', 400))
+FEED_CONTENT_LEARN_SAMPLES = int(os.getenv('FEED_CONTENT_LEARN_SAMPLES', 5))
+FEED_CONTENT_FULL_RATIO = float(os.getenv('FEED_CONTENT_FULL_RATIO', 0.8))
+# Still download the page when the entry carries no image of its own
+FEED_CONTENT_SCRAPE_FOR_IMAGE = os.getenv('FEED_CONTENT_SCRAPE_FOR_IMAGE', '1') == '1'
+CONTENT_POLICY_DB = 'content_policy.db'
+# A sample counts as full text when the feed had at least this share of the page
+FULL_TEXT_SHARE = 0.9
+
+_TRUNCATED_RE = re.compile(
+    r'(?:\.\.\.|…|\[(?:…|\.\.\.|\+\d+ chars)\]|\b(?:read more|continue reading|read the full story|full story)\W*)\s*$',
+    re.IGNORECASE
+)
+_SENTENCE_END = ('.', '!', '?', '"', "'", '”', '’', ')')
+
+
+def looks_truncated(text):
+    """True when feed text ends with an ellipsis / "read more" or mid-sentence."""
+    text = (text or '').rstrip()
+    if not text:
+        return True
+    return bool(_TRUNCATED_RE.search(text[-40:])) or not text.endswith(_SENTENCE_END)
+
+
+class ContentPolicy:
+    def __init__(self):
+        self._samples = {}  # source url -> (samples, full_samples)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _open(self):
+        conn = connect_state_db(CONTENT_POLICY_DB)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS feed_content_samples (
+                source_url TEXT PRIMARY KEY,
+                samples INTEGER NOT NULL DEFAULT 0,
+                full_samples INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL
+            )
+        """)
+        return conn
+
+    def _load(self):
+        self._loaded = True
+        try:
+            conn = self._open()
+            try:
+                for row in conn.execute("SELECT source_url, samples, full_samples FROM feed_content_samples"):
+                    self._samples[row['source_url']] = (row['samples'], row['full_samples'])
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Content policy load failed: {e}")
+
+    def learned_full_text(self, source_url):
+        """True once enough scrapes showed this source's feed carries the whole article."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            samples, full = self._samples.get(source_url, (0, 0))
+        return samples >= FEED_CONTENT_LEARN_SAMPLES and full / samples >= FEED_CONTENT_FULL_RATIO
+
+    def decide(self, source, feed_text):
+        """(use_feed_text, reason) for one entry of `source`."""
+        length = len(feed_text or '')
+        if looks_truncated(feed_text):
+            return False, 'truncated'
+        min_chars = source.get('min_feed_chars')
+        min_chars = FEED_CONTENT_MIN_CHARS if min_chars is None else int(min_chars)
+        if length >= min_chars:
+            return True, f"{length} chars >= {min_chars}"
+        if length >= FEED_CONTENT_FLOOR and self.learned_full_text(source['url']):
+            return True, 'learned full-text feed'
+        return False, f"{length} chars < {min_chars}"
+
+    def record_sample(self, source_url, feed_chars, page_chars):
+        """Remember how the feed text of a scraped entry compared with the page."""
+        full = 1 if feed_chars >= FULL_TEXT_SHARE * page_chars else 0
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            samples, full_samples = self._samples.get(source_url, (0, 0))
+            self._samples[source_url] = (samples + 1, full_samples + full)
+        try:
+            conn = self._open()
+            try:
+                with conn:
+                    conn.execute("""
+                        INSERT INTO feed_content_samples (source_url, samples, full_samples, updated_at)
+                        VALUES (?, 1, ?, ?)
+                        ON CONFLICT(source_url) DO UPDATE SET
+                            samples = samples + 1,
+                            full_samples = full_samples + excluded.full_samples,
+                            updated_at = excluded.updated_at
+                    """, (source_url, full, time.time()))
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Content policy sample failed for {source_url}: {e}")
+
+
+_policy = None
+_policy_lock = threading.Lock()
+
+
+def get_content_policy():
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = ContentPolicy()
+        return _policy
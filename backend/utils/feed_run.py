@@ -0,0 +1,71 @@
+# utils/feed_run.py
+"""
+Per-source bookkeeping of an ingestion run (rss_processor_v3.IngestionRun).
+
+A FeedRun counts a source's entries down as the pipeline saves or drops
+them and, once the last one is done, records the poll: the feed's
+validators (ETag / Last-Modified / body hash) are saved so the next poll can
+short-circuit, unless an entry failed.
+"""
+
+import logging
+import threading
+from utils.feed_state import save_feed_state
+
+logger = logging.getLogger(__name__)
+
+
+def mark_feed_processed(fetch_result):
+    """Persist the feed's validators so the next poll can short-circuit."""
+    if fetch_result['status'] == 'ok':
+        save_feed_state(fetch_result['url'], fetch_result.get('etag'),
+                        fetch_result.get('last_modified'), fetch_result.get('content_hash'))
+    elif fetch_result['status'] in ('not_modified', 'unchanged'):
+        save_feed_state(fetch_result['url'], changed=False)
+
+
+class FeedRun:
+    """
+    Bookkeeping for one source while its entries move through the pipeline.
+    The outcome dict (status, entries, new_entries, processed, entry_times)
+    is what the scheduler learns from; feed state is saved (and the source
+    checkpointed) once every entry has been saved or dropped. When an entry
+    failed (AI, save or a stage error) the previous validators are kept, so the
+    next poll gets the full feed again instead of a 304 and retries it.
+    """
+
+    def __init__(self, source, fetch_result, checkpoint=None):
+        self.source = source
+        self.fetch_result = fetch_result
+        self.checkpoint = checkpoint
+        self.outcome = {'status': fetch_result['status'], 'entries': 0, 'new_entries': 0, 'processed': 0, 'entry_times': []}
+        self._pending = 0
+        self._failed = 0
+        self._lock = threading.Lock()
+
+    def start(self, count):
+        self._pending = count
+        if count == 0:
+            self.finish()
+
+    def entry_done(self, saved=False, failed=False):
+        with self._lock:
+            if saved:
+                self.outcome['processed'] += 1
+            if failed:
+                self._failed += 1
+            self._pending -= 1
+            done = self._pending == 0
+        if done:
+            self.finish()
+
+    def finish(self):
+        if self.outcome['status'] == 'ok':
+            logger.info(f"Processed {self.outcome['processed']} articles from {self.source['source_name']}")
+        if self._failed:
+            logger.warning(f"{self._failed} entries failed for {self.source['source_name']}; "
+                           f"keeping the previous feed validators so they are retried")
+        else:
+            mark_feed_processed(self.fetch_result)
+        if self.checkpoint:
+            self.checkpoint.source_done(self.source['url'], self.outcome)
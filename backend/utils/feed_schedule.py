@@ -0,0 +1,202 @@
+# utils/feed_schedule.py
+"""
+Adaptive polling schedule for RSS sources.
+
+Each source keeps an estimate of its publish cadence (an exponential moving
+average of the gap between new entries, learned from entry timestamps and
+from how many new entries each poll finds). Its next poll is due after
+
+    interval = cadence * SCHED_CADENCE_FRACTION * priority
+
+clamped to [SCHED_MIN_INTERVAL, SCHED_MAX_INTERVAL]. `priority` comes from
+rss_sources.json (1 = most important, polled most often). Failures back off
+exponentially and polls that find nothing new stretch the interval, so quiet
+or broken feeds cost few fetches while busy ones stay fresh.
+
+State lives in STATE_DIR/feed_schedule.db and is shared by the scheduler
+process and the admin endpoint.
+"""
+
+import os
+import time
+import logging
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+FEED_SCHEDULE_DB = 'feed_schedule.db'
+
+SCHED_MIN_INTERVAL = int(os.getenv('SCHED_MIN_INTERVAL', 120))
+SCHED_MAX_INTERVAL = int(os.getenv('SCHED_MAX_INTERVAL', 6 * 3600))
+SCHED_DEFAULT_CADENCE = int(os.getenv('SCHED_DEFAULT_CADENCE', 1800))
+# Poll about twice per expected new entry
+SCHED_CADENCE_FRACTION = float(os.getenv('SCHED_CADENCE_FRACTION', 0.5))
+# Weight of the newest observation in the cadence average
+SCHED_EMA_ALPHA = float(os.getenv('SCHED_EMA_ALPHA', 0.3))
+# Interval multiplier per consecutive poll without new entries
+SCHED_IDLE_BACKOFF = float(os.getenv('SCHED_IDLE_BACKOFF', 1.5))
+SCHED_MAX_BACKOFF_STEPS = 6
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS feed_schedule (
+        url TEXT PRIMARY KEY,
+        source_name TEXT,
+        priority INTEGER NOT NULL DEFAULT 1,
+        cadence REAL NOT NULL,
+        interval REAL NOT NULL,
+        next_poll_at REAL NOT NULL,
+        last_poll_at REAL,
+        last_new_at REAL,
+        last_status TEXT,
+        idle_polls INTEGER NOT NULL DEFAULT 0,
+        failures INTEGER NOT NULL DEFAULT 0,
+        total_polls INTEGER NOT NULL DEFAULT 0,
+        total_new INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+
+def _open():
+    conn = connect_state_db(FEED_SCHEDULE_DB)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def _priority(source):
+    try:
+        return max(1, int(source.get('priority', 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+def observed_gap(entry_times):
+    """Median gap (seconds) between consecutive entry publish times, or None."""
+    times = sorted(set(entry_times))
+    if len(times) < 2:
+        return None
+    gaps = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+    if not gaps:
+        return None
+    return gaps[len(gaps) // 2]
+
+
+def compute_interval(cadence, priority, idle_polls=0, failures=0):
+    interval = cadence * SCHED_CADENCE_FRACTION * priority
+    if failures:
+        interval = max(interval, SCHED_MIN_INTERVAL) * 2 ** min(failures, SCHED_MAX_BACKOFF_STEPS)
+    elif idle_polls:
+        interval *= SCHED_IDLE_BACKOFF ** min(idle_polls, SCHED_MAX_BACKOFF_STEPS)
+    return min(SCHED_MAX_INTERVAL, max(SCHED_MIN_INTERVAL, interval))
+
+
+def sync_sources(sources):
+    """Add new sources (due immediately), refresh names/priorities, drop removed ones."""
+    now = time.time()
+    urls = [s['url'] for s in sources]
+    conn = _open()
+    try:
+        with conn:
+            for source in sources:
+                priority = _priority(source)
+                conn.execute("""
+                    INSERT INTO feed_schedule (url, source_name, priority, cadence, interval, next_poll_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        source_name = excluded.source_name,
+                        priority = excluded.priority
+                """, (source['url'], source.get('source_name'), priority, SCHED_DEFAULT_CADENCE,
+                      compute_interval(SCHED_DEFAULT_CADENCE, priority), now))
+            if urls:
+                conn.execute(f"DELETE FROM feed_schedule WHERE url NOT IN ({', '.join('?' * len(urls))})", urls)
+            else:
+                conn.execute("DELETE FROM feed_schedule")
+    finally:
+        conn.close()
+
+
+def due_urls(now=None):
+    now = now or time.time()
+    conn = _open()
+    try:
+        rows = conn.execute(
+            "SELECT url FROM feed_schedule WHERE next_poll_at <= ? ORDER BY priority, next_poll_at", (now,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [row['url'] for row in rows]
+
+
+def next_due_at():
+    """Earliest next_poll_at across all sources, or None if nothing is scheduled."""
+    conn = _open()
+    try:
+        row = conn.execute("SELECT MIN(next_poll_at) AS next_at FROM feed_schedule").fetchone()
+    finally:
+        conn.close()
+    return row['next_at'] if row else None
+
+
+def record_poll(url, outcome, now=None):
+    """
+    Update a source's cadence estimate and next poll time from a
+    process_source() outcome dict.
+    """
+    now = now or time.time()
+    conn = _open()
+    try:
+        row = conn.execute("SELECT * FROM feed_schedule WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        cadence = row['cadence']
+        idle_polls = row['idle_polls']
+        failures = row['failures']
+        last_new_at = row['last_new_at']
+        new_entries = outcome.get('new_entries', 0)
+
+        if outcome.get('status') == 'error':
+            failures += 1
+        else:
+            failures = 0
+            samples = []
+            gap = observed_gap(outcome.get('entry_times') or [])
+            if gap:
+                samples.append(gap)
+            if new_entries and row['last_poll_at']:
+                samples.append((now - row['last_poll_at']) / new_entries)
+            for sample in samples:
+                cadence = (1 - SCHED_EMA_ALPHA) * cadence + SCHED_EMA_ALPHA * sample
+            if new_entries:
+                idle_polls = 0
+                last_new_at = now
+            else:
+                idle_polls += 1
+
+        interval = compute_interval(cadence, row['priority'], idle_polls, failures)
+        with conn:
+            conn.execute("""
+                UPDATE feed_schedule SET
+                    cadence = ?, interval = ?, next_poll_at = ?, last_poll_at = ?, last_new_at = ?,
+                    last_status = ?, idle_polls = ?, failures = ?,
+                    total_polls = total_polls + 1, total_new = total_new + ?
+                WHERE url = ?
+            """, (cadence, interval, now + interval, now, last_new_at, outcome.get('status'),
+                  idle_polls, failures, new_entries, url))
+        return interval
+    finally:
+        conn.close()
+
+
+def get_schedule():
+    """The next-poll table, soonest first, as a list of dicts."""
+    now = time.time()
+    conn = _open()
+    try:
+        rows = conn.execute("SELECT * FROM feed_schedule ORDER BY next_poll_at").fetchall()
+    finally:
+        conn.close()
+    table = []
+    for row in rows:
+        item = dict(row)
+        item['due_in'] = max(0, round(row['next_poll_at'] - now))
+        table.append(item)
+    return table
@@ -0,0 +1,97 @@
+# utils/feed_state.py
+"""
+Conditional GET bookkeeping for RSS polling.
+
+For every feed URL we remember the validators the server sent (ETag,
+Last-Modified) and a hash of the last body we processed. The next poll sends
+If-None-Match / If-Modified-Since; a 304, or a 200 whose body hashes the same
+(for servers that ignore validators), is skipped before feedparser ever runs.
+
+State is saved only after a feed has been processed, so a crashed run polls
+the same content again instead of losing it.
+"""
+
+import time
+import hashlib
+import logging
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+FEED_STATE_DB = 'feed_state.db'
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS feed_state (
+        url TEXT PRIMARY KEY,
+        etag TEXT,
+        last_modified TEXT,
+        content_hash TEXT,
+        checked_at REAL,
+        changed_at REAL
+    )
+"""
+
+
+def _open():
+    conn = connect_state_db(FEED_STATE_DB)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+def content_hash(body):
+    return hashlib.sha256(body or b'').hexdigest()
+
+
+def get_feed_state(url):
+    """Stored state for `url` as a dict, or {} if never fetched."""
+    try:
+        conn = _open()
+        try:
+            row = conn.execute("SELECT * FROM feed_state WHERE url = ?", (url,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else {}
+    except Exception as e:
+        logger.warning(f"Feed state lookup failed for {url}: {e}")
+        return {}
+
+
+def conditional_headers(state):
+    """If-None-Match / If-Modified-Since headers for a stored state."""
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+
+def save_feed_state(url, etag=None, last_modified=None, body_hash=None, changed=True):
+    """
+    Record a poll of `url`. With changed=False only checked_at moves
+    (the stored validators and hash are kept).
+    """
+    now = time.time()
+    try:
+        conn = _open()
+        try:
+            with conn:
+                if changed:
+                    conn.execute("""
+                        INSERT INTO feed_state (url, etag, last_modified, content_hash, checked_at, changed_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(url) DO UPDATE SET
+                            etag = excluded.etag,
+                            last_modified = excluded.last_modified,
+                            content_hash = excluded.content_hash,
+                            checked_at = excluded.checked_at,
+                            changed_at = excluded.changed_at
+                    """, (url, etag, last_modified, body_hash, now, now))
+                else:
+                    conn.execute("UPDATE feed_state SET checked_at = ? WHERE url = ?", (now, url))
+        finally:
+            conn.close()
+        return True
+    except Exception as e:
+        logger.warning(f"Feed state save failed for {url}: {e}")
+        return False
@@ -0,0 +1,76 @@
+# utils/fieldsets.py
+"""
+Sparse fieldsets for listing endpoints.
+
+Clients pick response fields with `?fields=id,title,image_url` or a preset with
+`?view=card|full`. Each field knows which SQL columns it needs, so the SELECT
+only projects what will actually be returned — list screens never pull
+`original_content` just to throw it away.
+"""
+
+# Length of the `snippet` field shown on cards
+SNIPPET_LENGTH = 280
+SNIPPET_SQL = f"LEFT(COALESCE(NULLIF(rewritten_summary, ''), original_content), {SNIPPET_LENGTH}) AS snippet"
+
+
+def _column_name(column):
+    """`COALESCE(a, b) AS x` -> `x`, `a.title` -> `title`."""
+    lowered = column.lower()
+    if ' as ' in lowered:
+        return column[lowered.rindex(' as ') + 4:].strip()
+    return column.split('.')[-1].strip()
+
+
+def parse_fields(args, available, full, card, always=('id',)):
+    """Resolve ?fields= / ?view= into an ordered tuple of field names."""
+    fields_param = (args.get('fields') or '').strip()
+    if fields_param:
+        requested = {f.strip() for f in fields_param.split(',') if f.strip()}
+        return tuple(f for f in available if f in requested or f in always)
+    if (args.get('view') or '').lower() == 'card':
+        return tuple(card)
+    return tuple(full)
+
+
+class Fieldset:
+    """
+    Field registry for one endpoint.
+
+    fields: ordered mapping of response field -> (sql columns, getter(row))
+    full:   fields returned by default (the endpoint's historical shape)
+    card:   fields returned for ?view=card
+    always: fields always included when a subset is requested (e.g. id)
+    """
+
+    def __init__(self, fields, full, card, always=('id',)):
+        self.fields = fields
+        self.full = tuple(full)
+        self.card = tuple(card)
+        self.always = tuple(always)
+
+    def parse(self, args):
+        return parse_fields(args, self.fields, self.full, self.card, self.always)
+
+    def columns(self, names, extra=()):
+        """SQL select list covering `names` plus any `extra` columns the query needs."""
+        columns = []
+        seen = set()
+        for col in list(extra) + [c for name in names for c in self.fields[name][0]]:
+            key = _column_name(col)
+            if key not in seen:
+                seen.add(key)
+                columns.append(col)
+        return ', '.join(columns)
+
+    def render(self, row, names):
+        return {name: self.fields[name][1](row) for name in names}
+
+
+def column(name):
+    """Getter for a field that maps 1:1 onto a selected column."""
+    return lambda row: row.get(name)
+
+
+def project(item, names, keep=('id',)):
+    """Trim an already-built item dict down to `names` (plus `keep`)."""
+    return {k: v for k, v in item.items() if k in names or k in keep}
@@ -0,0 +1,647 @@
+# utils/html_extract.py
+"""
+Single-pass article extraction from downloaded HTML.
+
+The page is parsed once and walked once. During the walk every content and
+image selector is matched against each element, so the body text, the
+og:image / twitter:image meta tags and the site-specific lead image all come
+out of the same traversal instead of one soup.select() per selector.
+
+Parser engines, fastest first:
+- lxml        (C, libxml2)    -- HAS_LXML
+- selectolax  (C, lexbor)     -- HAS_SELECTOLAX
+- bs4         (BeautifulSoup; uses lxml as its tree builder when present)
+
+HTML_EXTRACT_ENGINE picks one explicitly; 'auto' takes the first installed.
+
+Selectors support the subset our rules use: tag, #id, .class,
+[attr] / [attr="value"], :first-of-type, comma-separated alternatives and
+the descendant combinator (space). Text is collected the way the old
+BeautifulSoup path did (p/div elements holding a single string, inside the
+best content container, skipping junk elements), except that nested
+wrappers around the same string are counted once.
+
+Rules come from extraction_rules.json (next to rss_sources.json): a
+"default" block of content / image / junk selectors plus per-domain blocks
+whose selectors are tried before the defaults. Rules are compiled once per
+domain. The generic selector that wins on a domain is counted
+(SelectorLearner) and, once it has won SELECTOR_LEARN_MIN_HITS times, moved
+to the front for that domain; matching for a kind stops as soon as no
+better selector can still match, so a learned winner ends the search early.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import namedtuple, defaultdict, Counter
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse
+from utils.state_store import BACKEND_DIR, connect_state_db
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    from bs4 import BeautifulSoup, Tag
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+HTML_EXTRACT_ENGINE = os.getenv('HTML_EXTRACT_ENGINE', 'auto')
+EXTRACTION_RULES_PATH = os.getenv('EXTRACTION_RULES_PATH', os.path.join(BACKEND_DIR, 'extraction_rules.json'))
+SELECTOR_LEARN_MIN_HITS = int(os.getenv('SELECTOR_LEARN_MIN_HITS', 3))
+SELECTOR_STATS_DB = 'extraction_selectors.db'
+# Minimum extracted text length for a page to count as scraped
+MIN_ARTICLE_CHARS = 100
+
+TEXT_BLOCK_TAGS = frozenset(['p', 'div'])
+
+# Used only when extraction_rules.json is missing or unreadable
+DEFAULT_RULES = {
+    'content': [
+        'article', '[role="main"]', '.article-content', '.post-content',
+        '.entry-content', '.content', '.story-body', '.article-body',
+        'main', '.main-content', '#content', '.post'
+    ],
+    'image': [
+        'meta[property="og:image"]', 'meta[name="twitter:image"]',
+        'article img:first-of-type', '.article-content img:first-of-type',
+        '.story-body img:first-of-type', 'main img:first-of-type',
+        'figure img', '.featured-image img'
+    ],
+    'junk': ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form'],
+}
+
+ExtractResult = namedtuple('ExtractResult', ['text', 'image_url', 'engine', 'content_selector', 'image_selector'])
+
+_WS_RE = re.compile(r'\s+')
+_COMPOUND_RE = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*|\*)?'
+    r'(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[\w:-]+(?:=(?:"[^"]*"|\'[^\']*\'|[^\]]*))?\]|:first-of-type)*)$'
+)
+_PART_RE = re.compile(r'#([\w-]+)|\.([\w-]+)|\[([\w:-]+)(?:=("[^"]*"|\'[^\']*\'|[^\]]*))?\]|(:first-of-type)')
+
+
+# ---------------------------------------------------------------------------
+# Selectors
+# ---------------------------------------------------------------------------
+
+class Compound:
+    """One simple selector such as `img`, `.story-body` or `meta[property="og:image"]`."""
+
+    __slots__ = ('tag', 'id', 'classes', 'attrs', 'first_of_type')
+
+    def __init__(self, text):
+        match = _COMPOUND_RE.match(text)
+        if not match or not text:
+            raise ValueError(f"Unsupported selector: {text!r}")
+        tag = match.group('tag')
+        self.tag = tag.lower() if tag and tag != '*' else None
+        self.id = None
+        self.classes = []
+        self.attrs = []
+        self.first_of_type = False
+        for id_, cls, attr, value, first in _PART_RE.findall(match.group('rest')):
+            if id_:
+                self.id = id_
+            elif cls:
+                self.classes.append(cls)
+            elif attr:
+                self.attrs.append((attr.lower(), value.strip('"\'') if value else None))
+            elif first:
+                self.first_of_type = True
+
+    def key(self):
+        """Cheapest attribute to index this selector by."""
+        if self.id:
+            return 'id', self.id
+        if self.classes:
+            return 'class', self.classes[0]
+        if self.tag:
+            return 'tag', self.tag
+        if self.attrs:
+            return 'attr', self.attrs[0][0]
+        return 'any', None
+
+    def matches(self, frame):
+        if self.tag and frame.tag != self.tag:
+            return False
+        if self.id and frame.attrs.get('id') != self.id:
+            return False
+        for cls in self.classes:
+            if cls not in frame.classes:
+                return False
+        for name, value in self.attrs:
+            actual = frame.attrs.get(name)
+            if actual is None or (value is not None and actual != value):
+                return False
+        if self.first_of_type and not frame.first_of_type:
+            return False
+        return True
+
+
+class Selector:
+    """Descendant chain of compounds, e.g. `article img:first-of-type`."""
+
+    __slots__ = ('group', 'compounds')
+
+    def __init__(self, text, group):
+        self.group = group
+        self.compounds = [Compound(part) for part in text.split()]
+        if not self.compounds:
+            raise ValueError("Empty selector")
+
+    def matches(self, frame, ancestors):
+        compounds = self.compounds
+        if not compounds[-1].matches(frame):
+            return False
+        index = len(compounds) - 2
+        # Descendant combinators only, so matching ancestors greedily is exact
+        for ancestor in reversed(ancestors):
+            if index < 0:
+                break
+            if compounds[index].matches(ancestor):
+                index -= 1
+        return index < 0
+
+
+class SelectorSet:
+    """
+    Ordered selector groups (each may be a comma-separated list) indexed by
+    id / class / tag / attribute so each element is only tested against the
+    selectors that could possibly match it.
+    """
+
+    def __init__(self, groups):
+        self.groups = list(groups)
+        self._by = defaultdict(list)
+        for index, group in enumerate(self.groups):
+            for alternative in group.split(','):
+                alternative = alternative.strip()
+                if alternative:
+                    selector = Selector(alternative, index)
+                    self._by[selector.compounds[-1].key()].append(selector)
+
+    def candidates(self, frame):
+        by = self._by
+        found = by.get(('tag', frame.tag), [])
+        found = found + by.get(('any', None), [])
+        element_id = frame.attrs.get('id')
+        if element_id:
+            found = found + by.get(('id', element_id), [])
+        for cls in frame.classes:
+            found = found + by.get(('class', cls), [])
+        for name in frame.attrs:
+            found = found + by.get(('attr', name), [])
+        return found
+
+
+class ExtractionRules:
+    """
+    Compiled selectors for one domain. Content and image groups are in
+    priority order; `generic` holds the groups that came from the default
+    block (the only ones SelectorLearner counts).
+    """
+
+    def __init__(self, content, image, junk, generic=()):
+        self.content_groups = list(content)
+        self.image_groups = list(image)
+        self.content = SelectorSet(self.content_groups)
+        self.image = SelectorSet(self.image_groups)
+        self.junk = SelectorSet(junk)
+        self.generic = frozenset(generic)
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def load_rule_config(path=None):
+    """{'default': {...}, 'domains': {...}} from extraction_rules.json, cached."""
+    global _config
+    with _config_lock:
+        if _config is None or path:
+            path = path or EXTRACTION_RULES_PATH
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                _config = {'default': dict(DEFAULT_RULES, **data.get('default', {})),
+                           'domains': {d.lower(): r for d, r in data.get('domains', {}).items()}}
+                logger.info(f"Loaded extraction rules for {len(_config['domains'])} domains from {path}")
+            except Exception as e:
+                logger.error(f"Failed to load extraction rules from {path}: {e}; using built-in defaults")
+                _config = {'default': dict(DEFAULT_RULES), 'domains': {}}
+        return _config
+
+
+def reload_rules(path=None):
+    """Re-read the rule file and drop every compiled rule set."""
+    load_rule_config(path or EXTRACTION_RULES_PATH)
+    _compile_rules.cache_clear()
+
+
+def domain_key(domain):
+    """Hostname without a leading www., the key selector stats are kept under."""
+    domain = (domain or '').lower().split(':')[0]
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def _domain_block(domain):
+    """Most specific configured block for `domain` (suffix match on labels)."""
+    domains = load_rule_config()['domains']
+    parts = domain.split('.')
+    for i in range(len(parts) - 1):
+        block = domains.get('.'.join(parts[i:]))
+        if block is not None:
+            return block
+    return {}
+
+
+def _promote(groups, preferred):
+    if preferred and preferred in groups:
+        return [preferred] + [g for g in groups if g != preferred]
+    return list(groups)
+
+
+@lru_cache(maxsize=1024)
+def _compile_rules(domain, preferred_content, preferred_image):
+    default = load_rule_config()['default']
+    block = _domain_block(domain)
+    return ExtractionRules(
+        content=list(block.get('content', [])) + _promote(default['content'], preferred_content),
+        image=list(block.get('image', [])) + _promote(default['image'], preferred_image),
+        junk=list(default['junk']) + list(block.get('junk', [])),
+        generic=list(default['content']) + list(default['image']),
+    )
+
+
+def rules_for_domain(domain):
+    """Compiled rules for `domain` with its learned generic winners first."""
+    domain = domain_key(domain)
+    learner = get_selector_learner()
+    return _compile_rules(domain, learner.preferred(domain, 'content'), learner.preferred(domain, 'image'))
+
+
+class SelectorLearner:
+    """
+    Counts which generic selector produced the content container / image on
+    each domain. Counts are kept in memory and written to SQLite by flush(),
+    so they survive restarts without a write per page.
+    """
+
+    def __init__(self, min_hits=SELECTOR_LEARN_MIN_HITS):
+        self.min_hits = min_hits
+        self._hits = defaultdict(Counter)      # (domain, kind) -> Counter(selector)
+        self._pending = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _open(self):
+        conn = connect_state_db(SELECTOR_STATS_DB)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_selectors (
+                domain TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                selector TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL,
+                PRIMARY KEY (domain, kind, selector)
+            )
+        """)
+        return conn
+
+    def _load(self):
+        self._loaded = True
+        try:
+            conn = self._open()
+            try:
+                for row in conn.execute("SELECT domain, kind, selector, hits FROM extraction_selectors"):
+                    self._hits[(row['domain'], row['kind'])][row['selector']] += row['hits']
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Selector stats load failed: {e}")
+
+    def record(self, domain, kind, selector):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            self._hits[(domain, kind)][selector] += 1
+            self._pending[(domain, kind)][selector] += 1
+
+    def preferred(self, domain, kind):
+        """The selector that has won most often on `domain`, once it has min_hits wins."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            counts = self._hits.get((domain, kind))
+            if not counts:
+                return None
+            selector, hits = counts.most_common(1)[0]
+            return selector if hits >= self.min_hits else None
+
+    def flush(self):
+        """Add the counts recorded since the last flush to the SQLite totals."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+        rows = [(domain, kind, selector, hits, time.time())
+                for (domain, kind), counts in pending.items() for selector, hits in counts.items()]
+        if not rows:
+            return 0
+        try:
+            conn = self._open()
+            try:
+                with conn:
+                    conn.executemany("""
+                        INSERT INTO extraction_selectors (domain, kind, selector, hits, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(domain, kind, selector)
+                        DO UPDATE SET hits = hits + excluded.hits, updated_at = excluded.updated_at
+                    """, rows)
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Selector stats flush failed: {e}")
+        return len(rows)
+
+    def summary(self):
+        """{domain: {kind: [(selector, hits), ...]}} for reports."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            result = defaultdict(dict)
+            for (domain, kind), counts in self._hits.items():
+                result[domain][kind] = counts.most_common()
+            return dict(result)
+
+
+_learner = None
+_learner_lock = threading.Lock()
+
+
+def get_selector_learner():
+    global _learner
+    with _learner_lock:
+        if _learner is None:
+            _learner = SelectorLearner()
+        return _learner
+
+
+# ---------------------------------------------------------------------------
+# Parser engines
+# ---------------------------------------------------------------------------
+# Each engine parses HTML into a tree and yields (is_start, tag, attrs, node)
+# events in document order; string(node) mirrors BeautifulSoup's Tag.string.
+
+class LxmlEngine:
+    name = 'lxml'
+
+    def parse(self, html):
+        return lxml.html.document_fromstring(html)
+
+    def events(self, root):
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # comments and processing instructions
+            yield event == 'start', tag, element.attrib, element
+
+    def string(self, element):
+        while True:
+            if len(element) == 0:
+                return element.text or None
+            if len(element) > 1 or element.text or element[0].tail:
+                return None
+            element = element[0]
+
+
+class SelectolaxEngine:
+    name = 'selectolax'
+
+    def parse(self, html):
+        return LexborHTMLParser(html)
+
+    def events(self, tree):
+        root = tree.root
+        if root is None:
+            return
+        stack = [(root, True)]
+        while stack:
+            node, opening = stack.pop()
+            tag = node.tag
+            if not opening:
+                yield False, tag, None, node
+                continue
+            if tag[0] in '-_':
+                continue  # text and comment nodes
+            yield True, tag, node.attributes, node
+            stack.append((node, False))
+            stack.extend((child, True) for child in reversed(list(node.iter())))
+
+    def string(self, node):
+        while True:
+            children = list(node.iter(include_text=True))
+            if len(children) != 1:
+                return None
+            node = children[0]
+            if node.tag[0] in '-_':
+                return node.text(deep=False) or None
+
+
+class SoupEngine:
+    name = 'bs4'
+
+    def parse(self, html):
+        return BeautifulSoup(html, 'lxml' if HAS_LXML else 'html.parser')
+
+    def events(self, soup):
+        stack = [(soup, True, False)]
+        while stack:
+            node, opening, emit = stack.pop()
+            if not opening:
+                yield False, node.name, None, node
+                continue
+            if emit:
+                yield True, node.name, node.attrs, node
+                stack.append((node, False, True))
+            stack.extend((child, True, True) for child in reversed(node.contents) if isinstance(child, Tag))
+
+    def string(self, node):
+        return node.string
+
+
+ENGINES = {
+    'lxml': (HAS_LXML, LxmlEngine),
+    'selectolax': (HAS_SELECTOLAX, SelectolaxEngine),
+    'bs4': (HAS_BS4, SoupEngine),
+}
+
+
+def available_engines():
+    return [name for name, (installed, _) in ENGINES.items() if installed]
+
+
+@lru_cache(maxsize=None)
+def get_engine(name=None):
+    """Engine by name, or the configured / fastest installed one for None or 'auto'."""
+    name = name or HTML_EXTRACT_ENGINE
+    if name == 'auto':
+        installed = available_engines()
+        if not installed:
+            raise RuntimeError("No HTML parser installed (need lxml, selectolax or beautifulsoup4)")
+        name = installed[0]
+    installed, engine_class = ENGINES[name]
+    if not installed:
+        raise RuntimeError(f"HTML extraction engine '{name}' is not installed")
+    return engine_class()
+
+
+# ---------------------------------------------------------------------------
+# Extraction
+# ---------------------------------------------------------------------------
+
+class _Frame:
+    __slots__ = ('tag', 'attrs', 'classes', 'first_of_type', 'child_tags', 'containers', 'junk', 'block')
+
+    def __init__(self, tag, attrs, first_of_type):
+        self.tag = tag
+        self.attrs = attrs
+        cls = attrs.get('class')
+        if isinstance(cls, list):  # bs4 splits class for us
+            self.classes = cls
+        else:
+            self.classes = cls.split() if cls else ()
+        self.first_of_type = first_of_type
+        self.child_tags = set()
+        self.containers = ()
+        self.junk = False
+        self.block = False
+
+
+def _settled(found, has_value=None):
+    """
+    True once the best group found so far can no longer be beaten, i.e. every
+    higher-priority group has already had its first match.
+    """
+    best = min((g for g in found if has_value is None or has_value(found[g])), default=None)
+    return best is not None and all(g in found for g in range(best))
+
+
+def _walk(engine, tree, rules):
+    """
+    One pass over the tree. Returns (blocks, containers, images): blocks is a
+    list of (text, containers) where containers are the content group indexes
+    whose first match encloses the block (-1 is <body>); containers and
+    images map group index -> first match (images to its content/src value).
+    """
+    blocks = []
+    containers = {}
+    images = {}
+    content_done = image_done = False
+    stack = []
+    junk_depth = 0
+    block_depth = 0
+    for is_start, tag, attrs, node in engine.events(tree):
+        if not is_start:
+            frame = stack.pop()
+            if frame.junk:
+                junk_depth -= 1
+            if frame.block:
+                block_depth -= 1
+            continue
+
+        parent = stack[-1] if stack else None
+        first_of_type = parent is None or tag not in parent.child_tags
+        if parent is not None:
+            parent.child_tags.add(tag)
+        frame = _Frame(tag, attrs or {}, first_of_type)
+        frame.containers = parent.containers if parent is not None else ()
+        stack.append(frame)
+
+        ancestors = stack[:-1]
+        if junk_depth or any(s.matches(frame, ancestors) for s in rules.junk.candidates(frame)):
+            frame.junk = True
+            junk_depth += 1
+            continue
+
+        if tag == 'body' and -1 not in frame.containers:
+            frame.containers = frame.containers + (-1,)
+
+        if not content_done:
+            for selector in rules.content.candidates(frame):
+                if selector.group not in containers and selector.matches(frame, ancestors):
+                    containers[selector.group] = True
+                    frame.containers = frame.containers + (selector.group,)
+                    content_done = _settled(containers)
+        if not image_done:
+            for selector in rules.image.candidates(frame):
+                if selector.group not in images and selector.matches(frame, ancestors):
+                    images[selector.group] = frame.attrs.get('content') or frame.attrs.get('src')
+                    image_done = _settled(images, bool)
+
+        if tag in TEXT_BLOCK_TAGS and not block_depth:
+            text = engine.string(node)
+            if text and text.strip():
+                frame.block = True
+                block_depth += 1
+                blocks.append((text.strip(), frame.containers))
+    return blocks, containers, images
+
+
+def extract_article(html, url='', engine=None, rules=None, learn=True):
+    """
+    Parse `html` once and return ExtractResult(text, image_url, engine,
+    content_selector, image_selector). text is None when the best content
+    container yields <= MIN_ARTICLE_CHARS. With learn=True the winning
+    generic selectors are counted for the page's domain.
+    """
+    if engine is None or isinstance(engine, str):
+        engine = get_engine(engine)
+    domain = domain_key(urlparse(url).netloc)
+    rules = rules or rules_for_domain(domain)
+    tree = engine.parse(html)
+    blocks, containers, images = _walk(engine, tree, rules)
+
+    text = content_selector = None
+    chosen = min(containers, default=-1)
+    joined = ' '.join(block for block, enclosing in blocks if chosen in enclosing)
+    joined = _WS_RE.sub(' ', joined).strip()
+    if len(joined) > MIN_ARTICLE_CHARS:
+        text = joined
+        if chosen >= 0:
+            content_selector = rules.content_groups[chosen]
+
+    image_url = image_selector = None
+    for group in sorted(images):
+        if images[group]:
+            image_url = urljoin(url, images[group])
+            image_selector = rules.image_groups[group]
+            break
+
+    if learn and domain:
+        learner = get_selector_learner()
+        if content_selector in rules.generic:
+            learner.record(domain, 'content', content_selector)
+        if image_selector in rules.generic:
+            learner.record(domain, 'image', image_selector)
+    return ExtractResult(text, image_url, engine.name, content_selector, image_selector)
+
+
+def flush_selector_stats():
+    """Persist selector wins recorded since the last flush (end of an ingestion run)."""
+    return get_selector_learner().flush()
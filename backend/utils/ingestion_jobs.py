@@ -0,0 +1,226 @@
+# utils/ingestion_jobs.py
+"""
+SQLite job queue between the web app and ingestion_worker.py.
+
+/admin/refresh-rss only inserts a row here and returns the job id; the
+long-lived worker claims queued jobs one at a time, reports progress while
+the run goes and stores the result. A request for a kind that is already
+queued returns the queued job instead of adding another run.
+
+The worker also writes a heartbeat so the API can tell whether anything is
+going to pick the job up. A job left 'running' by a worker that died is put
+back in the queue (the run's checkpoint lets it resume).
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+INGESTION_JOBS_DB = 'ingestion_jobs.db'
+# A worker whose heartbeat is older than this is considered gone
+WORKER_HEARTBEAT_TIMEOUT = int(os.getenv('WORKER_HEARTBEAT_TIMEOUT', 60))
+JOB_HISTORY_DAYS = int(os.getenv('JOB_HISTORY_DAYS', 14))
+
+JOB_KINDS = ('general',)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ingestion_jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        requested_by TEXT,
+        created_at REAL,
+        started_at REAL,
+        finished_at REAL,
+        worker TEXT,
+        progress TEXT,
+        result TEXT,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status ON ingestion_jobs (status, created_at);
+    CREATE TABLE IF NOT EXISTS ingestion_workers (
+        worker TEXT PRIMARY KEY,
+        pid INTEGER,
+        host TEXT,
+        started_at REAL,
+        heartbeat_at REAL,
+        job_id TEXT
+    );
+"""
+
+
+def _open():
+    conn = connect_state_db(INGESTION_JOBS_DB)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _job_dict(row):
+    if row is None:
+        return None
+    job = dict(row)
+    for field in ('progress', 'result'):
+        job[field] = json.loads(job[field]) if job[field] else None
+    if job['started_at']:
+        job['elapsed_seconds'] = round((job['finished_at'] or time.time()) - job['started_at'], 1)
+    return job
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_job(kind='general', requested_by=None):
+    """Queue a run of `kind`; returns (job, created). An already queued job of the same kind is reused."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown ingestion job kind: {kind}")
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT * FROM ingestion_jobs WHERE kind = ? AND status = 'queued' "
+                               "ORDER BY created_at LIMIT 1", (kind,)).fetchone()
+            if row:
+                return _job_dict(row), False
+            job_id = uuid.uuid4().hex
+            conn.execute("INSERT INTO ingestion_jobs (job_id, kind, status, requested_by, created_at) "
+                         "VALUES (?, ?, 'queued', ?, ?)", (job_id, kind, requested_by, time.time()))
+            row = conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _job_dict(row), True
+    finally:
+        conn.close()
+
+
+def get_job(job_id):
+    conn = _open()
+    try:
+        job = _job_dict(conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone())
+        if job and job['status'] == 'queued':
+            job['queue_position'] = conn.execute(
+                "SELECT COUNT(*) FROM ingestion_jobs WHERE status = 'queued' AND created_at <= ?",
+                (job['created_at'],)
+            ).fetchone()[0]
+        return job
+    finally:
+        conn.close()
+
+
+def list_jobs(limit=20, status=None):
+    conn = _open()
+    try:
+        if status:
+            rows = conn.execute("SELECT * FROM ingestion_jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?",
+                                (status, limit)).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM ingestion_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [_job_dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def claim_next_job(worker):
+    """Atomically move the oldest queued job to 'running' for `worker`; None if the queue is empty."""
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT job_id FROM ingestion_jobs WHERE status = 'queued' "
+                               "ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE ingestion_jobs SET status = 'running', started_at = ?, worker = ?, error = NULL "
+                         "WHERE job_id = ?", (time.time(), worker, row['job_id']))
+            conn.execute("UPDATE ingestion_workers SET job_id = ? WHERE worker = ?", (row['job_id'], worker))
+            return _job_dict(conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (row['job_id'],)).fetchone())
+    finally:
+        conn.close()
+
+
+def update_progress(job_id, progress):
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("UPDATE ingestion_jobs SET progress = ? WHERE job_id = ?", (json.dumps(progress), job_id))
+    finally:
+        conn.close()
+
+
+def finish_job(job_id, result=None, error=None):
+    """Mark a job done (or failed when `error` is given)."""
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("UPDATE ingestion_jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE job_id = ?",
+                         ('failed' if error else 'done', time.time(),
+                          json.dumps(result) if result is not None else None, error, job_id))
+            conn.execute("UPDATE ingestion_workers SET job_id = NULL WHERE job_id = ?", (job_id,))
+    finally:
+        conn.close()
+
+
+def heartbeat(worker, started_at=None):
+    """Record that `worker` is alive."""
+    now = time.time()
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("""
+                INSERT INTO ingestion_workers (worker, pid, host, started_at, heartbeat_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(worker) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            """, (worker, os.getpid(), socket.gethostname(), started_at or now, now))
+    finally:
+        conn.close()
+
+
+def remove_worker(worker):
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("DELETE FROM ingestion_workers WHERE worker = ?", (worker,))
+    finally:
+        conn.close()
+
+
+def live_workers():
+    conn = _open()
+    try:
+        rows = conn.execute("SELECT * FROM ingestion_workers WHERE heartbeat_at >= ?",
+                            (time.time() - WORKER_HEARTBEAT_TIMEOUT,)).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def requeue_orphaned_jobs():
+    """
+    Put 'running' jobs whose worker stopped heart-beating back in the queue,
+    and drop dead workers and old finished jobs. Returns the number requeued.
+    """
+    now = time.time()
+    conn = _open()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cutoff = now - WORKER_HEARTBEAT_TIMEOUT
+            alive = {row['worker'] for row in conn.execute(
+                "SELECT worker FROM ingestion_workers WHERE heartbeat_at >= ?", (cutoff,))}
+            orphaned = [row['job_id'] for row in conn.execute(
+                "SELECT job_id, worker FROM ingestion_jobs WHERE status = 'running'") if row['worker'] not in alive]
+            for job_id in orphaned:
+                conn.execute("UPDATE ingestion_jobs SET status = 'queued', worker = NULL, "
+                             "error = 'worker stopped; requeued' WHERE job_id = ?", (job_id,))
+            conn.execute("DELETE FROM ingestion_workers WHERE heartbeat_at < ?", (cutoff,))
+            conn.execute("DELETE FROM ingestion_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                         (now - JOB_HISTORY_DAYS * 86400,))
+        if orphaned:
+            logger.warning(f"Requeued {len(orphaned)} ingestion jobs left by a stopped worker")
+        return len(orphaned)
+    finally:
+        conn.close()
@@ -0,0 +1,257 @@
+# utils/ingestion_metrics.py
+"""
+Per-source, per-stage metrics of an ingestion run.
+
+IngestionRun times every stage call (fetch, dedup, download, parse,
+classify, rewrite, save) and records it against the source(s) it worked
+for. Batch stages split the batch's time and LLM usage evenly over the
+items in it. Each call also records outcomes (saved, duplicate, blocked...),
+LLM calls and tokens (utils.llm_client.track_usage) and cache hits (work
+avoided: unchanged feeds, feed text used instead of a download, local
+classifier verdicts, results reused from an interrupted run).
+
+At the end of a run the rows go to the MySQL table ingestion_stage_metrics,
+one row per (run, source, stage). /admin/ingestion-metrics and
+metrics_reporter.py read them back.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from decimal import Decimal
+from collections import Counter
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('fetch', 'dedup', 'download', 'parse', 'classify', 'rewrite', 'save')
+METRICS_RETENTION_DAYS = int(os.getenv('METRICS_RETENTION_DAYS', 30))
+
+# The old run-wide counters, derived from stage outcomes
+COUNTER_OUTCOMES = {
+    'processed_count': ('saved',),
+    'skipped_count': ('duplicate', 'invalid'),
+    'failed_count': ('failed',),
+    'blocked_count': ('blocked',),
+    'near_duplicate_count': ('near_duplicate',),
+    'feed_content_count': ('feed_content',),
+}
+
+_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS ingestion_stage_metrics (
+        id BIGINT PRIMARY KEY AUTO_INCREMENT,
+        run_id CHAR(32) NOT NULL,
+        run_started_at DATETIME NOT NULL,
+        source_url VARCHAR(500) NOT NULL,
+        source_name VARCHAR(255),
+        stage VARCHAR(16) NOT NULL,
+        items INT NOT NULL DEFAULT 0,
+        errors INT NOT NULL DEFAULT 0,
+        total_ms INT NOT NULL DEFAULT 0,
+        max_ms INT NOT NULL DEFAULT 0,
+        llm_calls INT NOT NULL DEFAULT 0,
+        prompt_tokens INT NOT NULL DEFAULT 0,
+        completion_tokens INT NOT NULL DEFAULT 0,
+        cache_hits INT NOT NULL DEFAULT 0,
+        outcomes VARCHAR(1000),
+        INDEX idx_ingestion_stage_metrics_run (run_id),
+        INDEX idx_ingestion_stage_metrics_started (run_started_at)
+    )
+"""
+
+
+def _new_stage():
+    return {'items': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'llm_calls': 0.0,
+            'prompt_tokens': 0.0, 'completion_tokens': 0.0, 'outcomes': Counter(), 'cache': Counter()}
+
+
+class RunMetrics:
+    """Metrics of one ingestion run; thread-safe."""
+
+    def __init__(self, sources=()):
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._names = {source['url']: source.get('source_name', source['url']) for source in sources}
+        self._stages = {}  # (source url, stage) -> stage dict
+
+    def _stage(self, url, stage):
+        key = (url, stage)
+        if key not in self._stages:
+            self._stages[key] = _new_stage()
+        return self._stages[key]
+
+    def record(self, stage, urls, seconds, error=False, usage=None):
+        """One stage call that handled one item per entry of `urls` (time and LLM usage split evenly)."""
+        if not urls:
+            return
+        share = 1.0 / len(urls)
+        with self._lock:
+            for url in urls:
+                entry = self._stage(url, stage)
+                entry['items'] += 1
+                entry['errors'] += int(error)
+                entry['seconds'] += seconds * share
+                entry['max_seconds'] = max(entry['max_seconds'], seconds)
+                if usage:
+                    entry['llm_calls'] += usage['calls'] * share
+                    entry['prompt_tokens'] += usage['prompt_tokens'] * share
+                    entry['completion_tokens'] += usage['completion_tokens'] * share
+
+    def outcome(self, url, stage, name, n=1):
+        if n:
+            with self._lock:
+                self._stage(url, stage)['outcomes'][name] += n
+
+    def cache_hit(self, url, stage, kind, n=1):
+        if n:
+            with self._lock:
+                self._stage(url, stage)['cache'][kind] += n
+
+    def rows(self):
+        """One dict per (source, stage) in pipeline order, with totals rounded."""
+        with self._lock:
+            items = sorted(self._stages.items(), key=lambda kv: (kv[0][0], STAGES.index(kv[0][1])
+                                                                 if kv[0][1] in STAGES else len(STAGES)))
+            return [{
+                'source_url': url,
+                'source_name': self._names.get(url, url),
+                'stage': stage,
+                'items': entry['items'],
+                'errors': entry['errors'],
+                'total_ms': int(round(1000 * entry['seconds'])),
+                'max_ms': int(round(1000 * entry['max_seconds'])),
+                'llm_calls': int(round(entry['llm_calls'])),
+                'prompt_tokens': int(round(entry['prompt_tokens'])),
+                'completion_tokens': int(round(entry['completion_tokens'])),
+                'cache_hits': sum(entry['cache'].values()),
+                'outcomes': dict(entry['outcomes'], **{f"cache:{k}": v for k, v in entry['cache'].items()}),
+            } for (url, stage), entry in items]
+
+    def counters(self):
+        """The run-wide processed/skipped/failed/... counts."""
+        with self._lock:
+            outcomes = Counter()
+            for entry in self._stages.values():
+                outcomes.update(entry['outcomes'])
+        return {counter: sum(outcomes[name] for name in names) for counter, names in COUNTER_OUTCOMES.items()}
+
+    def stage_totals(self):
+        """Per stage across all sources: items, errors, total_ms, llm_calls, tokens, cache_hits."""
+        totals = {}
+        for row in self.rows():
+            stage = totals.setdefault(row['stage'], Counter())
+            for key in ('items', 'errors', 'total_ms', 'llm_calls', 'prompt_tokens', 'completion_tokens', 'cache_hits'):
+                stage[key] += row[key]
+        return {stage: dict(totals[stage]) for stage in STAGES if stage in totals}
+
+    def summary(self):
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_seconds': round(time.monotonic() - self._started, 2),
+            'counters': self.counters(),
+            'stages': self.stage_totals(),
+        }
+
+    def log_slowest(self, limit=5):
+        """Log the (source, stage) pairs that took the most time."""
+        for row in sorted(self.rows(), key=lambda r: r['total_ms'], reverse=True)[:limit]:
+            logger.info(f"  {row['source_name'][:30]:<30} {row['stage']:<9} items={row['items']} "
+                        f"total={row['total_ms']}ms max={row['max_ms']}ms tokens={row['prompt_tokens'] + row['completion_tokens']} "
+                        f"cache={row['cache_hits']}")
+
+
+def save_run_metrics(metrics, db_conn):
+    """Insert the run's rows into ingestion_stage_metrics and drop rows past retention."""
+    rows = metrics.rows()
+    if not rows:
+        return 0
+    started = metrics.started_at.strftime('%Y-%m-%d %H:%M:%S')
+    values = [(metrics.run_id, started, row['source_url'][:500], (row['source_name'] or '')[:255], row['stage'],
+               row['items'], row['errors'], row['total_ms'], row['max_ms'], row['llm_calls'],
+               row['prompt_tokens'], row['completion_tokens'], row['cache_hits'],
+               json.dumps(row['outcomes'])[:1000]) for row in rows]
+    try:
+        with db_conn.cursor() as cursor:
+            cursor.execute(_CREATE_TABLE)
+            cursor.executemany("""
+                INSERT INTO ingestion_stage_metrics
+                    (run_id, run_started_at, source_url, source_name, stage, items, errors, total_ms, max_ms,
+                     llm_calls, prompt_tokens, completion_tokens, cache_hits, outcomes)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, values)
+            cursor.execute("DELETE FROM ingestion_stage_metrics WHERE run_started_at < %s",
+                           ((datetime.now() - timedelta(days=METRICS_RETENTION_DAYS)).strftime('%Y-%m-%d %H:%M:%S'),))
+        db_conn.commit()
+        return len(values)
+    except Exception:
+        db_conn.rollback()
+        raise
+
+
+def _decode(rows):
+    """JSON-ready rows: outcomes parsed, DECIMAL sums as numbers, datetimes as ISO strings."""
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, Decimal):
+                row[key] = int(value) if value == value.to_integral_value() else float(value)
+            elif isinstance(value, datetime):
+                row[key] = value.isoformat()
+        if isinstance(row.get('outcomes'), str):
+            row['outcomes'] = json.loads(row['outcomes'] or '{}')
+    return rows
+
+
+def recent_runs(db_conn, limit=20):
+    """Latest runs with their totals."""
+    with db_conn.cursor() as cursor:
+        cursor.execute(_CREATE_TABLE)
+        cursor.execute("""
+            SELECT run_id, MIN(run_started_at) AS started_at, COUNT(DISTINCT source_url) AS sources,
+                   SUM(CASE WHEN stage = 'save' THEN items ELSE 0 END) AS articles_reaching_save,
+                   SUM(total_ms) AS total_ms, SUM(llm_calls) AS llm_calls,
+                   SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,
+                   SUM(cache_hits) AS cache_hits, SUM(errors) AS errors
+            FROM ingestion_stage_metrics
+            GROUP BY run_id
+            ORDER BY started_at DESC
+            LIMIT %s
+        """, (limit,))
+        return _decode(list(cursor.fetchall()))
+
+
+def run_breakdown(db_conn, run_id):
+    """Every (source, stage) row of one run, slowest first."""
+    with db_conn.cursor() as cursor:
+        cursor.execute(_CREATE_TABLE)
+        cursor.execute("""
+            SELECT source_name, source_url, stage, items, errors, total_ms, max_ms, llm_calls,
+                   prompt_tokens, completion_tokens, cache_hits, outcomes, run_started_at
+            FROM ingestion_stage_metrics
+            WHERE run_id = %s
+            ORDER BY total_ms DESC
+        """, (run_id,))
+        return _decode(list(cursor.fetchall()))
+
+
+def stage_summary(db_conn, since, until=None):
+    """Per source and stage over runs started in [since, until): where the time went."""
+    until = until or datetime.now() + timedelta(seconds=1)
+    with db_conn.cursor() as cursor:
+        cursor.execute(_CREATE_TABLE)
+        cursor.execute("""
+            SELECT source_name, stage, COUNT(DISTINCT run_id) AS runs, SUM(items) AS items, SUM(errors) AS errors,
+                   SUM(total_ms) AS total_ms, ROUND(SUM(total_ms) / NULLIF(SUM(items), 0), 1) AS avg_ms,
+                   MAX(max_ms) AS max_ms, SUM(llm_calls) AS llm_calls, SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens, SUM(cache_hits) AS cache_hits
+            FROM ingestion_stage_metrics
+            WHERE run_started_at >= %s AND run_started_at < %s
+            GROUP BY source_name, stage
+            ORDER BY SUM(total_ms) DESC
+        """, (since.strftime('%Y-%m-%d %H:%M:%S'), until.strftime('%Y-%m-%d %H:%M:%S')))
+        return _decode(list(cursor.fetchall()))
@@ -0,0 +1,77 @@
+# utils/json_provider.py
+"""
+Fast JSON provider for the Flask app.
+
+Uses orjson when it is installed and falls back to the stdlib encoder otherwise.
+Both paths emit datetimes in ISO 8601 (the same shape as `datetime.isoformat()`,
+which feed.py already uses) and Decimals as numbers, so responses look the same
+whichever backend is active.
+"""
+
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+
+def _default(obj):
+    """Encode the types pymysql hands back that JSON has no native form for."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's default provider, but with ISO timestamps instead of HTTP dates."""
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson-backed provider; builds response bodies straight from bytes."""
+    sort_keys = False
+
+    _options = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+
+    def _dump_bytes(self, obj, indent=False):
+        option = self._options | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dump_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dump_bytes(obj, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the fastest available JSON provider on `app`."""
+    provider_class = OrjsonProvider if HAS_ORJSON else StdlibJSONProvider
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+    logger.info(f"JSON provider: {provider_class.__name__}")
+    return app.json
@@ -0,0 +1,281 @@
+# utils/llm_client.py
+"""
+Shared client for the OpenAI-compatible chat completions API (Groq).
+
+- One keep-alive requests.Session for every call in the process.
+- Two token buckets (requests/min and tokens/min) that wait before sending
+  instead of collecting 429s. Their rates come from our own settings; the
+  x-ratelimit-* headers of every response only lower the tokens left and
+  pause a bucket until the server's reset when it is exhausted.
+- A semaphore caps in-flight requests (LLM_MAX_CONCURRENCY).
+- 429, 5xx and connection errors are retried with jittered exponential backoff.
+- interactive=True (web request handlers) fails fast instead: no retries,
+  a short timeout and at most LLM_INTERACTIVE_MAX_WAIT of rate-limit wait.
+- Per-call latency and prompt/completion token totals are kept for stats();
+  track_usage() also collects the calls made by the current thread, so
+  callers can attribute tokens to their own work.
+
+GROQ_BASE_URL points the client at any compatible server, e.g. a local mock.
+"""
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1').rstrip('/')
+LLM_MODEL = os.getenv('LLM_MODEL', 'llama-3.1-8b-instant')
+LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 30))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 4))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv('LLM_REQUESTS_PER_MINUTE', 30))
+LLM_TOKENS_PER_MINUTE = float(os.getenv('LLM_TOKENS_PER_MINUTE', 6000))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 4))
+LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', 1.0))
+LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', 30.0))
+LLM_INTERACTIVE_TIMEOUT = float(os.getenv('LLM_INTERACTIVE_TIMEOUT', 10))
+LLM_INTERACTIVE_MAX_WAIT = float(os.getenv('LLM_INTERACTIVE_MAX_WAIT', 2))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Usage keys collected per thread by track_usage()
+USAGE_KEYS = ('calls', 'errors', 'prompt_tokens', 'completion_tokens')
+
+_usage = threading.local()
+
+
+class LLMError(Exception):
+    """A chat completion failed after all retries."""
+
+
+def parse_duration(value):
+    """Rate-limit reset values: '7.66s', '2m59.56s', '1h2m', '250ms' or plain seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, matched = 0.0, False
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        matched = True
+        total += float(amount) * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
+    return total if matched else None
+
+
+class TokenBucket:
+    """Blocking token bucket refilled at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1.0, max_wait=None):
+        """
+        Take `amount` tokens, sleeping until they are available. With `max_wait`,
+        give up (return False) when they would not be available in time.
+        """
+        amount = min(amount, self.capacity)
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = max(self.paused_until - now, (amount - self.tokens) / self.rate)
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(min(wait, 5.0))
+
+    def sync(self, remaining=None, reset=None):
+        """
+        Apply x-ratelimit-* headers. The server's limit is not adopted as our
+        capacity: Groq reports the requests limit per day, which would allow
+        bursts far above the per-minute rate. Only the tokens left are lowered,
+        and the bucket pauses until the reset once the server says none are left.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if reset and float(remaining) < 1:
+                    self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class LLMClient:
+    def __init__(self, api_key=None, base_url=GROQ_BASE_URL, model=LLM_MODEL,
+                 max_concurrency=LLM_MAX_CONCURRENCY, requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=LLM_TOKENS_PER_MINUTE, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES):
+        self.api_key = api_key if api_key is not None else os.getenv('GROQ_API_KEY', '')
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.requests_bucket = TokenBucket(requests_per_minute)
+        self.tokens_bucket = TokenBucket(tokens_per_minute)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {'calls': 0, 'errors': 0, 'retries': 0, 'rate_limited': 0,
+                       'latency_total': 0.0, 'latency_max': 0.0,
+                       'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def _record(self, **values):
+        usage = getattr(_usage, 'current', None)
+        if usage is not None:
+            for key in USAGE_KEYS:
+                usage[key] += values.get(key, 0)
+        with self._stats_lock:
+            for key, value in values.items():
+                if key == 'latency':
+                    self._stats['latency_total'] += value
+                    self._stats['latency_max'] = max(self._stats['latency_max'], value)
+                else:
+                    self._stats[key] += value
+
+    def _sync_limits(self, headers):
+        self.requests_bucket.sync(headers.get('x-ratelimit-remaining-requests'),
+                                  parse_duration(headers.get('x-ratelimit-reset-requests')))
+        self.tokens_bucket.sync(headers.get('x-ratelimit-remaining-tokens'),
+                                parse_duration(headers.get('x-ratelimit-reset-tokens')))
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 0.5)
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+    def chat(self, messages, max_tokens=500, temperature=0.3, model=None, interactive=False):
+        """
+        Send one chat completion and return the message content.
+        Raises LLMError once retries are exhausted. interactive=True is for
+        callers a user is waiting on: one attempt, LLM_INTERACTIVE_TIMEOUT, and
+        LLMError instead of waiting longer than LLM_INTERACTIVE_MAX_WAIT for the
+        rate limits.
+        """
+        payload = {
+            'messages': messages,
+            'model': model or self.model,
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        }
+        headers = {'Authorization': f'Bearer {self.api_key}', 'Content-Type': 'application/json'}
+        # Rough prompt size (4 chars/token) plus the completion budget
+        estimated_tokens = sum(len(m.get('content') or '') for m in messages) / 4 + max_tokens
+
+        max_retries = 0 if interactive else self.max_retries
+        timeout = min(self.timeout, LLM_INTERACTIVE_TIMEOUT) if interactive else self.timeout
+        max_wait = LLM_INTERACTIVE_MAX_WAIT if interactive else None
+
+        last_error = None
+        for attempt in range(max_retries + 1):
+            if not (self.requests_bucket.acquire(1, max_wait)
+                    and self.tokens_bucket.acquire(estimated_tokens, max_wait)):
+                self._record(rate_limited=1)
+                raise LLMError("Rate limit reached; not waiting in interactive mode")
+            retry_after = None
+            with self._slots:
+                started = time.monotonic()
+                try:
+                    resp = self.session.post(f"{self.base_url}/chat/completions", headers=headers,
+                                             json=payload, timeout=timeout)
+                except requests.RequestException as e:
+                    last_error = e
+                    resp = None
+                latency = time.monotonic() - started
+
+            if resp is not None:
+                self._sync_limits(resp.headers)
+                if resp.status_code == 200:
+                    try:
+                        data = resp.json()
+                        content = data['choices'][0]['message']['content'] or ''
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        self._record(calls=1, errors=1, latency=latency)
+                        raise LLMError(f"Malformed completion response: {e}")
+                    usage = data.get('usage') or {}
+                    self._record(calls=1, latency=latency,
+                                 prompt_tokens=usage.get('prompt_tokens', 0),
+                                 completion_tokens=usage.get('completion_tokens', 0))
+                    return content
+                last_error = LLMError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+                if resp.status_code == 429:
+                    self._record(rate_limited=1)
+                    retry_after = parse_duration(resp.headers.get('retry-after'))
+                    self.requests_bucket.pause(retry_after or 1.0)
+                if resp.status_code not in RETRY_STATUSES:
+                    self._record(calls=1, errors=1, latency=latency)
+                    raise last_error
+
+            if attempt < max_retries:
+                delay = self._backoff(attempt, retry_after)
+                self._record(retries=1)
+                logger.warning(f"LLM call failed ({last_error}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        self._record(calls=1, errors=1)
+        raise LLMError(f"LLM call failed after {max_retries + 1} attempts: {last_error}")
+
+    def complete(self, prompt, max_tokens=500, temperature=0.3, model=None, interactive=False):
+        """Single user-message convenience wrapper around chat()."""
+        return self.chat([{'role': 'user', 'content': prompt}], max_tokens=max_tokens,
+                         temperature=temperature, model=model, interactive=interactive)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        calls = stats['calls'] or 1
+        stats['avg_latency_ms'] = round(1000 * stats.pop('latency_total') / calls, 1)
+        stats['max_latency_ms'] = round(1000 * stats.pop('latency_max'), 1)
+        return stats
+
+
+@contextmanager
+def track_usage():
+    """Collect calls, errors and tokens of the LLM calls this thread makes inside the block."""
+    previous = getattr(_usage, 'current', None)
+    usage = dict.fromkeys(USAGE_KEYS, 0)
+    _usage.current = usage
+    try:
+        yield usage
+    finally:
+        _usage.current = previous
+        if previous is not None:
+            for key in USAGE_KEYS:
+                previous[key] += usage[key]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Process-wide client so every caller shares the session and rate limits."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
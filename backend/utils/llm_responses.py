@@ -0,0 +1,118 @@
+# utils/llm_responses.py
+"""
+Parsers for the LLM responses of the ingestion passes.
+
+Pass 1 (analysis) answers CATEGORY/SENTIMENT/REASON lines, or a JSON array
+for a batch; pass 2 (rewrite) answers HEADLINE/SUMMARY lines. The parsers
+never raise: missing or malformed fields fall back to defaults (single
+analysis) or are left out (batch).
+"""
+
+import re
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_analysis_response(text):
+    """Parse AI analysis response for CATEGORY, SENTIMENT, REASON"""
+    category = 'REFRAMABLE'
+    sentiment = 'NEUTRAL'
+    reason = 'No analysis provided'
+
+    if not text:
+        logger.warning("Empty AI analysis response")
+        return category, sentiment, reason
+
+    try:
+        for prefix in ('CATEGORY', 'SENTIMENT', 'REASON'):
+            pattern = rf'^{prefix}:\s*(.+)$'
+            m = re.search(pattern, text, flags=re.IGNORECASE | re.MULTILINE)
+            if m:
+                val = m.group(1).strip()
+                if prefix == 'CATEGORY':
+                    val_up = val.upper()
+                    if val_up in ('CONSTRUCTIVE', 'REFRAMABLE', 'HARMFUL'):
+                        category = val_up
+                elif prefix == 'SENTIMENT':
+                    val_up = val.upper()
+                    if val_up in ('POSITIVE', 'NEGATIVE', 'NEUTRAL'):
+                        sentiment = val_up
+                elif prefix == 'REASON':
+                    reason = val if val else reason
+    except Exception as e:
+        logger.error(f"Analysis response parsing error: {e}")
+
+    return category, sentiment, reason
+
+
+def parse_rewrite_response(text):
+    """Parse AI rewrite response for HEADLINE and SUMMARY"""
+    headline = None
+    summary = None
+
+    if not text:
+        return headline, summary
+
+    try:
+        for prefix in ('HEADLINE', 'SUMMARY'):
+            pattern = rf'^{prefix}:\s*(.+)$'
+            m = re.search(pattern, text, flags=re.IGNORECASE | re.MULTILINE)
+            if m:
+                val = m.group(1).strip()
+                if prefix == 'HEADLINE':
+                    headline = val if val else None
+                elif prefix == 'SUMMARY':
+                    summary = val.strip() if val and val.strip() else None
+    except Exception as e:
+        logger.error(f"Rewrite response parsing error: {e}")
+
+    return headline, summary
+
+
+def parse_batch_analysis(text, ids):
+    """
+    Parse a batched pass-1 response into {id: (category, sentiment, reason)}.
+    Accepts the requested JSON array and, failing that, one line per item
+    that starts with the id ("1.", "ID 2:", "[ID 3]") followed by a category;
+    numbers elsewhere in a line are never taken as ids. Ids that cannot be
+    resolved are omitted.
+    """
+    results = {}
+    if not text:
+        return results
+    wanted = set(ids)
+    
+    def accept(item_id, category, sentiment, reason):
+        category = (category or '').strip().upper()
+        sentiment = (sentiment or '').strip().upper()
+        if item_id in wanted and category in ('CONSTRUCTIVE', 'REFRAMABLE', 'HARMFUL'):
+            if sentiment not in ('POSITIVE', 'NEGATIVE', 'NEUTRAL'):
+                sentiment = 'NEUTRAL'
+            results[item_id] = (category, sentiment, (reason or '').strip() or 'No analysis provided')
+    
+    start, end = text.find('['), text.rfind(']')
+    if start != -1 and end > start:
+        try:
+            for obj in json.loads(text[start:end + 1]):
+                if isinstance(obj, dict):
+                    try:
+                        item_id = int(obj.get('id'))
+                    except (TypeError, ValueError):
+                        continue
+                    accept(item_id, obj.get('category'), obj.get('sentiment'), obj.get('reason'))
+        except ValueError:
+            pass
+    
+    if len(results) < len(wanted):
+        line_pattern = re.compile(
+            r'^\s*[\[(*-]?\s*(?:ID\s*)?(\d+)\s*[\].:)\-]\D{0,20}?\b(CONSTRUCTIVE|REFRAMABLE|HARMFUL)\b'
+            r'(?:\W+(?:SENTIMENT\W*)?(POSITIVE|NEGATIVE|NEUTRAL)\b)?(?:\W+(?:REASON\W*)?(.*))?',
+            re.IGNORECASE
+        )
+        for line in text.splitlines():
+            m = line_pattern.search(line)
+            if m and int(m.group(1)) not in results:
+                accept(int(m.group(1)), m.group(2), m.group(3), m.group(4))
+    return results
@@ -0,0 +1,193 @@
+# utils/local_classifier.py
+"""
+CPU-only pre-classifier for pass 1 (CONSTRUCTIVE / REFRAMABLE / HARMFUL).
+
+A multinomial logistic regression over TF-IDF unigrams and bigrams, written
+in plain Python so it needs no extra dependencies. It is trained on labels
+we already store in `articles`:
+
+- is_ai_rewritten = 1                                 -> REFRAMABLE
+- is_ai_rewritten = 0 and sentiment = 'POSITIVE'      -> CONSTRUCTIVE
+- blocked_legacy = 1                                  -> HARMFUL
+
+Ingestion calls local_verdict(); only CONSTRUCTIVE predictions at or above
+LOCAL_CLASSIFIER_THRESHOLD are trusted, everything else goes to the LLM.
+HARMFUL drops an article and its training labels come from the keyword
+based blocked_legacy flag, so it always gets an LLM verdict; REFRAMABLE
+articles get an LLM rewrite anyway.
+train_local_classifier.py trains the model, evaluates it on a holdout split
+and writes it to STATE_DIR/local_classifier.json.
+"""
+
+import os
+import re
+import json
+import math
+import random
+import logging
+import threading
+from collections import Counter
+from utils.state_store import get_state_path
+
+logger = logging.getLogger(__name__)
+
+LABELS = ('CONSTRUCTIVE', 'REFRAMABLE', 'HARMFUL')
+LOCAL_CLASSIFIER_ENABLED = os.getenv('LOCAL_CLASSIFIER_ENABLED', '1') == '1'
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', 0.9))
+# Labels a confident local prediction may decide without the LLM
+TRUSTED_LABELS = ('CONSTRUCTIVE',)
+MODEL_FILENAME = 'local_classifier.json'
+# Only the start of the body is used, for training and prediction alike
+CLASSIFIER_TEXT_CHARS = 2000
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9']+")
+
+
+def article_text(title, content):
+    return f"{title or ''} {(content or '')[:CLASSIFIER_TEXT_CHARS]}"
+
+
+def tokenize(text):
+    """Lowercased word unigrams plus adjacent bigrams."""
+    words = _TOKEN_RE.findall((text or '').lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class LocalClassifier:
+    def __init__(self, vocabulary=None, idf=None, weights=None, bias=None, labels=LABELS):
+        self.labels = tuple(labels)
+        self.vocabulary = vocabulary or {}
+        self.idf = idf or []
+        # weights[k] maps feature index -> weight for label k
+        self.weights = weights or [{} for _ in self.labels]
+        self.bias = bias or [0.0] * len(self.labels)
+
+    def vectorize(self, text):
+        """Sparse, L2-normalised sublinear TF-IDF vector as {index: value}."""
+        counts = Counter(t for t in tokenize(text) if t in self.vocabulary)
+        vector = {}
+        for token, count in counts.items():
+            index = self.vocabulary[token]
+            vector[index] = (1.0 + math.log(count)) * self.idf[index]
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {i: v / norm for i, v in vector.items()}
+
+    def _scores(self, vector):
+        return [self.bias[k] + sum(w.get(i, 0.0) * v for i, v in vector.items())
+                for k, w in enumerate(self.weights)]
+
+    @staticmethod
+    def _softmax(scores):
+        top = max(scores)
+        exps = [math.exp(s - top) for s in scores]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict_proba(self, text):
+        probs = self._softmax(self._scores(self.vectorize(text)))
+        return dict(zip(self.labels, probs))
+
+    def classify(self, text):
+        """(label, confidence) for `text`."""
+        probs = self.predict_proba(text)
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def fit(self, texts, labels, max_features=20000, min_df=2, epochs=8, learning_rate=0.5, l2=1e-5, seed=42):
+        """Build the vocabulary and train by SGD on the softmax cross-entropy."""
+        doc_freq = Counter()
+        for text in texts:
+            doc_freq.update(set(tokenize(text)))
+        kept = [t for t, df in doc_freq.most_common(max_features) if df >= min_df]
+        self.vocabulary = {token: i for i, token in enumerate(kept)}
+        n_docs = len(texts)
+        self.idf = [math.log((1 + n_docs) / (1 + doc_freq[t])) + 1.0 for t in kept]
+        self.weights = [{} for _ in self.labels]
+        self.bias = [0.0] * len(self.labels)
+
+        label_index = {label: k for k, label in enumerate(self.labels)}
+        samples = [(self.vectorize(text), label_index[label]) for text, label in zip(texts, labels)]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(samples)
+            rate = learning_rate / (1 + epoch)
+            for vector, target in samples:
+                probs = self._softmax(self._scores(vector))
+                for k, weights in enumerate(self.weights):
+                    gradient = probs[k] - (1.0 if k == target else 0.0)
+                    self.bias[k] -= rate * gradient
+                    for i, v in vector.items():
+                        w = weights.get(i, 0.0)
+                        weights[i] = w - rate * (gradient * v + l2 * w)
+        return self
+
+    def to_dict(self):
+        return {
+            'labels': list(self.labels),
+            'vocabulary': self.vocabulary,
+            'idf': self.idf,
+            'weights': [{str(i): round(w, 6) for i, w in weights.items() if abs(w) > 1e-6} for weights in self.weights],
+            'bias': self.bias,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            vocabulary=data['vocabulary'],
+            idf=data['idf'],
+            weights=[{int(i): w for i, w in weights.items()} for weights in data['weights']],
+            bias=data['bias'],
+            labels=data['labels'],
+        )
+
+    def save(self, path=None):
+        path = path or get_state_path(MODEL_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or get_state_path(MODEL_FILENAME)
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_local_classifier():
+    """The trained model, loaded once per process; None if disabled or not trained yet."""
+    global _model, _model_loaded
+    if not LOCAL_CLASSIFIER_ENABLED:
+        return None
+    with _model_lock:
+        if not _model_loaded:
+            _model_loaded = True
+            try:
+                _model = LocalClassifier.load()
+                logger.info(f"Local classifier loaded ({len(_model.vocabulary)} features)")
+            except FileNotFoundError:
+                logger.info("No local classifier model; every article goes to the LLM")
+            except Exception as e:
+                logger.warning(f"Local classifier failed to load: {e}")
+        return _model
+
+
+def local_verdict(title, content, threshold=None):
+    """
+    (category, sentiment, reason, 'local') for a confident CONSTRUCTIVE
+    prediction, otherwise None (escalate to the LLM).
+    """
+    model = get_local_classifier()
+    if model is None:
+        return None
+    threshold = LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    label, confidence = model.classify(article_text(title, content))
+    if label not in TRUSTED_LABELS or confidence < threshold:
+        return None
+    return label, 'POSITIVE', f"Local classifier ({confidence:.2f})", 'local'
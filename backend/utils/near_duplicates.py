@@ -0,0 +1,221 @@
+# utils/near_duplicates.py
+"""
+Near-duplicate story detection for ingestion.
+
+The same wire story republished by several outlets gets a different
+title/link/date and therefore a different article_hash. Here each story is
+reduced to a MinHash signature over word shingles of its normalised headline
+and opening text; stories whose estimated Jaccard similarity reaches
+NEAR_DUP_THRESHOLD are treated as one cluster and only the first member is
+processed.
+
+Lookups use LSH banding: the signature is split into NEAR_DUP_BANDS bands
+and only stories sharing at least one identical band are compared. The index
+keeps the last NEAR_DUP_WINDOW_HOURS of stories and is preloaded from MySQL
+so clusters survive restarts.
+"""
+
+import os
+import re
+import time
+import random
+import calendar
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_ENABLED = os.getenv('NEAR_DUP_ENABLED', '1') == '1'
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', 0.5))
+NEAR_DUP_WINDOW_HOURS = int(os.getenv('NEAR_DUP_WINDOW_HOURS', 48))
+# 64 permutations in 16 bands of 4 rows: pairs above ~0.5 similarity almost
+# always share a band, unrelated stories almost never do
+NUM_PERMUTATIONS = 64
+NEAR_DUP_BANDS = 16
+SHINGLE_SIZE = 3
+# Opening words of the body used next to the headline
+BODY_WORDS = 250
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1109)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERMUTATIONS)]
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have he her his in is it its of on or
+    said says she that the their they this to was were will with after over
+""".split())
+
+
+def normalize_words(text):
+    return [w for w in _WORD_RE.findall((text or '').lower()) if w not in STOPWORDS]
+
+
+def shingles(title, content):
+    """Set of word shingles of the headline and the opening body text."""
+    result = set()
+    for words in (normalize_words(title), normalize_words(content)[:BODY_WORDS]):
+        if len(words) < SHINGLE_SIZE:
+            if words:
+                result.add(' '.join(words))
+            continue
+        result.update(' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return result
+
+
+def minhash(features):
+    """MinHash signature (tuple of NUM_PERMUTATIONS ints); None when there are no features."""
+    if not features:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode('utf-8'), digest_size=8).digest(), 'big')
+              for f in features]
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def story_signature(title, content):
+    return minhash(shingles(title, content))
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """Thread-safe in-memory MinHash LSH index over a sliding time window."""
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, window_seconds=NEAR_DUP_WINDOW_HOURS * 3600,
+                 bands=NEAR_DUP_BANDS):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._entries = {}  # key -> (signature, added_at)
+        self._lock = threading.Lock()
+
+    def _band_values(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows] for i in range(self.bands)]
+
+    def _find(self, signature, exclude=None):
+        best, best_score = None, self.threshold
+        seen = {exclude}
+        for band, value in enumerate(self._band_values(signature)):
+            for key in self._buckets[band].get(value, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = similarity(signature, self._entries[key][0])
+                if score >= best_score:
+                    best, best_score = key, score
+        return best
+
+    def _add(self, key, signature, added_at):
+        if key in self._entries:
+            return
+        self._entries[key] = (signature, added_at)
+        for band, value in enumerate(self._band_values(signature)):
+            self._buckets[band][value].add(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        signature = entry[0]
+        for band, value in enumerate(self._band_values(signature)):
+            bucket = self._buckets[band].get(value)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][value]
+
+    def prune(self, now=None):
+        cutoff = (now or time.time()) - self.window_seconds
+        with self._lock:
+            for key in [k for k, (_, added_at) in self._entries.items() if added_at < cutoff]:
+                self._remove(key)
+
+    def add(self, key, title, content, added_at=None):
+        signature = story_signature(title, content)
+        if signature is None:
+            return
+        with self._lock:
+            self._add(key, signature, added_at or time.time())
+
+    def check_and_add(self, key, title, content):
+        """
+        Return the key of an earlier story in the same cluster, or None after
+        registering this story as the cluster's first member. Atomic, so two
+        workers racing on the same story cannot both be treated as new.
+        Re-checking a key that is already registered never matches itself.
+        """
+        signature = story_signature(title, content)
+        if signature is None:
+            return None
+        with self._lock:
+            match = self._find(signature, exclude=key)
+            if match is None:
+                self._add(key, signature, time.time())
+            return match
+
+    def discard(self, key):
+        """Forget a story registered by check_and_add that was not saved after all."""
+        with self._lock:
+            self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def load_recent(index, db_conn, hours=NEAR_DUP_WINDOW_HOURS):
+    """
+    Preload stories ingested in the last `hours` from MySQL. Ingestion writes
+    created_at in UTC (datetime.utcnow()), so the cutoff and the timestamps
+    are computed here in UTC rather than with NOW()/UNIX_TIMESTAMP(), which
+    use the session time zone.
+    """
+    if db_conn is None:
+        return 0
+    cutoff = datetime.utcnow() - timedelta(hours=hours)
+    with db_conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, title, original_content, created_at
+            FROM articles
+            WHERE created_at >= %s
+              AND (blocked_legacy IS NULL OR blocked_legacy = 0)
+        """, (cutoff.strftime('%Y-%m-%d %H:%M:%S'),))
+        rows = cursor.fetchall()
+    for row in rows:
+        created_at = row['created_at']
+        added_at = calendar.timegm(created_at.timetuple()) if created_at else time.time()
+        index.add(f"db:{row['id']}", row['title'], row['original_content'], float(added_at))
+    return len(rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index(db_conn=None):
+    """
+    Process-wide index, preloaded from MySQL on first use so a long-running
+    scheduler keeps its clusters across runs. Returns None when disabled.
+    """
+    global _index
+    if not NEAR_DUP_ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+            try:
+                loaded = load_recent(_index, db_conn)
+                logger.info(f"Near-duplicate index preloaded with {loaded} recent stories")
+            except Exception as e:
+                logger.warning(f"Near-duplicate preload failed: {e}")
+        else:
+            _index.prune()
+        return _index
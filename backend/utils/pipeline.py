@@ -0,0 +1,218 @@
+# utils/pipeline.py
+"""
+Minimal staged pipeline: stages connected by bounded queues, each with its
+own worker pool.
+
+- A full queue blocks the upstream stage (backpressure), so a slow stage
+  never buffers unbounded work in memory.
+- A stage function returns the item for the next stage, None to drop it, or
+  (for fan_out stages) an iterable of items. Batch stages (batch_size > 1)
+  receive a list of up to batch_size items, waiting at most batch_wait
+  seconds to fill it, and return a list of the same length.
+- Shutdown is by sentinel: when the last worker of a stage exits it sends
+  one sentinel per worker of the next stage.
+- Every stage records items in/out, drops, errors, busy time, queue wait and
+  per-item latency; Pipeline.stats() summarises them with throughput.
+"""
+
+import queue
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+
+
+class StageMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items_in = 0
+        self.items_out = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_latency = 0.0
+        self.first_at = None
+        self.last_at = None
+
+    def record(self, latency, wait, produced, dropped, error):
+        now = time.monotonic()
+        with self._lock:
+            self.items_in += 1
+            self.items_out += produced
+            self.dropped += dropped
+            self.errors += error
+            self.busy_seconds += latency
+            self.wait_seconds += wait
+            self.max_latency = max(self.max_latency, latency)
+            if self.first_at is None:
+                self.first_at = now - latency
+            self.last_at = now
+
+    def snapshot(self, workers):
+        with self._lock:
+            active = (self.last_at - self.first_at) if self.first_at is not None else 0.0
+            return {
+                'workers': workers,
+                'items_in': self.items_in,
+                'items_out': self.items_out,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'avg_latency_ms': round(1000 * self.busy_seconds / self.items_in, 1) if self.items_in else 0.0,
+                'max_latency_ms': round(1000 * self.max_latency, 1),
+                'avg_queue_wait_ms': round(1000 * self.wait_seconds / self.items_in, 1) if self.items_in else 0.0,
+                'throughput_per_sec': round(self.items_in / active, 2) if active > 0 else 0.0,
+                # Share of the stage's worker capacity that was busy while it was active
+                'utilisation': round(self.busy_seconds / (active * workers), 2) if active > 0 else 0.0,
+            }
+
+
+class Stage:
+    """One pipeline step: fn(item) run by `workers` threads reading a queue of `queue_size`."""
+
+    def __init__(self, name, fn, workers=1, queue_size=32, fan_out=False, batch_size=1, batch_wait=0.5):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.fan_out = fan_out
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.metrics = StageMetrics()
+
+
+class Pipeline:
+    """
+    Run items through `stages` in order.
+
+    on_drop(stage_name, item) is called for every item a stage drops or fails
+    on; on_output(item) for every item leaving the last stage. Both run on
+    worker threads.
+    """
+
+    def __init__(self, stages, on_drop=None, on_output=None):
+        self.stages = stages
+        self.on_drop = on_drop
+        self.on_output = on_output
+        self.elapsed = 0.0
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+
+    def _emit(self, index, item):
+        if index + 1 < len(self.stages):
+            self._queues[index + 1].put((time.monotonic(), item))
+        elif self.on_output:
+            # A failing callback must not kill the worker: upstream would block on a full queue
+            try:
+                self.on_output(item)
+            except Exception as e:
+                logger.error(f"Pipeline on_output failed in {self.stages[index].name}: {e}")
+
+    def _drop(self, stage, item):
+        if self.on_drop:
+            try:
+                self.on_drop(stage.name, item)
+            except Exception as e:
+                logger.error(f"Pipeline on_drop failed in {stage.name}: {e}")
+
+    def _handle(self, index, stage, item, result):
+        """Route one stage result; returns (produced, dropped)."""
+        if stage.fan_out:
+            produced = 0
+            for out in (result or ()):
+                self._emit(index, out)
+                produced += 1
+            return produced, 0
+        if result is None:
+            self._drop(stage, item)
+            return 0, 1
+        self._emit(index, result)
+        return 1, 0
+
+    def _next_batch(self, stage, inbox):
+        """Up to batch_size (enqueued_at, item) pairs; returns (batch, stop)."""
+        enqueued_at, item = inbox.get()
+        if item is _SENTINEL:
+            return [], True
+        batch = [(enqueued_at, item)]
+        deadline = time.monotonic() + stage.batch_wait
+        while len(batch) < stage.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                enqueued_at, item = inbox.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _SENTINEL:
+                return batch, True
+            batch.append((enqueued_at, item))
+        return batch, False
+
+    def _worker(self, index, remaining, lock):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch(stage, inbox)
+            if not batch:
+                continue
+            started = time.monotonic()
+            items = [item for _, item in batch]
+            try:
+                if stage.batch_size > 1:
+                    results = stage.fn(items)
+                    if len(results) != len(items):
+                        raise ValueError(f"batch returned {len(results)} results for {len(items)} items")
+                else:
+                    results = [stage.fn(items[0])]
+                error = 0
+            except Exception as e:
+                logger.error(f"Pipeline stage {stage.name} failed: {e}")
+                results, error = [None] * len(items), 1
+            latency = (time.monotonic() - started) / len(items)
+            for (enqueued_at, item), result in zip(batch, results):
+                if error:
+                    self._drop(stage, item)
+                    produced, dropped = 0, 0
+                else:
+                    produced, dropped = self._handle(index, stage, item, result)
+                stage.metrics.record(latency, started - enqueued_at, produced, dropped, error)
+
+        # The last worker out tells the next stage to shut down
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                self._queues[index + 1].put((time.monotonic(), _SENTINEL))
+
+    def run(self, items):
+        """Feed `items` into the first stage and block until every stage has drained."""
+        started = time.monotonic()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index, remaining, lock),
+                                          name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            self._queues[0].put((time.monotonic(), item))
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put((time.monotonic(), _SENTINEL))
+
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - started
+        return self.stats()
+
+    def stats(self):
+        return {
+            'elapsed_seconds': round(self.elapsed, 2),
+            'stages': {stage.name: stage.metrics.snapshot(stage.workers) for stage in self.stages},
+        }
@@ -18,6 +18,7 @@ logger = logging.getLogger(__name__)
 
 # Import centralized RSS feed config
 from rss_feeds import RSS_FEEDS
+from utils.cache import category_map
 
 # Optional AI Rewriter - safe import
 try:
@@ -57,12 +58,9 @@ def fetch_and_store_rss():
             category_name = feed_config['category']
             source_name = feed_config.get('source_name', 'Unknown')
 
-            # Dynamic category lookup
-            cursor.execute("SELECT id FROM categories WHERE name = %s", (category_name,))
-            result = cursor.fetchone()
-            if result:
-                category_id = result['id']
-            else:
+            # Dynamic category lookup (shared in-memory map, re-read only on a miss)
+            category_id = category_map.get(category_name, conn, create=False)
+            if category_id is None:
                 category_id = 1
                 logger.warning(f"Category '{category_name}' not found in DB. Using General (ID=1).")
 
@@ -0,0 +1,213 @@
+# utils/search_index.py
+"""
+Full-text article search backed by a local SQLite FTS5 index.
+
+- Ingestion calls index_articles() after each batch insert, so the index stays
+  current without ever scanning `articles`.
+- search() ranks with BM25 (headline weighted over summary), filters by
+  category and pages with an opaque keyset cursor (score, rowid).
+- `python3 -m utils.search_index --rebuild` (re)builds it from MySQL.
+
+The index holds ids and text only; the API loads display fields from MySQL by
+primary key, which also hides articles blocked after they were indexed.
+
+Paging is not a snapshot. BM25 scores depend on corpus statistics (document
+count, term frequencies, average length), so every ingestion batch shifts
+them, and a cursor taken before an insert can skip or repeat a few results
+on the next page. Scores stay stable between inserts, and those come in
+batches every few minutes. That is acceptable for browsing search results,
+but callers that need an exact listing should not page through search().
+"""
+
+import os
+import re
+import json
+import base64
+import logging
+import threading
+from utils.state_store import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_DB = 'search_index.db'
+HEADLINE_WEIGHT = float(os.getenv('SEARCH_HEADLINE_WEIGHT', 3.0))
+SUMMARY_WEIGHT = 1.0
+MAX_QUERY_TERMS = 8
+
+_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(
+        headline,
+        summary,
+        category_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+_local = threading.local()
+
+
+def _connection():
+    """One connection per thread; FTS5 reads are cheap but opening files is not free."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = connect_state_db(SEARCH_INDEX_DB)
+        conn.execute(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def build_match_query(text):
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word must match,
+    the last word also as a prefix (search-as-you-type). Returns None if empty.
+    """
+    terms = re.findall(r'\w+', (text or '').lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{t}"' for t in terms[:-1]]
+    quoted.append(f'"{terms[-1]}"*')
+    return ' '.join(quoted)
+
+
+def encode_cursor(score, article_id):
+    raw = json.dumps({'s': score, 'id': article_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (score, article_id) or None for a missing/garbled cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return float(data['s']), int(data['id'])
+    except Exception:
+        return None
+
+
+def _row_values(article_id, title, rewritten_headline, summary, category_id):
+    headline = title or ''
+    if rewritten_headline and rewritten_headline != title:
+        headline = f"{rewritten_headline} {headline}"
+    return (int(article_id), headline, summary or '', category_id)
+
+
+def index_articles(rows, conn=None):
+    """
+    Upsert many articles. Each row is a dict with id, title, rewritten_headline,
+    rewritten_summary and category_id.
+    """
+    conn = conn or _connection()
+    values = [_row_values(r['id'], r.get('title'), r.get('rewritten_headline'),
+                          r.get('rewritten_summary'), r.get('category_id')) for r in rows]
+    if not values:
+        return 0
+    with conn:
+        conn.executemany("DELETE FROM article_fts WHERE rowid = ?", [(v[0],) for v in values])
+        conn.executemany(
+            "INSERT INTO article_fts (rowid, headline, summary, category_id) VALUES (?, ?, ?, ?)",
+            values
+        )
+    return len(values)
+
+
+def remove_articles(article_ids):
+    ids = [(int(a),) for a in article_ids]
+    if not ids:
+        return 0
+    try:
+        conn = _connection()
+        with conn:
+            conn.executemany("DELETE FROM article_fts WHERE rowid = ?", ids)
+        return len(ids)
+    except Exception as e:
+        logger.warning(f"Search index removal failed: {e}")
+        return 0
+
+
+def search(text, category_id=None, limit=20, cursor=None):
+    """
+    Returns (hits, next_cursor) where hits is a list of (article_id, score),
+    best first. BM25 scores are negative; lower is better. The cursor is only
+    exact while the index is unchanged (see the module docstring).
+    """
+    match = build_match_query(text)
+    if not match:
+        return [], None
+
+    filters = ["article_fts MATCH ?"]
+    params = [HEADLINE_WEIGHT, SUMMARY_WEIGHT, match]
+    if category_id is not None:
+        filters.append("category_id = ?")
+        params.append(int(category_id))
+
+    after = decode_cursor(cursor)
+    keyset = ""
+    if after:
+        keyset = "WHERE score > ? OR (score = ? AND article_id < ?)"
+        params.extend([after[0], after[0], after[1]])
+    params.append(limit + 1)
+
+    rows = _connection().execute(f"""
+        SELECT article_id, score FROM (
+            SELECT rowid AS article_id, bm25(article_fts, ?, ?) AS score
+            FROM article_fts
+            WHERE {' AND '.join(filters)}
+        )
+        {keyset}
+        ORDER BY score, article_id DESC
+        LIMIT ?
+    """, params).fetchall()
+
+    hits = [(row['article_id'], row['score']) for row in rows[:limit]]
+    next_cursor = encode_cursor(hits[-1][1], hits[-1][0]) if len(rows) > limit else None
+    return hits, next_cursor
+
+
+def rebuild_from_db(batch_size=1000):
+    """Rebuild the whole index from MySQL, walking `articles` by primary key."""
+    from utils.db import get_db_connection
+    conn = _connection()
+    with conn:
+        conn.execute("DELETE FROM article_fts")
+    db = get_db_connection()
+    last_id, total = 0, 0
+    try:
+        with db.cursor() as cursor:
+            while True:
+                cursor.execute("""
+                    SELECT id, title, rewritten_headline, rewritten_summary, category_id
+                    FROM articles
+                    WHERE id > %s AND (blocked_legacy IS NULL OR blocked_legacy = 0)
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                total += index_articles(rows, conn)
+                last_id = rows[-1]['id']
+                logger.info(f"Indexed {total} articles...")
+    finally:
+        db.close()
+    with conn:
+        conn.execute("INSERT INTO article_fts (article_fts) VALUES ('optimize')")
+    return total
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(sys.argv) > 1 and sys.argv[1] == '--rebuild':
+        from dotenv import load_dotenv
+        load_dotenv()
+        count = rebuild_from_db()
+        print(f"Search index rebuilt: {count} articles")
+    elif len(sys.argv) > 2 and sys.argv[1] == '--query':
+        start = time.perf_counter()
+        results, _ = search(' '.join(sys.argv[2:]))
+        print(f"{len(results)} hits in {(time.perf_counter() - start) * 1000:.2f} ms: {results}")
+    else:
+        print("Usage: python3 -m utils.search_index --rebuild | --query <text>")
@@ -0,0 +1,38 @@
+# utils/state_store.py
+"""
+Local SQLite state files shared between the web workers and the ingestion scripts.
+
+Everything lives under STATE_DIR (default: backend/state/). These files hold
+caches and bookkeeping only — MySQL stays the source of truth, so any of them
+can be deleted safely.
+"""
+
+import os
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.getenv('STATE_DIR', os.path.join(BACKEND_DIR, 'state'))
+
+
+def get_state_path(filename):
+    """Absolute path of a file inside STATE_DIR (the directory is created on demand)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    return os.path.join(STATE_DIR, filename)
+
+
+def connect_state_db(filename, timeout=10):
+    """
+    Open a SQLite state database in WAL mode so one writer and many readers
+    (e.g. gunicorn workers) can use it concurrently.
+    """
+    conn = sqlite3.connect(get_state_path(filename), timeout=timeout, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    except sqlite3.DatabaseError as e:
+        logger.warning(f"Could not enable WAL for {filename}: {e}")
+    return conn